@@ -1,8 +1,9 @@
 import argparse
 import configparser as cp
-from typing import List, Union
+from dataclasses import asdict
+from typing import Any, Dict, List
 
-from helical_thread import HelicalThread, ThreadHelixes, helical_thread
+from helical_thread import HelicalThread, ThreadConfig, parse_config
 
 # Defaults
 
@@ -57,92 +58,52 @@ DFLT_taper_out_rpos: float = 0.1
 DFLT_taper_in_rpos: float = 1 - DFLT_taper_out_rpos
 
 
+# The defaults of the values not in defaults.ini
+DEFAULTS: Dict[str, Any] = {
+    "int_ext_both": DFLT_int_ext_both,
+    "write": DFLT_write,
+    "quick_usage": DFLT_quick_usage,
+    "ext_clearance": DFLT_ext_clearance,
+    "thread_overlap": DFLT_thread_overlap,
+    "stl_tolerance": DFLT_stl_tolerance,
+    "pitch": DFLT_pitch,
+    "angle_degs": DFLT_angle_degs,
+    "inset_offset": DFLT_inset_offset,
+    "dia_major": DFLT_dia_major,
+    "height": DFLT_height,
+    "major_cutoff": DFLT_major_cutoff,
+    "minor_cutoff": DFLT_minor_cutoff,
+    "taper_out_rpos": DFLT_taper_out_rpos,
+    "taper_in_rpos": DFLT_taper_in_rpos,
+}
+
+
 class Parameters:
     int_ext_both: str
     write: bool
     quick_usage: bool
     stl_tolerance: float
     dia_major: float
-    ht: HelicalThread = HelicalThread(DFLT_dia_major / 2, DFLT_pitch, DFLT_height)
+    ht: HelicalThread
 
     def __init__(self, params: List[str] = []):
 
-        config = cp.ConfigParser()
+        config = cp.ConfigParser(interpolation=None)
         config.read("defaults.ini")
 
-        # self.ht: HelicalThread = HelicalThread(0, 0, 0)
-        # self.stl_tolerance: float = 0
-        # self.dia_major: float = 0
-
-        # What to show: internal, external or both
-        v: Union[str, None] = config.get("default", "int_ext_both", fallback=None)
-        self.int_ext_both = eval(v) if v is not None else DFLT_int_ext_both
-
-        # If quick_usage is True then print the quick usgae if there are no parameters
-        v = config.get("default", "write", fallback=None)
-        self.write = bool(eval(v)) if v is not None else DFLT_write
-
-        # If quick_usage is True then print the quick usgae if there are no parameters
-        v = config.get("default", "quick_usage", fallback=None)
-        self.quick_usage = bool(eval(v)) if v is not None else DFLT_quick_usage
-
-        # Clearance between internal threads and external threads.
-        # The external threads are horzitionally moved to create
-        # the clearance.
-        v = config.get("default", "ext_clearance", fallback=None)
-        self.ht.ext_clearance = float(eval(v)) if v is not None else DFLT_ext_clearance
-
-        # Set to guarantee the thread and core overlap and a manifold is created
-        v = config.get("default", "thread_overlap", fallback=None)
-        self.ht.thread_overlap = (
-            float(eval(v)) if v is not None else DFLT_thread_overlap
-        )
-
-        # Tolerance value for generating STL files
-        v = config.get("default", "stl_tolerance", fallback=None)
-        self.stl_tolerance = float(eval(v)) if v is not None else DFLT_stl_tolerance
-
-        # The separation between edges of a helix after on revolution.
-        v = config.get("default", "pitch", fallback=None)
-        self.ht.pitch = float(eval(v)) if v is not None else DFLT_pitch
+        # The expressions of defaults.ini are compiled and evaluated
+        # without eval, those missing are the DFLT_ values
+        text: Dict[str, str] = {k: repr(v) for k, v in DEFAULTS.items()}
+        text.update(config["default"] if config.has_section("default") else {})
+        thread_config: ThreadConfig = parse_config(text)
+        values: Dict[str, Any] = thread_config.values()
 
-        # The included angle of the "tip" of a thread
-        v = config.get("default", "angle_degs", fallback=None)
-        self.ht.angle_degs = float(eval(v)) if v is not None else DFLT_angle_degs
-
-        # Adjust z by inset so threads are inset from the bottom and top
-        v = config.get("default", "inset_offset", fallback=None)
-        self.ht.inset_offset = float(eval(v)) if v is not None else DFLT_inset_offset
-
-        # The major diameter of outer most threads of nut,
-        # the minor diameter is the diameter of the inner most part of the nut
-        v = config.get("default", "dia_major", fallback=None)
-        self.dia_major = float(eval(v)) if v is not None else DFLT_dia_major
-        self.ht.radius = self.dia_major / 2
-
-        # Height of main item
-        v = config.get("default", "height", fallback=None)
-        self.ht.height = float(eval(v)) if v is not None else DFLT_height
-
-        # Size of the flat at major diameter
-        v = config.get("default", "major_cutoff", fallback=None)
-        self.ht.major_cutoff = float(eval(v)) if v is not None else DFLT_major_cutoff
-
-        # Size of the flat at minor diameter
-        v = config.get("default", "minor_cutoff", fallback=None)
-        self.ht.minor_cutoff = float(eval(v)) if v is not None else DFLT_minor_cutoff
-
-        # A decimal fraction such that (taper_out_rpos * t_range) defines
-        # the t value where tapering out ends. The tapering begins at t = first_t.
-        v = config.get("default", "taper_out_rpos", fallback=None)
-        self.ht.taper_out_rpos = (
-            float(eval(v)) if v is not None else DFLT_taper_out_rpos
-        )
-
-        # A decimal fraction such that (taper_in_rpos * t_range) defines
-        # the t value where tapering in begins. The tapering ends at t = last_t.
-        v = config.get("default", "taper_in_rpos", fallback=None)
-        self.ht.taper_in_rpos = float(eval(v)) if v is not None else DFLT_taper_in_rpos
+        self.int_ext_both = values["int_ext_both"]
+        self.write = bool(values["write"])
+        self.quick_usage = bool(values["quick_usage"])
+        self.stl_tolerance = float(values["stl_tolerance"])
+        self.dia_major = float(values["dia_major"])
+        self.ht = thread_config.thread()
 
         parser: argparse.ArgumentParser = argparse.ArgumentParser()
 
@@ -276,14 +237,20 @@ class Parameters:
         self.dia_major = args.diameter
         self.stl_tolerance = args.stl_tolerance
 
-        self.ht.height = args.height
-        self.ht.pitch = args.pitch
-        self.ht.radius = self.dia_major / 2
-        self.ht.angle_degs = args.angle_degs
-        self.ht.inset_offset = args.inset_offset
-        self.ht.ext_clearance = args.ext_clearance
-        self.ht.taper_in_rpos = args.taper_in_rpos
-        self.ht.taper_out_rpos = args.taper_out_rpos
-        self.ht.major_cutoff = args.major_cutoff
-        self.ht.minor_cutoff = args.minor_cutoff
-        self.ht.thread_overlap = args.thread_overlap
+        # HelicalThread is immutable, build a new one with the arguments
+        self.ht = HelicalThread(
+            **{
+                **asdict(self.ht),
+                "height": args.height,
+                "pitch": args.pitch,
+                "radius": self.dia_major / 2,
+                "angle_degs": args.angle_degs,
+                "inset_offset": args.inset_offset,
+                "ext_clearance": args.ext_clearance,
+                "taper_in_rpos": args.taper_in_rpos,
+                "taper_out_rpos": args.taper_out_rpos,
+                "major_cutoff": args.major_cutoff,
+                "minor_cutoff": args.minor_cutoff,
+                "thread_overlap": args.thread_overlap,
+            }
+        )
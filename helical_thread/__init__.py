@@ -4,4 +4,56 @@ __author__ = "Wink Saville"
 __email__ = "wink@saville.com"
 __version__ = "0.2.3"
 
-from .helicalthread import HelicalThread, ThreadHelixes, helical_thread
+from .assembly import Assembly, Placement, build_assembly
+from .batch import HelicalThreadBatch, ThreadHelixesBatch, helical_thread_batch
+from .config import ThreadConfig, load_config, parse_config
+from .evaluator import HelixEvaluator, compile_helixes
+from .export import thread_meshes, write_3mf, write_obj, write_ply
+from .fitclass import (
+    FitClassEnvelopes,
+    ToleranceClass,
+    coarse_pitch,
+    fit_class_envelopes,
+    pitch_diameter,
+)
+from .geometry2d import (
+    intersect_lines,
+    line_distance,
+    line_side,
+    pad_polygons,
+    split_polygons,
+)
+from .heightmap import RadiusMap, radius_map, write_png
+from .helicalthread import (
+    HelicalThread,
+    ThreadDerived,
+    ThreadHelixes,
+    helical_thread,
+    thread_derived,
+)
+from .index import ThreadIndex, thread_index
+from .instrumentation import (
+    Instrumentation,
+    StageTime,
+    instrument,
+    json_sink,
+    pstats_sink,
+    sinks,
+)
+from .interference import InterferenceReport, check_interference
+from .lod import MeshPyramid, mesh_pyramid
+from .lut import ProfileTable, profile_table
+from .mesh import ThreadMesh, helixes_mesh, thread_mesh
+from .meshcheck import MeshReport, check_mesh
+from .metrics import ThreadMetrics, thread_metrics
+from .sampling import (
+    angle_t_values,
+    rotate_starts,
+    sample_helixes,
+    sample_starts,
+    start_rotations,
+    t_values,
+)
+from .server import ThreadServer, decode_arrays, encode_arrays, fetch
+from .stackup import StackupResult, fit_stackup
+from .toolpath import Move, gcode, toolpath
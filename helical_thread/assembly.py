@@ -0,0 +1,151 @@
+"""
+Assemblies of many placed threads such as a plate of threaded holes.
+
+`build_assembly` dedupes the placements by their HelicalThread and side
+so the mesh of each distinct thread is generated once. The assembly is
+then written with each mesh once and the placements as 3MF components,
+or merged into one mesh where the copies of each distinct mesh are
+transformed by one broadcast matrix multiply into a preallocated buffer.
+"""
+
+from dataclasses import astuple, dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .evaluator import DType
+from .export import File, write_3mf
+from .helicalthread import HelicalThread, helical_thread
+from .instrumentation import count, timed
+from .mesh import ThreadMesh, thread_mesh
+
+
+def _identity() -> np.ndarray:
+    return np.eye(4)
+
+
+@dataclass
+class Placement:
+    """A thread of an assembly and where it is placed"""
+
+    ht: HelicalThread
+    """The thread"""
+
+    transform: np.ndarray = field(default_factory=_identity)
+    """
+    The 4x4 matrix placing the thread, it transforms column vectors,
+    the translation is the last column
+    """
+
+    internal: bool = True
+    """True for the internal thread, a hole, False for the external, a bolt"""
+
+
+@dataclass
+class Assembly:
+    """The result of `build_assembly`"""
+
+    meshes: Dict[str, ThreadMesh]
+    """The mesh of each distinct thread by name"""
+
+    instances: List[str]
+    """The name of the mesh of each placement"""
+
+    transforms: np.ndarray
+    """The (P, 4, 4) transforms of the placements"""
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+    def components(self) -> List[Tuple[str, np.ndarray]]:
+        """The (name, transform) of each placement"""
+        return list(zip(self.instances, self.transforms))
+
+    @timed("assembly")
+    def mesh(self) -> ThreadMesh:
+        """
+        Merge the placed copies of the meshes into one mesh. The copies of
+        each mesh are consecutive, in the order the meshes were first
+        placed, and within them in placement order.
+
+        :returns: The mesh of the whole assembly
+        """
+        instances: np.ndarray = np.array(self.instances)
+        uses: List[np.ndarray] = [
+            np.flatnonzero(instances == name) for name in self.meshes
+        ]
+        vertex_count: int = sum(
+            len(m.vertices) * len(u) for m, u in zip(self.meshes.values(), uses)
+        )
+        face_count: int = sum(
+            len(m.faces) * len(u) for m, u in zip(self.meshes.values(), uses)
+        )
+        dtype: Any = (
+            np.result_type(*[m.vertices for m in self.meshes.values()])
+            if self.meshes
+            else np.float64
+        )
+        vertices: np.ndarray = np.empty((vertex_count, 3), dtype=dtype)
+        faces: np.ndarray = np.empty((face_count, 3), dtype=np.int64)
+        count("assembly_instances", len(self))
+
+        v_lo: int = 0
+        f_lo: int = 0
+        for m, u in zip(self.meshes.values(), uses):
+            nv: int = len(m.vertices)
+            nf: int = len(m.faces)
+            v_hi: int = v_lo + (len(u) * nv)
+            f_hi: int = f_lo + (len(u) * nf)
+            transforms: np.ndarray = self.transforms[u].astype(dtype, copy=False)
+            out: np.ndarray = vertices[v_lo:v_hi].reshape(len(u), nv, 3)
+            np.matmul(m.vertices, transforms[:, :3, :3].transpose(0, 2, 1), out=out)
+            out += transforms[:, np.newaxis, :3, 3]
+            offsets: np.ndarray = v_lo + (np.arange(len(u)) * nv)
+            faces[f_lo:f_hi].reshape(len(u), nf, 3)[:] = (
+                m.faces[np.newaxis] + offsets[:, np.newaxis, np.newaxis]
+            )
+            v_lo, f_lo = v_hi, f_hi
+        return ThreadMesh(vertices=vertices, faces=faces)
+
+    def write_3mf(self, file: File, unit: str = "millimeter", digits: int = 9) -> None:
+        """
+        Write the assembly as a 3MF package with each mesh written once
+        and each placement a component, see `write_3mf`.
+
+        :param file: The path or binary file written
+        :param unit: The unit of the coordinates
+        :param digits: The significant digits of the coordinates
+        """
+        write_3mf(file, self.meshes, unit, digits, self.components())
+
+
+@timed("assembly")
+def build_assembly(
+    placements: Sequence[Placement], num: int = 500, dtype: DType = np.float64
+) -> Assembly:
+    """
+    Mesh the distinct threads of the placements, placements of equal
+    HelicalThreads and side share their mesh.
+
+    :param placements: The placed threads
+    :param num: The number of rings of each start
+    :param dtype: The dtype of the vertices, float32 or float64
+    :returns: The assembly
+    """
+    meshes: Dict[str, ThreadMesh] = {}
+    names: Dict[Tuple[Any, ...], str] = {}
+    instances: List[str] = []
+    for p in placements:
+        key: Tuple[Any, ...] = (astuple(p.ht), p.internal)
+        name: str = names.get(key, "")
+        if not name:
+            name = f"thread{len(names)}_{'int' if p.internal else 'ext'}"
+            names[key] = name
+            meshes[name] = thread_mesh(helical_thread(p.ht), p.internal, num, dtype)
+        instances.append(name)
+
+    count("assembly_meshes", len(meshes))
+    transforms: np.ndarray = np.array(
+        [np.asarray(p.transform, dtype=float) for p in placements]
+    ).reshape(-1, 4, 4)
+    return Assembly(meshes=meshes, instances=instances, transforms=transforms)
@@ -0,0 +1,270 @@
+"""
+Vectorized `helical_thread` over batches of thread parameters.
+
+A HelicalThreadBatch holds one numpy array per HelicalThread field and
+`helical_thread_batch` computes the helixes of every thread in the batch
+at once from the arrays `thread_derived` returns for the batch.
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+from taperable_helix import HelixLocation
+
+from .helicalthread import HelicalThread, ThreadHelixes, _starts, thread_derived
+from .instrumentation import count, timed
+
+# The number of HelixLocations in a profile when minor_cutoff > 0,
+# profiles with three are padded by repeating the last HelixLocation.
+PROFILE_SIZE: int = 4
+
+
+def _default(value: float) -> Any:
+    return field(default_factory=lambda: np.array(value))
+
+
+def _dtype(name: str) -> type:
+    """The dtype of the field name, starts is an int"""
+    return int if name == "starts" else float
+
+
+@dataclass(frozen=True)
+class HelicalThreadBatch:
+    """
+    The fields of HelicalThread as arrays, one entry per thread. Every
+    field must broadcast to the shape of radius, they are read only.
+    starts is an int array, the others are float.
+    """
+
+    radius: np.ndarray
+    pitch: np.ndarray
+    height: np.ndarray
+    taper_out_rpos: np.ndarray = _default(0.0)
+    taper_in_rpos: np.ndarray = _default(1.0)
+    inset_offset: np.ndarray = _default(0.0)
+    first_t: np.ndarray = _default(0.0)
+    last_t: np.ndarray = _default(1.0)
+    angle_degs: np.ndarray = _default(45.0)
+    major_cutoff: np.ndarray = _default(0.0)
+    minor_cutoff: np.ndarray = _default(0.0)
+    ext_clearance: np.ndarray = _default(0.1)
+    thread_overlap: np.ndarray = _default(0.001)
+    starts: np.ndarray = field(default_factory=lambda: np.array(1))
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "starts", _starts(self.starts))
+        shape = np.broadcast(*[getattr(self, f.name) for f in fields(self)]).shape
+        for f in fields(self):
+            object.__setattr__(
+                self,
+                f.name,
+                np.broadcast_to(
+                    np.asarray(getattr(self, f.name), dtype=_dtype(f.name)), shape
+                ),
+            )
+
+    def __len__(self) -> int:
+        return len(self.radius)
+
+    @classmethod
+    def from_threads(cls, threads: Sequence[HelicalThread]) -> "HelicalThreadBatch":
+        """
+        Create a batch from a sequence of HelicalThreads
+
+        :param threads: The threads
+        :returns: The batch
+        """
+        values: Dict[str, Any] = {
+            f.name: np.array(
+                [getattr(ht, f.name) for ht in threads], dtype=_dtype(f.name)
+            )
+            for f in fields(cls)
+        }
+        return cls(**values)
+
+    def thread(self, i: int) -> HelicalThread:
+        """
+        Return the i'th thread of the batch as a HelicalThread
+
+        :param i: The index of the thread
+        :returns: A new HelicalThread
+        """
+        values: Dict[str, Any] = {
+            f.name: _dtype(f.name)(getattr(self, f.name)[i]) for f in fields(self)
+        }
+        return HelicalThread(**values)
+
+
+@dataclass(frozen=True)
+class ThreadHelixesBatch:
+    """
+    The result of `helical_thread_batch`. The helixes are arrays of shape
+    (N, PROFILE_SIZE, 3) whose last axis is the HelixLocation radius,
+    horz_offset and vert_offset. Three point profiles repeat their last
+    HelixLocation and have a count of 3.
+    """
+
+    htb: HelicalThreadBatch
+    """The basic dimensions of the helixes"""
+
+    int_helix_radius: np.ndarray
+    """The internal thread radius"""
+
+    int_helixes: np.ndarray
+    """The internal helix locations"""
+
+    int_count: np.ndarray
+    """The number of internal helix locations, 3 or 4"""
+
+    ext_helix_radius: np.ndarray
+    """The external thread radius"""
+
+    ext_helixes: np.ndarray
+    """The external helix locations"""
+
+    ext_count: np.ndarray
+    """The number of external helix locations, 3 or 4"""
+
+    int_thread_depth: np.ndarray
+    """The radial depth of the internal thread"""
+
+    ext_thread_depth: np.ndarray
+    """
+    The radial depth of the external thread, int_thread_depth unless its
+    profile has three points
+    """
+
+    ext_vert_adj: np.ndarray
+    """
+    The reduction of the half height of the external thread at every radius
+    that gives the ext_clearance between the flanks
+    """
+
+    def __len__(self) -> int:
+        return len(self.int_helix_radius)
+
+    @property
+    def int_profiles(self) -> np.ndarray:
+        """The (N, PROFILE_SIZE, 2) (r, z) points of the internal profiles"""
+        return _profiles(self.int_helixes)
+
+    @property
+    def ext_profiles(self) -> np.ndarray:
+        """The (N, PROFILE_SIZE, 2) (r, z) points of the external profiles"""
+        return _profiles(self.ext_helixes)
+
+    def thread_helixes(self, i: int) -> ThreadHelixes:
+        """
+        Return the i'th entry of the batch as ThreadHelixes
+
+        :param i: The index of the thread
+        :returns: The ThreadHelixes identical to helical_thread(htb.thread(i))
+        """
+        return ThreadHelixes(
+            ht=self.htb.thread(i),
+            int_helix_radius=float(self.int_helix_radius[i]),
+            int_helixes=_helix_locations(self.int_helixes[i], self.int_count[i]),
+            ext_helix_radius=float(self.ext_helix_radius[i]),
+            ext_helixes=_helix_locations(self.ext_helixes[i], self.ext_count[i]),
+        )
+
+
+def _profiles(helixes: np.ndarray) -> np.ndarray:
+    """Return (radius + horz_offset, vert_offset) of each HelixLocation"""
+    return np.stack((helixes[:, :, 0] + helixes[:, :, 1], helixes[:, :, 2]), axis=-1)
+
+
+def _helix_locations(helixes: np.ndarray, count: int) -> List[HelixLocation]:
+    return [
+        HelixLocation(
+            radius=float(radius),
+            horz_offset=float(horz_offset),
+            vert_offset=float(vert_offset),
+        )
+        for radius, horz_offset, vert_offset in helixes[:count]
+    ]
+
+
+@timed("helical_thread_batch")
+def helical_thread_batch(htb: HelicalThreadBatch) -> ThreadHelixesBatch:
+    """
+    Given a HelicalThreadBatch compute the internal and external helixes
+    of every thread, the vectorized equivalent of calling `helical_thread`
+    on each thread.
+
+    :param htb: The basic dimensions of the helical threads
+    :returns: internal and external helixes of every thread
+    """
+    d = thread_derived(htb)
+    n: int = len(htb)
+    count("threads", n)
+    int_helix_radius: np.ndarray = htb.radius.copy()
+    int_helixes: np.ndarray = np.empty((n, PROFILE_SIZE, 3))
+    int_helixes[:, 0] = np.stack(
+        (
+            int_helix_radius + htb.thread_overlap,
+            np.zeros(n),
+            -d.thread_half_height_at_helix_radius,
+        ),
+        axis=-1,
+    )
+    int_helixes[:, 1] = int_helixes[:, 0]
+    int_helixes[:, 1, 2] = +d.thread_half_height_at_helix_radius
+    int_helixes[:, 2] = np.stack(
+        (
+            int_helix_radius,
+            -d.int_thread_depth,
+            +d.thread_half_height_at_opposite_helix_radius,
+        ),
+        axis=-1,
+    )
+    int_count: np.ndarray = np.where(htb.minor_cutoff > 0, 4, 3)
+    int_helixes[:, 3] = int_helixes[:, 2]
+    int_helixes[:, 3, 2] = np.where(
+        int_count == 4,
+        -d.thread_half_height_at_opposite_helix_radius,
+        +d.thread_half_height_at_opposite_helix_radius,
+    )
+
+    ext_helixes: np.ndarray = np.empty((n, PROFILE_SIZE, 3))
+    ext_helixes[:, 0] = np.stack(
+        (
+            d.ext_helix_radius - htb.thread_overlap,
+            np.zeros(n),
+            -d.ext_thread_half_height_at_ext_helix_radius_plus_tova,
+        ),
+        axis=-1,
+    )
+    ext_helixes[:, 1] = ext_helixes[:, 0]
+    ext_helixes[:, 1, 2] = +d.ext_thread_half_height_at_ext_helix_radius_plus_tova
+    ext_helixes[:, 2] = np.stack(
+        (
+            d.ext_helix_radius,
+            d.ext_thread_depth,
+            +d.ext_thread_half_height_at_opposite_ext_helix_radius,
+        ),
+        axis=-1,
+    )
+    ext_count: np.ndarray = np.where(
+        d.ext_thread_half_height_at_opposite_ext_helix_radius > 0, 4, 3
+    )
+    ext_helixes[:, 3] = ext_helixes[:, 2]
+    ext_helixes[:, 3, 2] = np.where(
+        ext_count == 4,
+        -d.ext_thread_half_height_at_opposite_ext_helix_radius,
+        +d.ext_thread_half_height_at_opposite_ext_helix_radius,
+    )
+
+    return ThreadHelixesBatch(
+        htb=htb,
+        int_helix_radius=int_helix_radius,
+        int_helixes=int_helixes,
+        int_count=int_count,
+        ext_helix_radius=np.asarray(d.ext_helix_radius),
+        ext_helixes=ext_helixes,
+        ext_count=ext_count,
+        int_thread_depth=np.asarray(d.int_thread_depth),
+        ext_thread_depth=np.asarray(d.ext_thread_depth),
+        ext_vert_adj=np.asarray(d.ext_vert_adj),
+    )
@@ -0,0 +1,259 @@
+"""
+Thread parameters from ini files such as defaults.ini without `eval`.
+
+Every value of a section is an expression, a number, string or boolean
+constant, or arithmetic of constants and other values. A value is named
+by its key, `pitch`, or as the parameters example does, `self.pitch` or
+`self.ht.pitch`. `load_config` parses the expressions once into a
+ThreadConfig which evaluates them in dependency order, so the values of
+each set of overrides cost a few arithmetic operations. The operations
+are numpy operations, overrides that are arrays evaluate every config of
+a batch at once.
+"""
+
+import ast
+import configparser as cp
+import operator
+from dataclasses import dataclass, fields
+from types import MappingProxyType
+from typing import IO, Any, Callable, Dict, List, Mapping, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from .batch import HelicalThreadBatch
+from .helicalthread import HelicalThread
+
+# Evaluates an expression given the values it depends on
+Expression = Callable[[Mapping[str, Any]], Any]
+
+# Expressions of the values a config doesn't have but HelicalThread needs,
+# read-only as it is the default of parse_config and load_config
+DERIVED: Mapping[str, str] = MappingProxyType({"radius": "dia_major / 2"})
+
+_BINARY_OPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPS: Dict[type, Callable[[Any], Any]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "abs": np.abs,
+    "min": np.minimum,
+    "max": np.maximum,
+    "sqrt": np.sqrt,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "radians": np.radians,
+    "degrees": np.degrees,
+}
+
+
+def _name(node: ast.expr) -> str:
+    """The key of a Name or of a self.key or self.ht.key Attribute"""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        owner: ast.expr = node.value
+        if isinstance(owner, ast.Attribute) and owner.attr == "ht":
+            owner = owner.value
+        if isinstance(owner, ast.Name) and owner.id == "self":
+            return node.attr
+    raise ValueError(f"Unsupported name: {ast.dump(node)}")
+
+
+def _compile(node: ast.expr, names: Set[str]) -> Expression:
+    """
+    Compile an expression node into a function of the values, adding the
+    keys it depends on to names.
+    """
+    if not isinstance(node, ast.Name) and not list(ast.iter_child_nodes(node)):
+        # A constant, ast.Num, ast.Str or ast.NameConstant before Python 3.8
+        value: Any = ast.literal_eval(node)
+        if not isinstance(value, (bool, int, float, str)):
+            raise ValueError(f"Unsupported constant: {value!r}")
+        return lambda values: value
+    if isinstance(node, (ast.Name, ast.Attribute)):
+        key: str = _name(node).lower()
+        names.add(key)
+        return lambda values: values[key]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        binary: Callable[[Any, Any], Any] = _BINARY_OPS[type(node.op)]
+        left: Expression = _compile(node.left, names)
+        right: Expression = _compile(node.right, names)
+        return lambda values: binary(left(values), right(values))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        unary: Callable[[Any], Any] = _UNARY_OPS[type(node.op)]
+        operand: Expression = _compile(node.operand, names)
+        return lambda values: unary(operand(values))
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in _FUNCTIONS
+        and not node.keywords
+    ):
+        function: Callable[..., Any] = _FUNCTIONS[node.func.id]
+        args: List[Expression] = [_compile(arg, names) for arg in node.args]
+        return lambda values: function(*[arg(values) for arg in args])
+    raise ValueError(f"Unsupported expression: {ast.dump(node)}")
+
+
+def compile_expression(text: str) -> Tuple[Expression, Set[str]]:
+    """
+    Compile an expression of constants, + - * / // % **, unary + -,
+    abs, min, max, sqrt, sin, cos, tan, radians, degrees and the names of
+    other values.
+
+    :param text: The expression
+    :returns: A tuple of the function evaluating the expression given a
+              mapping of the values it depends on and the set of their keys
+    """
+    try:
+        tree: ast.Expression = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {text}") from e
+    names: Set[str] = set()
+    return _compile(tree.body, names), names
+
+
+@dataclass(frozen=True)
+class ThreadConfig:
+    """
+    The compiled expressions of a config, see `load_config`. Overrides
+    replace the values of their keys and the values that depend on
+    them use the overrides.
+    """
+
+    expressions: Mapping[str, Expression]
+    """The function evaluating each value"""
+
+    order: Tuple[str, ...]
+    """The keys in dependency order, every key follows its dependencies"""
+
+    def values(self, overrides: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Evaluate the values of the config.
+
+        :param overrides: Values replacing those of the config, numbers or
+                          arrays which must broadcast together
+        :returns: The values of every key of the config and overrides
+        """
+        values: Dict[str, Any] = {k.lower(): v for k, v in (overrides or {}).items()}
+        for key in self.order:
+            if key not in values:
+                values[key] = self.expressions[key](values)
+        return values
+
+    def thread(self, overrides: Optional[Mapping[str, Any]] = None) -> HelicalThread:
+        """
+        Return a new HelicalThread of the values with the names of its
+        fields, the other fields are their defaults.
+
+        :param overrides: Values replacing those of the config
+        :returns: The HelicalThread
+        """
+        values: Dict[str, Any] = self.values(overrides)
+        # HelicalThread checks that starts is an integer
+        kwargs: Dict[str, Any] = {
+            f.name: values[f.name] if f.name == "starts" else float(values[f.name])
+            for f in fields(HelicalThread)
+            if f.name in values
+        }
+        return HelicalThread(**kwargs)
+
+    def batch(self, overrides: Mapping[str, Any]) -> HelicalThreadBatch:
+        """
+        Return the HelicalThreadBatch of the values, each array of overrides
+        is one value per thread and the expressions are evaluated once for
+        all of them.
+
+        :param overrides: 1D arrays of values replacing those of the config
+        :returns: The batch of threads
+        """
+        values: Dict[str, Any] = self.values(
+            {k: np.asarray(v, dtype=float) for k, v in overrides.items()}
+        )
+        return HelicalThreadBatch(
+            **{
+                f.name: np.atleast_1d(np.asarray(values[f.name]))
+                for f in fields(HelicalThreadBatch)
+                if f.name in values
+            }
+        )
+
+
+def _order(dependencies: Mapping[str, Set[str]]) -> Tuple[str, ...]:
+    """The keys sorted so every key follows its dependencies"""
+    order: List[str] = []
+    state: Dict[str, bool] = {}  # False visiting, True done
+
+    def visit(key: str, path: Tuple[str, ...]) -> None:
+        if state.get(key):
+            return
+        if key in state:
+            raise ValueError(f"Circular dependency: {' -> '.join(path + (key,))}")
+        if key not in dependencies:
+            raise ValueError(f"Unknown name: {key} in {path[-1]}")
+        state[key] = False
+        for name in sorted(dependencies[key]):
+            visit(name, path + (key,))
+        state[key] = True
+        order.append(key)
+
+    for key in dependencies:
+        visit(key, ())
+    return tuple(order)
+
+
+def parse_config(
+    text: Mapping[str, str], derived: Mapping[str, str] = DERIVED
+) -> ThreadConfig:
+    """
+    Compile the expressions of a config.
+
+    :param text: The expression of each key
+    :param derived: Expressions of keys not in text, used when the names
+                    they depend on are
+    :returns: The compiled config
+    """
+    expressions: Dict[str, Expression] = {}
+    dependencies: Dict[str, Set[str]] = {}
+    for key, value in text.items():
+        expressions[key.lower()], dependencies[key.lower()] = compile_expression(value)
+    for key, value in derived.items():
+        expression, names = compile_expression(value)
+        if key not in expressions and names <= set(expressions):
+            expressions[key], dependencies[key] = expression, names
+    return ThreadConfig(expressions, _order(dependencies))
+
+
+def load_config(
+    file: Union[str, IO[str]],
+    section: str = "DEFAULT",
+    derived: Mapping[str, str] = DERIVED,
+) -> ThreadConfig:
+    """
+    Read and compile an ini file such as defaults.ini.
+
+    :param file: The name of the ini file or a file object
+    :param section: The section of the config, which includes the
+                    values of the DEFAULT section
+    :param derived: Expressions of keys not in the section, see `parse_config`
+    :returns: The compiled config
+    """
+    config = cp.ConfigParser(interpolation=None)
+    if isinstance(file, str):
+        with open(file) as f:
+            config.read_file(f)
+    else:
+        config.read_file(file)
+    return parse_config(dict(config[section]), derived)
@@ -0,0 +1,341 @@
+"""
+Compiled evaluation of the helixes of a thread.
+
+`Helix.helix(hl)` derives the t range, the taper ranges and the number of
+turns every time it is called and `sample_helixes` does the same for every
+array of t values. `compile_helixes` derives them once, together with the
+radius and offsets of every HelixLocation, into an immutable
+HelixEvaluator whose scalar, vectorized and chunked methods only do the
+arithmetic that depends on t. `ThreadHelixes.compile` caches the
+evaluators of a thread.
+"""
+
+from dataclasses import dataclass, field
+from math import cos, pi, sin
+from typing import Iterator, Sequence, Tuple, Union
+
+import numpy as np
+from taperable_helix import Helix, HelixLocation
+
+# Number of t values evaluated at a time by HelixEvaluator.chunks
+_CHUNK: int = 1 << 14
+
+# A numpy float dtype, float32 or float64, or its name
+DType = Union[str, type, np.dtype]
+
+
+def float_dtype(dtype: DType) -> np.dtype:
+    """
+    Return dtype as a numpy dtype, raising ValueError unless it is float32
+    or float64.
+
+    :param dtype: The dtype, a numpy type, dtype or its name
+    :returns: The dtype
+    """
+    result: np.dtype = np.dtype(dtype)
+    if result not in (np.float32, np.float64):
+        raise ValueError(f"dtype:{dtype} should be float32 or float64")
+    return result
+
+
+def start_rotations(starts: int) -> np.ndarray:
+    """
+    Return the rotation matrices about the z axis that map the first
+    start of a thread onto each of its starts, start k is rotated by
+    2 * pi * k / starts in the direction the helix turns.
+
+    :param starts: The number of starts
+    :returns: An array of shape (starts, 3, 3), the first is the identity
+    """
+    angles: np.ndarray = np.arange(starts) * (2 * pi / starts)
+    cos: np.ndarray = np.cos(angles)
+    sin: np.ndarray = np.sin(angles)
+    rotations: np.ndarray = np.zeros((starts, 3, 3))
+    rotations[:, 0, 0] = cos
+    rotations[:, 0, 1] = -sin
+    rotations[:, 1, 0] = sin
+    rotations[:, 1, 1] = cos
+    rotations[:, 2, 2] = 1
+    return rotations
+
+
+def rotate_starts(points: np.ndarray, starts: int) -> np.ndarray:
+    """
+    Rotate the points of the first start of a thread onto every start.
+
+    :param points: An array of shape (..., 3) of x, y, z points
+    :param starts: The number of starts
+    :returns: An array of shape (starts, ..., 3), the first is points
+    """
+    return _rotate(points, start_rotations(starts))
+
+
+def _rotate(points: np.ndarray, rotations: np.ndarray) -> np.ndarray:
+    """Rotate points by each of rotations, the first is the identity"""
+    result: np.ndarray = np.matmul(
+        points.reshape(1, -1, 3), rotations.transpose(0, 2, 1).astype(points.dtype)
+    ).reshape((len(rotations),) + points.shape)
+    result[0] = points
+    return result
+
+
+def _read_only(a: np.ndarray) -> np.ndarray:
+    a.setflags(write=False)
+    return a
+
+
+@dataclass(frozen=True)
+class HelixEvaluator:
+    """
+    The constants of the helixes of a thread, see `compile_helixes`.
+    The points are those of `Helix.helix(hl)` for each HelixLocation.
+    """
+
+    first_t: float
+    last_t: float
+
+    rel_per_t: float
+    """The relative height per t, 1 / (last_t - first_t) or 0"""
+
+    taper_out_ends: float
+    """Points with t < taper_out_ends taper out"""
+
+    taper_out_per_t: float
+    """The taper angle per t from first_t"""
+
+    taper_in_starts: float
+    """Points with t > taper_in_starts taper in"""
+
+    taper_in_per_t: float
+    """The taper angle per t to last_t"""
+
+    angle_per_rel: float
+    """The helix angle per relative height, 2 * pi * helix height / lead"""
+
+    z_per_rel: float
+    """The z per relative height, the helix height or 0 if lead is 0"""
+
+    z_offset: float
+    """Added to z, the inset offset plus the helix height if lead is 0"""
+
+    locations: Tuple[Tuple[float, float, float], ...]
+    """The radius, horz_offset and vert_offset of each helix"""
+
+    starts: int = 1
+    """The number of starts"""
+
+    rotations: np.ndarray = field(init=False, repr=False, compare=False)
+    """(starts, 3, 3) rotations of the first start onto each start"""
+
+    _columns: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # The fields are frozen so the derived arrays are set directly
+        columns: np.ndarray = np.array(self.locations, dtype=float).reshape(-1, 3)
+        object.__setattr__(
+            self, "_columns", _read_only(columns.T.reshape(3, -1, 1).copy())
+        )
+        object.__setattr__(self, "rotations", _read_only(start_rotations(self.starts)))
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def t_values(self, num: int) -> np.ndarray:
+        """num evenly spaced t values from first_t to last_t inclusive"""
+        return np.linspace(self.first_t, self.last_t, num=num, dtype=float)
+
+    def taper_scale(self, t: np.ndarray) -> np.ndarray:
+        """
+        The scale of the horz_offset and vert_offset of the helixes at
+        each t, 1 between the tapers.
+
+        :param t: 1D array of t values
+        :returns: The scale at each t
+        """
+        taper_angle: np.ndarray = np.full_like(t, pi / 2)
+        out_mask: np.ndarray = t < self.taper_out_ends
+        in_mask: np.ndarray = ~out_mask & (t > self.taper_in_starts)
+        taper_angle[out_mask] = (t[out_mask] - self.first_t) * self.taper_out_per_t
+        taper_angle[in_mask] = (self.last_t - t[in_mask]) * self.taper_in_per_t
+        return np.sin(taper_angle)
+
+    def point(self, t: float, h: int = 0) -> Tuple[float, float, float]:
+        """
+        The point of helix h of the first start at t
+
+        :param t: A value between first_t and last_t inclusive
+        :param h: The index of the helix
+        :returns: The x, y, z point
+        """
+        radius, horz_offset, vert_offset = self.locations[h]
+        taper_scale: float = 1.0
+        if t < self.taper_out_ends:
+            taper_scale = sin((t - self.first_t) * self.taper_out_per_t)
+        elif t > self.taper_in_starts:
+            taper_scale = sin((self.last_t - t) * self.taper_in_per_t)
+
+        rel_height: float = (t - self.first_t) * self.rel_per_t
+        r: float = radius + (horz_offset * taper_scale)
+        a: float = self.angle_per_rel * rel_height
+        return (
+            r * sin(-a),
+            r * cos(a),
+            (self.z_per_rel * rel_height) + (vert_offset * taper_scale) + self.z_offset,
+        )
+
+    def body(self, t: np.ndarray) -> slice:
+        """
+        The slice of t between the tapers, where the taper scale is 1.
+        Empty unless those t values are contiguous, as they are when t is
+        sorted.
+
+        :param t: 1D array of t values
+        :returns: The slice of the body of t
+        """
+        index: np.ndarray = np.flatnonzero(
+            (t >= self.taper_out_ends) & (t <= self.taper_in_starts)
+        )
+        if len(index) == 0 or index[-1] - index[0] + 1 != len(index):
+            return slice(0, 0)
+        return slice(int(index[0]), int(index[-1]) + 1)
+
+    def points(
+        self, t: np.ndarray, dtype: DType = np.float64, piecewise: bool = True
+    ) -> np.ndarray:
+        """
+        The points of every helix of the first start at every t. The values
+        per t, the angle and taper, are computed as float64 and the points
+        as dtype so float32 points have no float64 intermediate.
+
+        When piecewise the body of t, see `body`, is evaluated without the
+        taper scale, its radius and offsets are constant, and only the t
+        values of the tapers are scaled. The taper scale of the body is
+        exactly 1 so the points are identical either way.
+
+        :param t: 1D array of t values between first_t and last_t inclusive
+        :param dtype: The dtype of the points, float32 or float64
+        :param piecewise: False to scale every t value by the taper scale
+        :returns: An array of shape (len(self), len(t), 3)
+        """
+        dt: np.dtype = float_dtype(dtype)
+        t = np.asarray(t, dtype=float)
+        radius, horz_offset, vert_offset = self._columns.astype(dt, copy=False)
+        rel_height: np.ndarray = (t - self.first_t) * self.rel_per_t
+        a: np.ndarray = self.angle_per_rel * rel_height
+        sin_a: np.ndarray = np.sin(-a).astype(dt, copy=False)
+        cos_a: np.ndarray = np.cos(a).astype(dt, copy=False)
+        z: np.ndarray = (self.z_per_rel * rel_height).astype(dt, copy=False)
+        z_offset: np.floating = dt.type(self.z_offset)
+
+        body: slice = self.body(t) if piecewise else slice(0, 0)
+        result: np.ndarray = np.empty((len(self), len(t), 3), dtype=dt)
+        for segment in (slice(0, body.start), body, slice(body.stop, len(t))):
+            if segment.start == segment.stop:
+                continue
+            r: np.ndarray
+            v: np.ndarray
+            if segment is body:
+                r = radius + horz_offset
+                v = vert_offset
+            else:
+                scale: np.ndarray = self.taper_scale(t[segment]).astype(dt, copy=False)
+                r = radius + (horz_offset * scale)
+                v = vert_offset * scale
+            result[:, segment, 0] = r * sin_a[segment]
+            result[:, segment, 1] = r * cos_a[segment]
+            result[:, segment, 2] = (z[segment] + v) + z_offset
+        return result
+
+    def start_points(self, t: np.ndarray, dtype: DType = np.float64) -> np.ndarray:
+        """
+        The points of every helix of every start at every t
+
+        :param t: 1D array of t values between first_t and last_t inclusive
+        :param dtype: The dtype of the points, float32 or float64
+        :returns: An array of shape (starts, len(self), len(t), 3)
+        """
+        return _rotate(self.points(t, dtype), self.rotations)
+
+    def chunks(
+        self, num: int, chunk: int = _CHUNK, dtype: DType = np.float64
+    ) -> Iterator[np.ndarray]:
+        """
+        Generate the points of num evenly spaced t values a chunk of t
+        values at a time, so they are never all in memory.
+
+        :param num: The number of t values from first_t to last_t inclusive
+        :param chunk: The number of t values of each chunk
+        :param dtype: The dtype of the points, float32 or float64
+        :returns: A generator of (len(self), n, 3) arrays, n <= chunk
+        """
+        step: float = (self.last_t - self.first_t) / (num - 1) if num > 1 else 0
+        for lo in range(0, num, chunk):
+            j: np.ndarray = np.arange(lo, min(lo + chunk, num))
+            t: np.ndarray = self.first_t + (j * step)
+            if j[-1] == num - 1:
+                t[-1] = self.last_t
+            yield self.points(t, dtype)
+
+
+def compile_helixes(
+    ht: Helix, helixes: Sequence[HelixLocation], lead: float, starts: int = 1
+) -> HelixEvaluator:
+    """
+    Compute the constants of evaluating helixes of ht.
+
+    :param ht: The basic dimensions of the helixes
+    :param helixes: The HelixLocations, a radius of None is ht.radius
+    :param lead: The distance each helix advances per revolution
+    :param starts: The number of starts
+    :returns: The evaluator of the helixes
+    """
+    if ht.taper_out_rpos > ht.taper_in_rpos:
+        raise ValueError(
+            f"taper_out_rpos:{ht.taper_out_rpos} > taper_in_rpos:{ht.taper_in_rpos}"
+        )
+
+    if ht.taper_out_rpos < 0 or ht.taper_out_rpos > 1:
+        raise ValueError(f"taper_out_rpos:{ht.taper_out_rpos} should be >= 0 and <= 1")
+
+    if ht.taper_in_rpos < 0 or ht.taper_in_rpos > 1:
+        raise ValueError(f"taper_in_rpos:{ht.taper_in_rpos} should be >= 0 and <= 1")
+
+    # These match Helix.helix exactly
+    helix_height: float = ht.height - (2 * ht.inset_offset)
+    turns: float = lead / helix_height if lead != 0 and helix_height != 0 else 1
+    t_range: float = ht.last_t - ht.first_t
+
+    taper_out_range: float = t_range * ht.taper_out_rpos
+    taper_out_ends: float = (
+        ht.first_t + taper_out_range
+        if taper_out_range > 0
+        else min(ht.first_t, ht.last_t)
+    )
+
+    taper_in_range: float = t_range * (1 - ht.taper_in_rpos)
+    taper_in_starts: float = (
+        ht.last_t - taper_in_range if taper_in_range > 0 else max(ht.first_t, ht.last_t)
+    )
+
+    # A taper range of 0 is never used as a divisor
+    return HelixEvaluator(
+        first_t=ht.first_t,
+        last_t=ht.last_t,
+        rel_per_t=1 / t_range if t_range != 0 else 0,
+        taper_out_ends=taper_out_ends,
+        taper_out_per_t=(pi / 2) / (taper_out_range or 1),
+        taper_in_starts=taper_in_starts,
+        taper_in_per_t=(pi / 2) / (taper_in_range or 1),
+        angle_per_rel=2 * pi / turns,
+        z_per_rel=helix_height if lead != 0 else 0,
+        z_offset=ht.inset_offset + (helix_height if lead == 0 else 0),
+        locations=tuple(
+            (
+                float(ht.radius if hl.radius is None else hl.radius),
+                float(hl.horz_offset),
+                float(hl.vert_offset),
+            )
+            for hl in helixes
+        ),
+        starts=starts,
+    )
@@ -0,0 +1,243 @@
+"""
+Export indexed thread meshes as binary PLY, OBJ and 3MF.
+
+Each exporter takes the meshes as a mapping of object name to ThreadMesh,
+typically `thread_meshes(ths)` which is the internal thread as "int" and
+the external thread as "ext", and writes every mesh as a separate object
+of one file. Vertices are written once and shared by the faces. The
+output is written in chunks of _CHUNK vertices or faces so the text of a
+large file is never held in memory.
+"""
+
+import zipfile
+from contextlib import contextmanager
+from typing import IO, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .evaluator import DType, float_dtype
+from .helicalthread import ThreadHelixes
+from .instrumentation import timed
+from .mesh import ThreadMesh, thread_mesh
+
+# The number of vertices or faces written at a time
+_CHUNK: int = 1 << 16
+
+File = Union[str, IO[bytes]]
+
+
+def thread_meshes(
+    ths: ThreadHelixes, num: int = 500, dtype: DType = np.float64
+) -> Dict[str, ThreadMesh]:
+    """
+    Return the meshes of the internal and external threads
+
+    :param ths: The helixes of the threads
+    :param num: The number of rings of each start
+    :param dtype: The dtype of the vertices, float32 or float64
+    :returns: A dict of "int" and "ext" to their meshes
+    """
+    return {
+        "int": thread_mesh(ths, True, num, dtype),
+        "ext": thread_mesh(ths, False, num, dtype),
+    }
+
+
+@contextmanager
+def _open(file: File) -> Iterator[IO[bytes]]:
+    if isinstance(file, str):
+        with open(file, "wb") as f:
+            yield f
+    else:
+        yield file
+
+
+def _chunks(a: np.ndarray) -> Iterator[np.ndarray]:
+    for lo in range(0, len(a), _CHUNK):
+        yield a[lo : lo + _CHUNK]
+
+
+def _format_rows(fmt: str, a: np.ndarray) -> Iterator[bytes]:
+    """Format each row of a with fmt, a chunk at a time"""
+    for chunk in _chunks(a):
+        yield ((fmt * len(chunk)) % tuple(chunk.ravel().tolist())).encode()
+
+
+@timed("export")
+def write_ply(
+    file: File, meshes: Mapping[str, ThreadMesh], dtype: DType = np.float32
+) -> None:
+    """
+    Write the meshes as one binary little endian PLY file. The faces have
+    an object property, the index of their mesh, and the header has a
+    comment naming each object.
+
+    :param file: The path or binary file written
+    :param meshes: The meshes by object name
+    :param dtype: The type of the vertex coordinates, float32 or float64,
+                  vertices of this dtype are written without conversion
+    """
+    names: List[str] = list(meshes)
+    if len(names) > 256:
+        raise ValueError(f"{len(names)} meshes, at most 256 are supported")
+    little: np.dtype = float_dtype(dtype).newbyteorder("<")
+    scalar: str = {4: "float", 8: "double"}[little.itemsize]
+    vertex_count: int = sum(len(m.vertices) for m in meshes.values())
+    face_count: int = sum(len(m.faces) for m in meshes.values())
+
+    header: List[str] = ["ply", "format binary_little_endian 1.0"]
+    header += [f"comment object {i} {name}" for i, name in enumerate(names)]
+    header += [
+        f"element vertex {vertex_count}",
+        f"property {scalar} x",
+        f"property {scalar} y",
+        f"property {scalar} z",
+        f"element face {face_count}",
+        "property list uchar int vertex_indices",
+        "property uchar object",
+        "end_header",
+    ]
+    face_dtype = np.dtype([("n", "u1"), ("v", "<i4", (3,)), ("object", "u1")])
+
+    with _open(file) as f:
+        f.write(("\n".join(header) + "\n").encode())
+        for m in meshes.values():
+            for chunk in _chunks(m.vertices):
+                f.write(chunk.astype(little, copy=False).tobytes())
+        offset: int = 0
+        for i, m in enumerate(meshes.values()):
+            for chunk in _chunks(m.faces):
+                records: np.ndarray = np.empty(len(chunk), dtype=face_dtype)
+                records["n"] = 3
+                records["v"] = chunk + offset
+                records["object"] = i
+                f.write(records.tobytes())
+            offset += len(m.vertices)
+
+
+@timed("export")
+def write_obj(file: File, meshes: Mapping[str, ThreadMesh], digits: int = 9) -> None:
+    """
+    Write the meshes as one OBJ file, each mesh is an object, o name,
+    followed by its vertices and faces.
+
+    :param file: The path or binary file written
+    :param meshes: The meshes by object name
+    :param digits: The significant digits of the coordinates
+    """
+    vertex_fmt: str = f"v %.{digits}g %.{digits}g %.{digits}g\n"
+    with _open(file) as f:
+        offset: int = 1
+        for name, m in meshes.items():
+            f.write(f"o {name}\n".encode())
+            for text in _format_rows(vertex_fmt, m.vertices):
+                f.write(text)
+            for text in _format_rows("f %d %d %d\n", m.faces + offset):
+                f.write(text)
+            offset += len(m.vertices)
+
+
+_CONTENT_TYPES: str = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="model" '
+    'ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>'
+    "</Types>\n"
+)
+
+_RELS: str = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Target="/3D/3dmodel.model" Id="rel0" '
+    'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>'
+    "</Relationships>\n"
+)
+
+MODEL_NAMESPACE: str = "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+
+
+def _xml_attr(value: str) -> str:
+    return (
+        value.replace("&", "&amp;")
+        .replace('"', "&quot;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+    )
+
+
+def _transform_attr(transform: np.ndarray, digits: int) -> str:
+    """
+    The 3MF transform of a 4x4 matrix that transforms column vectors,
+    3MF transforms row vectors so it is the transpose of the top 3 rows
+    """
+    values: List[float] = np.asarray(transform, dtype=float)[:3].T.ravel().tolist()
+    return " ".join(f"{v:.{digits}g}" for v in values)
+
+
+@timed("export")
+def write_3mf(
+    file: File,
+    meshes: Mapping[str, ThreadMesh],
+    unit: str = "millimeter",
+    digits: int = 9,
+    components: Optional[Sequence[Tuple[str, np.ndarray]]] = None,
+) -> None:
+    """
+    Write the meshes as a 3MF package, each mesh is an object of the model
+    and an item of its build.
+
+    With components the build is instead one object of a component for
+    each (name, transform), the mesh of that name placed by the 4x4
+    transform, so every mesh is written once however often it is used.
+
+    :param file: The path or binary file written
+    :param meshes: The meshes by object name
+    :param unit: The unit of the coordinates
+    :param digits: The significant digits of the coordinates
+    :param components: The instances of the meshes
+    """
+    vertex_fmt: str = f'<vertex x="%.{digits}g" y="%.{digits}g" z="%.{digits}g"/>\n'
+    with zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        z.writestr("_rels/.rels", _RELS)
+        with z.open("3D/3dmodel.model", "w", force_zip64=True) as f:
+            f.write(
+                (
+                    '<?xml version="1.0" encoding="UTF-8"?>\n'
+                    f'<model unit="{unit}" xml:lang="en-US" '
+                    f'xmlns="{MODEL_NAMESPACE}">\n<resources>\n'
+                ).encode()
+            )
+            for i, (name, m) in enumerate(meshes.items(), start=1):
+                f.write(
+                    f'<object id="{i}" type="model" name="{_xml_attr(name)}">\n'
+                    "<mesh>\n<vertices>\n".encode()
+                )
+                for text in _format_rows(vertex_fmt, m.vertices):
+                    f.write(text)
+                f.write(b"</vertices>\n<triangles>\n")
+                for text in _format_rows(
+                    '<triangle v1="%d" v2="%d" v3="%d"/>\n', m.faces
+                ):
+                    f.write(text)
+                f.write(b"</triangles>\n</mesh>\n</object>\n")
+            if components is None:
+                f.write(b"</resources>\n<build>\n")
+                for i in range(1, len(meshes) + 1):
+                    f.write(f'<item objectid="{i}"/>\n'.encode())
+            else:
+                ids: Dict[str, int] = {name: i for i, name in enumerate(meshes, 1)}
+                assembly: int = len(meshes) + 1
+                f.write(
+                    f'<object id="{assembly}" type="model">\n<components>\n'.encode()
+                )
+                for name, transform in components:
+                    f.write(
+                        f'<component objectid="{ids[name]}" '
+                        f'transform="{_transform_attr(transform, digits)}"/>\n'.encode()
+                    )
+                f.write(b"</components>\n</object>\n</resources>\n<build>\n")
+                f.write(f'<item objectid="{assembly}"/>\n'.encode())
+            f.write(b"</build>\n</model>\n")
@@ -0,0 +1,431 @@
+"""
+ISO and UTS tolerance class envelopes.
+
+For a nominal size, pitch and tolerance class, such as 6H or 6g for ISO
+metric threads and 2B or 2A for UTS threads, the deviations of the pitch
+and crest diameters are computed from the formulas of ISO 965-1 and
+ASME B1.1 and turned into the HelicalThread parameters of the maximum
+and minimum material envelopes. The envelopes of a whole catalog are
+computed at once with `helical_thread_batch`.
+
+Internal threads shift radius by the pitch diameter deviation and set
+minor_cutoff so the minor diameter, the crest of the internal thread,
+has its deviation. External threads keep the basic radius and use
+ext_clearance to shift the flanks by the pitch diameter deviation, their
+crest follows the profile so only internal threads have a crest
+diameter tolerance.
+"""
+
+import re
+from dataclasses import dataclass
+from math import sqrt
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .batch import HelicalThreadBatch, ThreadHelixesBatch, helical_thread_batch
+from .helicalthread import ThreadHelixes
+from .instrumentation import timed
+
+# The ISO 261 coarse pitch of each nominal diameter in mm
+ISO_COARSE_PITCH: Dict[float, float] = {
+    1: 0.25,
+    1.2: 0.25,
+    1.4: 0.3,
+    1.6: 0.35,
+    2: 0.4,
+    2.5: 0.45,
+    3: 0.5,
+    3.5: 0.6,
+    4: 0.7,
+    5: 0.8,
+    6: 1,
+    8: 1.25,
+    10: 1.5,
+    12: 1.75,
+    14: 2,
+    16: 2,
+    18: 2.5,
+    20: 2.5,
+    22: 2.5,
+    24: 3,
+    27: 3,
+    30: 3.5,
+    33: 3.5,
+    36: 4,
+    39: 4,
+    42: 4.5,
+    45: 4.5,
+    48: 5,
+    52: 5,
+    56: 5.5,
+    60: 5.5,
+    64: 6,
+}
+
+# The UNC threads per inch of each nominal diameter in inches
+UNC_TPI: Dict[float, float] = {
+    0.073: 64,
+    0.086: 56,
+    0.099: 48,
+    0.112: 40,
+    0.125: 40,
+    0.138: 32,
+    0.164: 32,
+    0.190: 24,
+    0.216: 24,
+    0.250: 20,
+    0.3125: 18,
+    0.375: 16,
+    0.4375: 14,
+    0.500: 13,
+    0.5625: 12,
+    0.625: 11,
+    0.750: 10,
+    0.875: 9,
+    1.000: 8,
+}
+
+# The ISO 965-1 diameter ranges in mm, the tolerances use the geometric
+# mean of the range containing the nominal diameter.
+ISO_DIAMETER_RANGES: Tuple[float, ...] = (
+    0.99,
+    1.4,
+    2.8,
+    5.6,
+    11.2,
+    22.4,
+    45,
+    90,
+    180,
+    355,
+    600,
+)
+
+# ISO 965-1 fundamental deviations in micrometers, a + (b * pitch), of
+# each tolerance position. Positive for internal and negative for
+# external threads.
+ISO_FUNDAMENTAL_DEVIATION: Dict[str, Tuple[float, float]] = {
+    "E": (50, 11),
+    "F": (30, 11),
+    "G": (15, 11),
+    "H": (0, 0),
+    "e": (50, 11),
+    "f": (30, 11),
+    "g": (15, 11),
+    "h": (0, 0),
+}
+
+# ISO 965-1 tolerance of each grade relative to grade 6
+ISO_GRADE_FACTOR: Dict[int, float] = {
+    3: 0.5,
+    4: 0.63,
+    5: 0.8,
+    6: 1,
+    7: 1.25,
+    8: 1.6,
+    9: 2,
+}
+
+# ASME B1.1 pitch diameter tolerance of each class relative to class 2A
+UTS_CLASS_FACTOR: Dict[str, float] = {
+    "1A": 1.5,
+    "2A": 1,
+    "3A": 0.75,
+    "1B": 1.95,
+    "2B": 1.3,
+    "3B": 0.975,
+}
+
+# The basic pitch and minor diameters are the nominal diameter less these
+# fractions of the pitch, ISO 68-1.
+PITCH_DIAMETER_DEPTH: float = 3 * sqrt(3) / 8
+MINOR_DIAMETER_DEPTH: float = 5 * sqrt(3) / 8
+
+_ISO_CLASS = re.compile(r"^([3-9])([EFGHefgh])(?:([3-9])([EFGHefgh]))?$")
+_UTS_CLASS = re.compile(r"^([123])([AB])$")
+
+
+@dataclass
+class ToleranceClass:
+    """A parsed tolerance class such as 6g, 5H6H or 2A"""
+
+    internal: bool
+    """True for an internal thread"""
+
+    standard: str
+    """iso or uts"""
+
+    pitch_factor: float
+    """The pitch diameter tolerance relative to grade 6 or class 2A"""
+
+    crest_factor: float
+    """
+    The crest diameter tolerance relative to grade 6 or class 2A, only
+    internal threads use it
+    """
+
+    deviation: Tuple[float, float]
+    """The ISO fundamental deviation in micrometers, a + (b * pitch)"""
+
+    allowance: bool
+    """True for UTS classes 1A and 2A which have an allowance"""
+
+    @classmethod
+    def parse(cls, tolerance_class: str) -> "ToleranceClass":
+        """
+        Parse an ISO class such as 6g or 5H6H, pitch diameter tolerance
+        first then crest diameter, or a UTS class such as 2A or 3B.
+
+        :param tolerance_class: The tolerance class
+        :returns: The parsed tolerance class
+        """
+        m = _ISO_CLASS.match(tolerance_class)
+        if m is not None:
+            pitch_grade, pitch_pos, crest_grade, crest_pos = m.groups()
+            if crest_pos is not None and crest_pos != pitch_pos:
+                raise ValueError(f"{tolerance_class}: positions must be the same")
+            return cls(
+                internal=pitch_pos.isupper(),
+                standard="iso",
+                pitch_factor=ISO_GRADE_FACTOR[int(pitch_grade)],
+                crest_factor=ISO_GRADE_FACTOR[int(crest_grade or pitch_grade)],
+                deviation=ISO_FUNDAMENTAL_DEVIATION[pitch_pos],
+                allowance=False,
+            )
+        m = _UTS_CLASS.match(tolerance_class)
+        if m is not None:
+            return cls(
+                internal=m.group(2) == "B",
+                standard="uts",
+                pitch_factor=UTS_CLASS_FACTOR[tolerance_class],
+                crest_factor=1.5 if tolerance_class == "1A" else 1,
+                deviation=(0, 0),
+                allowance=tolerance_class in ("1A", "2A"),
+            )
+        raise ValueError(f"{tolerance_class}: is not an ISO or UTS tolerance class")
+
+
+def coarse_pitch(size: float, standard: str = "iso") -> float:
+    """
+    Return the ISO coarse pitch in mm or the UNC pitch in inches of size
+
+    :param size: The nominal diameter
+    :param standard: iso or uts
+    :returns: The pitch
+    """
+    if standard == "iso":
+        return ISO_COARSE_PITCH[size]
+    elif standard == "uts":
+        return 1 / UNC_TPI[size]
+    raise ValueError(f"standard:{standard} should be iso or uts")
+
+
+@dataclass
+class FitClassEnvelopes:
+    """
+    The maximum and minimum material envelopes of a catalog of threads,
+    the result of `fit_class_envelopes`. Use int_helixes of the internal
+    and ext_helixes of the external entries.
+    """
+
+    internal: np.ndarray
+    """True for each entry that is an internal thread"""
+
+    max_material: ThreadHelixesBatch
+    """The maximum material envelope of each entry"""
+
+    min_material: ThreadHelixesBatch
+    """The minimum material envelope of each entry"""
+
+    def __len__(self) -> int:
+        return len(self.internal)
+
+    def thread_helixes(self, i: int) -> Tuple[ThreadHelixes, ThreadHelixes]:
+        """
+        Return the maximum and minimum material envelopes of the i'th entry
+
+        :param i: The index of the entry
+        :returns: A tuple of the maximum and minimum material ThreadHelixes
+        """
+        return (
+            self.max_material.thread_helixes(i),
+            self.min_material.thread_helixes(i),
+        )
+
+
+def _deviations(
+    size: np.ndarray,
+    pitch: np.ndarray,
+    classes: List[ToleranceClass],
+    inverse: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Return the fundamental deviation, the pitch diameter tolerance and the
+    crest diameter tolerance of every entry in the units of size. The
+    tolerance class of entry i is classes[inverse[i]].
+
+    The crest tolerance is that of the minor diameter of internal threads,
+    it is 0 for external threads whose major diameter follows their
+    profile, see `fit_class_envelopes`.
+    """
+    internal: np.ndarray = np.array([c.internal for c in classes])[inverse]
+    iso: np.ndarray = np.array([c.standard == "iso" for c in classes])[inverse]
+    pitch_factor: np.ndarray = np.array([c.pitch_factor for c in classes])[inverse]
+    crest_factor: np.ndarray = np.array([c.crest_factor for c in classes])[inverse]
+    dev_a, dev_b = np.array([c.deviation for c in classes])[inverse].T
+    allowance: np.ndarray = np.array([c.allowance for c in classes])[inverse]
+
+    # ISO 965-1, in micrometers
+    bounds: np.ndarray = np.array(ISO_DIAMETER_RANGES)
+    idx: np.ndarray = np.clip(np.searchsorted(bounds, size), 1, len(bounds) - 1)
+    range_mean: np.ndarray = np.sqrt(bounds[idx - 1] * bounds[idx])
+    iso_td2: np.ndarray = 90 * (pitch**0.4) * (range_mean**0.1)
+    iso_pitch_tol: np.ndarray = (
+        np.where(internal, 1.32, 1) * pitch_factor * iso_td2 / 1000
+    )
+    iso_minor_tol: np.ndarray = np.where(
+        pitch < 1, (433 * pitch) - (190 * (pitch**1.22)), 230 * (pitch**0.7)
+    )
+    iso_crest_tol: np.ndarray = crest_factor * iso_minor_tol / 1000
+    iso_dev: np.ndarray = np.where(internal, 1, -1) * (dev_a + (dev_b * pitch)) / 1000
+
+    # ASME B1.1, in inches
+    uts_td2: np.ndarray = (
+        (0.0015 * np.cbrt(size))
+        + (0.0015 * np.sqrt(9 * pitch))
+        + (0.015 * (pitch ** (2 / 3)))
+    )
+    uts_minor_tol: np.ndarray = np.clip(
+        (0.05 * (pitch ** (2 / 3))) + (0.03 * pitch / size) - 0.002,
+        0.12 * pitch,
+        (0.25 * pitch) - (0.4 * pitch * pitch),
+    )
+    uts_dev: np.ndarray = np.where(allowance, -0.3 * uts_td2, 0)
+
+    return (
+        np.where(iso, iso_dev, uts_dev),
+        np.where(iso, iso_pitch_tol, pitch_factor * uts_td2),
+        np.where(internal, np.where(iso, iso_crest_tol, uts_minor_tol), 0),
+    )
+
+
+@timed("fit_class_envelopes")
+def fit_class_envelopes(
+    size: Union[float, Sequence[float], np.ndarray],
+    pitch: Optional[Union[float, Sequence[float], np.ndarray]],
+    tolerance_class: Union[str, Sequence[str]],
+    height: Union[float, Sequence[float], np.ndarray],
+    angle_degs: float = 60,
+    **kwargs: Union[float, Sequence[float], np.ndarray],
+) -> FitClassEnvelopes:
+    """
+    Compute the maximum and minimum material envelopes of a catalog of
+    threads. Each argument is either a single value used for every entry
+    or a sequence with one value per entry.
+
+    :param size: The nominal (major) diameter
+    :param pitch: The pitch, if None the ISO coarse or UNC pitch of size
+    :param tolerance_class: ISO tolerance classes such as 6H or 6g, or
+                            UTS classes such as 2B or 2A
+    :param height: The height of the threads
+    :param angle_degs: The included angle of the thread
+    :param kwargs: Other HelicalThread fields such as inset_offset,
+                   taper_out_rpos and thread_overlap
+    :returns: The envelopes of every entry
+    """
+    codes, inverse = np.unique(
+        np.asarray(tolerance_class, dtype=str), return_inverse=True
+    )
+    classes: List[ToleranceClass] = [ToleranceClass.parse(str(c)) for c in codes]
+    values: Dict[str, Any] = dict(
+        kwargs, tolerance_class=inverse, size=size, height=height, pitch=pitch
+    )
+    lengths: Dict[str, int] = {
+        k: np.size(v) for k, v in values.items() if np.ndim(v) > 0
+    }
+    n: int = max(lengths.values(), default=1)
+    mismatched: Dict[str, int] = {k: v for k, v in lengths.items() if v not in (1, n)}
+    if mismatched or any(np.ndim(v) > 1 for v in values.values()):
+        raise ValueError(
+            f"{lengths} should be one value or a sequence of {n} values per entry"
+        )
+    inverse = np.broadcast_to(inverse, (n,))
+    internal: np.ndarray = np.array([c.internal for c in classes])[inverse]
+
+    sizes: np.ndarray = np.broadcast_to(np.asarray(size, dtype=float), (n,))
+    pitches: np.ndarray
+    if pitch is None:
+        # Look up the pitch of each distinct size of each standard
+        standard: np.ndarray = np.array([c.standard for c in classes])[inverse]
+        pitches = np.empty(n)
+        for std in ("iso", "uts"):
+            mask: np.ndarray = standard == std
+            distinct, where = np.unique(sizes[mask], return_inverse=True)
+            pitches[mask] = np.array([coarse_pitch(s, std) for s in distinct])[where]
+    else:
+        pitches = np.broadcast_to(np.asarray(pitch, dtype=float), (n,))
+
+    deviation, pitch_tol, crest_tol = _deviations(sizes, pitches, classes, inverse)
+
+    hangle: float = np.radians(angle_degs) / 2
+    major_cutoff: np.ndarray = pitches / 8
+    minor_diameter: np.ndarray = sizes - (MINOR_DIAMETER_DEPTH * pitches)
+
+    def envelope(pitch_dev: np.ndarray, crest_dev: np.ndarray) -> ThreadHelixesBatch:
+        # Internal: the radius moves with the pitch diameter and the minor
+        # cutoff makes the thread depth reach the minor diameter.
+        radius: np.ndarray = np.where(internal, (sizes + pitch_dev) / 2, sizes / 2)
+        depth: np.ndarray = radius - ((minor_diameter + crest_dev) / 2)
+        minor_cutoff: np.ndarray = np.where(
+            internal,
+            np.clip(
+                (pitches - major_cutoff) - (2 * depth * np.tan(hangle)),
+                0,
+                pitches - major_cutoff,
+            ),
+            pitches / 4,
+        )
+
+        # External: the flanks move pitch_dev / 2 radially which is
+        # ext_clearance / sin(hangle), see hyp in helical_thread.
+        ext_clearance: np.ndarray = np.where(
+            internal, 0, -pitch_dev * np.sin(hangle) / 2
+        )
+        return helical_thread_batch(
+            HelicalThreadBatch(
+                radius=radius,
+                pitch=pitches,
+                height=np.asarray(height, dtype=float),
+                angle_degs=np.asarray(angle_degs, dtype=float),
+                major_cutoff=major_cutoff,
+                minor_cutoff=minor_cutoff,
+                ext_clearance=ext_clearance,
+                **{
+                    k: np.broadcast_to(np.asarray(v, dtype=float), (n,))
+                    for k, v in kwargs.items()
+                },
+            )
+        )
+
+    # Maximum material is the smallest internal and the largest external
+    # thread, the tolerances move towards minimum material.
+    direction: np.ndarray = np.where(internal, 1, -1)
+    return FitClassEnvelopes(
+        internal=internal,
+        max_material=envelope(deviation, deviation),
+        min_material=envelope(
+            deviation + (direction * pitch_tol), deviation + (direction * crest_tol)
+        ),
+    )
+
+
+def pitch_diameter(size: float, pitch: float) -> float:
+    """
+    Return the basic pitch diameter of a thread
+
+    :param size: The nominal (major) diameter
+    :param pitch: The pitch
+    :returns: The basic pitch diameter
+    """
+    return size - (PITCH_DIAMETER_DEPTH * pitch)
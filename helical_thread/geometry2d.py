@@ -0,0 +1,284 @@
+"""
+Vectorized 2D geometry of batches of polygons such as thread profiles.
+
+A batch of B polygons is a (B, K, 2) array of points with a (B, K) mask
+of the valid points, polygons with fewer than K points are padded. The
+operations of the scalar toolkit in tests/utils.py, `split_2d`,
+`intersectionLines_2d`, `lineToPtDirection_2d` and
+`perpendicular_distance_pt_to_line_2d`, are computed here for all of the
+points and polygons at once with the same arithmetic, so they return the
+same values.
+
+The distance and crossing kernels take fixed size convex polygons whose
+short polygons repeat their last point, see `pad_polygons`, the repeated
+points are zero length edges which don't change the results.
+"""
+
+import sys
+from typing import Tuple
+
+import numpy as np
+
+
+def compact(polygons: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Move the valid points of each polygon to its front, in order.
+
+    :param polygons: (B, K, 2) points
+    :param mask: (B, K) True for the valid points
+    :returns: A tuple of the (B, K, 2) points and the (B, K) mask of the
+              valid points, now a prefix of each polygon
+    """
+    order: np.ndarray = np.argsort(~mask, axis=1, kind="stable")
+    counts: np.ndarray = np.count_nonzero(mask, axis=1)
+    return (
+        np.take_along_axis(polygons, order[:, :, np.newaxis], axis=1),
+        np.arange(mask.shape[1]) < counts[:, np.newaxis],
+    )
+
+
+def pad_polygons(polygons: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Compact the polygons and fill the points after the last valid point
+    of each polygon with it, polygons without valid points are NaN.
+
+    :param polygons: (B, K, 2) points
+    :param mask: (B, K) True for the valid points
+    :returns: (B, K, 2) points
+    """
+    points, valid = compact(polygons, mask)
+    last: np.ndarray = np.maximum(np.count_nonzero(valid, axis=1) - 1, 0)
+    index: np.ndarray = np.minimum(np.arange(valid.shape[1]), last[:, np.newaxis])
+    result: np.ndarray = np.take_along_axis(points, index[:, :, np.newaxis], axis=1)
+    result[~np.any(valid, axis=1)] = np.nan
+    return result
+
+
+def cross(
+    ox: np.ndarray,
+    oy: np.ndarray,
+    ax: np.ndarray,
+    ay: np.ndarray,
+    bx: np.ndarray,
+    by: np.ndarray,
+) -> np.ndarray:
+    """The z component of (a - o) x (b - o)"""
+    return ((ax - ox) * (by - oy)) - ((ay - oy) * (bx - ox))
+
+
+def line_side(
+    line_pt1: np.ndarray, line_pt2: np.ndarray, pts: np.ndarray
+) -> np.ndarray:
+    """
+    The side of the line through line_pt1 and line_pt2 each point is on,
+    > 0 above, < 0 below and 0 on the line. The arrays broadcast, see
+    `lineToPtDirection_2d`.
+
+    :param line_pt1: (..., 2) first points of the lines
+    :param line_pt2: (..., 2) second points of the lines
+    :param pts: (..., 2) points
+    :returns: (...) cross products of the line and the points
+    """
+    line_pt1 = np.asarray(line_pt1, dtype=float)
+    line_pt2 = np.asarray(line_pt2, dtype=float)
+    pts = np.asarray(pts, dtype=float)
+    return (
+        (line_pt2[..., 0] - line_pt1[..., 0]) * (pts[..., 1] - line_pt1[..., 1])
+    ) - ((line_pt2[..., 1] - line_pt1[..., 1]) * (pts[..., 0] - line_pt1[..., 0]))
+
+
+def intersect_lines(
+    line1_pt1: np.ndarray,
+    line1_pt2: np.ndarray,
+    line2_pt1: np.ndarray,
+    line2_pt2: np.ndarray,
+) -> np.ndarray:
+    """
+    The intersection of pairs of lines, each through two points, the
+    arrays broadcast. Parallel lines intersect at (sys.float_info.max,
+    sys.float_info.max), see `intersectionLines_2d`.
+
+    :returns: (..., 2) intersections
+    """
+    line1_pt1 = np.asarray(line1_pt1, dtype=float)
+    line1_pt2 = np.asarray(line1_pt2, dtype=float)
+    line2_pt1 = np.asarray(line2_pt1, dtype=float)
+    line2_pt2 = np.asarray(line2_pt2, dtype=float)
+
+    # Line1 (a1 * x) + (b1 * y) = c1
+    a1: np.ndarray = line1_pt2[..., 1] - line1_pt1[..., 1]
+    b1: np.ndarray = line1_pt1[..., 0] - line1_pt2[..., 0]
+    c1: np.ndarray = (a1 * line1_pt1[..., 0]) + (b1 * line1_pt1[..., 1])
+
+    # Line2 (a2 * x) + (b2 * y) = c2
+    a2: np.ndarray = line2_pt2[..., 1] - line2_pt1[..., 1]
+    b2: np.ndarray = line2_pt1[..., 0] - line2_pt2[..., 0]
+    c2: np.ndarray = (a2 * line2_pt1[..., 0]) + (b2 * line2_pt1[..., 1])
+
+    determinant: np.ndarray = (a1 * b2) - (a2 * b1)
+    parallel: np.ndarray = determinant == 0
+    divisor: np.ndarray = np.where(parallel, 1, determinant)
+    result: np.ndarray = np.stack(
+        (((b2 * c1) - (b1 * c2)) / divisor, ((a1 * c2) - (a2 * c1)) / divisor), -1
+    )
+    result[parallel] = sys.float_info.max
+    return result
+
+
+def line_distance(
+    pts: np.ndarray, line_pt1: np.ndarray, line_pt2: np.ndarray
+) -> np.ndarray:
+    """
+    The perpendicular distance of points to the lines through line_pt1
+    and line_pt2, the arrays broadcast, see
+    `perpendicular_distance_pt_to_line_2d`.
+
+    :param pts: (..., 2) points
+    :param line_pt1: (..., 2) first points of the lines
+    :param line_pt2: (..., 2) second points of the lines
+    :returns: (...) distances
+    """
+    pts = np.asarray(pts, dtype=float)
+    line_pt1 = np.asarray(line_pt1, dtype=float)
+    line_pt2 = np.asarray(line_pt2, dtype=float)
+    ydist: np.ndarray = line_pt2[..., 1] - line_pt1[..., 1]
+    xdist: np.ndarray = line_pt2[..., 0] - line_pt1[..., 0]
+    line_cross: np.ndarray = (line_pt2[..., 0] * line_pt1[..., 1]) - (
+        line_pt2[..., 1] * line_pt1[..., 0]
+    )
+    n: np.ndarray = np.abs(((ydist * pts[..., 0]) - (xdist * pts[..., 1])) + line_cross)
+    return n / np.sqrt((ydist * ydist) + (xdist * xdist))
+
+
+def split_polygons(
+    polygons: np.ndarray,
+    mask: np.ndarray,
+    line_pt1: np.ndarray,
+    line_pt2: np.ndarray,
+    above: bool = True,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Clip closed polygons by lines keeping the points above, or below,
+    each line and adding the points where the edges cross it, see
+    `split_2d`.
+
+    :param polygons: (B, K, 2) points
+    :param mask: (B, K) True for the valid points
+    :param line_pt1: (2,) or (B, 2) first points of the lines
+    :param line_pt2: (2,) or (B, 2) second points of the lines
+    :param above: True to keep the points on or above the lines, False
+                  on or below
+    :returns: A tuple of the (B, 2 * K, 2) points of the clipped polygons,
+              NaN where not valid, and the (B, 2 * K) mask of the valid
+              points
+    """
+    points, valid = compact(np.asarray(polygons, dtype=float), mask)
+    batch, size, _ = points.shape
+    p1: np.ndarray = np.broadcast_to(np.asarray(line_pt1, dtype=float), (batch, 2))
+    p2: np.ndarray = np.broadcast_to(np.asarray(line_pt2, dtype=float), (batch, 2))
+    p1 = p1[:, np.newaxis, :]
+    p2 = p2[:, np.newaxis, :]
+
+    # The previous point of the first point is the last valid point
+    i: np.ndarray = np.arange(size)
+    counts: np.ndarray = np.count_nonzero(valid, axis=1)
+    prev_index: np.ndarray = np.where(i == 0, counts[:, np.newaxis] - 1, i - 1)
+    prev: np.ndarray = np.take_along_axis(
+        points, np.maximum(prev_index, 0)[:, :, np.newaxis], axis=1
+    )
+
+    cur_dir: np.ndarray = line_side(p1, p2, points)
+    prev_dir: np.ndarray = line_side(p1, p2, prev)
+    crosses: np.ndarray = valid & (
+        ((cur_dir > 0) & (prev_dir < 0)) | ((cur_dir < 0) & (prev_dir > 0))
+    )
+    keep: np.ndarray = valid & ((cur_dir >= 0) if above else (cur_dir <= 0))
+
+    # Each point is preceded by the intersection of its edge from the
+    # previous point when the edge crosses the line
+    out: np.ndarray = np.stack((intersect_lines(p1, p2, points, prev), points), 2)
+    out_mask: np.ndarray = np.stack((crosses, keep), 2).reshape(batch, 2 * size)
+    result, result_mask = compact(out.reshape(batch, 2 * size, 2), out_mask)
+    result[~result_mask] = np.nan
+    return (result, result_mask)
+
+
+def signed_distance(verts: np.ndarray, polys: np.ndarray) -> np.ndarray:
+    """
+    The signed distance of each vertex to the boundary of a polygon,
+    negative if the vertex is strictly inside the convex polygon.
+
+    :param verts: (N, V, 2) vertices
+    :param polys: (N, S, 2) convex polygons
+    :returns: (N, V) signed distances
+    """
+    px: np.ndarray = np.ascontiguousarray(verts[:, :, 0])[:, :, np.newaxis]
+    py: np.ndarray = np.ascontiguousarray(verts[:, :, 1])[:, :, np.newaxis]
+    ax: np.ndarray = np.ascontiguousarray(polys[:, :, 0])[:, np.newaxis, :]
+    ay: np.ndarray = np.ascontiguousarray(polys[:, :, 1])[:, np.newaxis, :]
+    bx: np.ndarray = np.roll(ax, -1, axis=2)
+    by: np.ndarray = np.roll(ay, -1, axis=2)
+
+    abx: np.ndarray = bx - ax
+    aby: np.ndarray = by - ay
+    apx: np.ndarray = px - ax
+    apy: np.ndarray = py - ay
+    len2: np.ndarray = (abx * abx) + (aby * aby)
+    u: np.ndarray = np.clip(
+        ((apx * abx) + (apy * aby)) / np.where(len2 > 0, len2, 1), 0, 1
+    )
+    dx: np.ndarray = apx - (u * abx)
+    dy: np.ndarray = apy - (u * aby)
+    dist: np.ndarray = np.sqrt(np.min((dx * dx) + (dy * dy), axis=2))
+
+    # Strictly inside if on the interior side of every non degenerate edge
+    area2: np.ndarray = np.sum((ax * by) - (ay * bx), axis=2)
+    side: np.ndarray = ((abx * apy) - (aby * apx)) * np.sign(area2)[..., np.newaxis]
+    inside: np.ndarray = np.all((side > 0) | (len2 == 0), axis=2) & (area2 != 0)
+    return np.where(inside, -dist, dist)
+
+
+def edges_cross(polys1: np.ndarray, polys2: np.ndarray) -> np.ndarray:
+    """
+    True where an edge of polys1 properly crosses an edge of polys2.
+
+    :param polys1: (N, S, 2) polygons
+    :param polys2: (N, S, 2) polygons
+    :returns: (N,) booleans
+    """
+    nxt1: np.ndarray = np.roll(polys1, -1, axis=1)
+    nxt2: np.ndarray = np.roll(polys2, -1, axis=1)
+    ax, ay = polys1[:, :, np.newaxis, 0], polys1[:, :, np.newaxis, 1]
+    bx, by = nxt1[:, :, np.newaxis, 0], nxt1[:, :, np.newaxis, 1]
+    cx, cy = polys2[:, np.newaxis, :, 0], polys2[:, np.newaxis, :, 1]
+    dx, dy = nxt2[:, np.newaxis, :, 0], nxt2[:, np.newaxis, :, 1]
+    crosses: np.ndarray = (
+        (cross(ax, ay, bx, by, cx, cy) * cross(ax, ay, bx, by, dx, dy)) < 0
+    ) & ((cross(cx, cy, dx, dy, ax, ay) * cross(cx, cy, dx, dy, bx, by)) < 0)
+    return np.any(crosses, axis=(1, 2))
+
+
+def vertical_gap(verts: np.ndarray, polys: np.ndarray) -> np.ndarray:
+    """
+    The signed distance each polygon of verts can move up before it
+    touches the polygon of polys above it, i.e. the minimum over the
+    vertices of (z of an edge of polys - z of the vertex) where the edge
+    spans the vertex radially. inf if no edge spans a vertex.
+
+    :param verts: (N, V, 2) (r, z) vertices
+    :param polys: (N, S, 2) (r, z) convex polygons
+    :returns: (N,) gaps
+    """
+    pr: np.ndarray = np.ascontiguousarray(verts[:, :, 0])[:, :, np.newaxis]
+    pz: np.ndarray = np.ascontiguousarray(verts[:, :, 1])[:, :, np.newaxis]
+    ar: np.ndarray = np.ascontiguousarray(polys[:, :, 0])[:, np.newaxis, :]
+    az: np.ndarray = np.ascontiguousarray(polys[:, :, 1])[:, np.newaxis, :]
+    br: np.ndarray = np.roll(ar, -1, axis=2)
+    bz: np.ndarray = np.roll(az, -1, axis=2)
+
+    dr: np.ndarray = br - ar
+    spans: np.ndarray = (
+        (dr != 0) & (pr >= np.minimum(ar, br)) & (pr <= np.maximum(ar, br))
+    )
+    z_edge: np.ndarray = az + ((pr - ar) * (bz - az) / np.where(dr != 0, dr, 1))
+    return np.min(np.where(spans, z_edge - pz, np.inf), axis=(1, 2))
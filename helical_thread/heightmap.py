@@ -0,0 +1,270 @@
+"""
+Unrolled radius maps of threads for inspection images.
+
+The surface of a thread is a function r(angle, z). At an angle the
+cross section of the thread in the (r, z) half plane is its profile at
+every turn of every start, scaled toward its helix by the taper. The
+surface radius is the smallest radius of the material of an internal
+thread, the hole, or the largest of an external thread, the bolt, and
+the radius of its root where there is no profile.
+
+Between the tapers every profile is the same and spaced a pitch apart,
+so the surface radius of those rows depends only on the phase of z
+relative to the helix at the angle, see `ProfileTable`, and is one
+interpolation of the crest of the profile per pixel. A pixel is within
+at most one profile whichever row it is in, so the rows near the tapers
+and ends also look up the taper scale of that profile, its turn and
+start follow from the phase, and scale the crest by it.
+
+The maps are arrays or written as 16-bit grayscale PNG images.
+"""
+
+import struct
+import zlib
+from dataclasses import dataclass
+from math import pi
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .evaluator import DType, float_dtype
+from .export import File, _open
+from .helicalthread import ThreadHelixes
+from .instrumentation import count, timed
+
+# Number of rows processed at a time
+_CHUNK: int = 256
+
+_PNG_SIGNATURE: bytes = b"\x89PNG\r\n\x1a\n"
+
+
+@dataclass
+class RadiusMap:
+    """The result of `radius_map`"""
+
+    radii: np.ndarray
+    """(Z, A) the surface radius at each z and angle"""
+
+    angles: np.ndarray
+    """(A,) the angle of each column, atan2(y, x) from 0 to 2 * pi exclusive"""
+
+    z: np.ndarray
+    """(Z,) the z of each row"""
+
+    root_radius: float
+    """The radius of the root, where there is no thread"""
+
+    def to_uint16(
+        self, r_min: Optional[float] = None, r_max: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Scale the radii to 16-bit values, r_min is 0 and r_max is 65535.
+
+        :param r_min: The radius of 0, default the smallest radius
+        :param r_max: The radius of 65535, default the largest radius
+        :returns: (Z, A) uint16 values
+        """
+        lo: float = float(self.radii.min()) if r_min is None else r_min
+        hi: float = float(self.radii.max()) if r_max is None else r_max
+        scale: float = 65535 / (hi - lo) if hi > lo else 0
+        values: np.ndarray = (self.radii - lo) * scale
+        return np.clip(np.rint(values), 0, 65535).astype(np.uint16)
+
+    def write_png(
+        self,
+        file: File,
+        r_min: Optional[float] = None,
+        r_max: Optional[float] = None,
+        level: int = 6,
+    ) -> None:
+        """
+        Write the map as a 16-bit grayscale PNG, see `to_uint16`. The
+        first row of the image is the first z.
+
+        :param file: The path or binary file written
+        :param r_min: The radius of black
+        :param r_max: The radius of white
+        :param level: The zlib compression level
+        """
+        write_png(file, self.to_uint16(r_min, r_max), level)
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    )
+
+
+@timed("export")
+def write_png(file: File, image: np.ndarray, level: int = 6) -> None:
+    """
+    Write a 2D uint16 array as a 16-bit grayscale PNG. Each row is
+    written with the Up filter, the difference from the row above, which
+    compresses smooth images well.
+
+    :param file: The path or binary file written
+    :param image: (height, width) values
+    :param level: The zlib compression level
+    """
+    image = np.asarray(image)
+    if image.ndim != 2 or image.dtype != np.uint16:
+        raise ValueError(f"image:{image.dtype}{image.shape} should be 2D uint16")
+    height, width = image.shape
+    raw: np.ndarray = image.astype(">u2").view(np.uint8).reshape(height, width * 2)
+    rows: np.ndarray = np.empty((height, (width * 2) + 1), dtype=np.uint8)
+    rows[:, 0] = 2
+    rows[:, 1:] = raw
+    rows[1:, 1:] -= raw[:-1]
+    with _open(file) as f:
+        f.write(_PNG_SIGNATURE)
+        f.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 16, 0, 0, 0, 0)))
+        f.write(_chunk(b"IDAT", zlib.compress(rows.tobytes(), level)))
+        f.write(_chunk(b"IEND", b""))
+
+
+def _crest(
+    columns: np.ndarray, scale: float, internal: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The crest of a convex profile, the smallest or largest r at each z
+    where z crosses its edges, scaled by the taper. It is linear between
+    the vert_offsets so it is returned at each of them.
+
+    :param columns: (V, 3) radius, horz_offset and vert_offset of each helix
+    :param scale: The taper scale of the horz_offsets
+    :returns: A tuple of the sorted vert_offsets and the crest at each
+    """
+    vertices: np.ndarray = np.unique(columns[:, 2])
+    p0: np.ndarray = np.stack(
+        (columns[:, 0] + (columns[:, 1] * scale), columns[:, 2]), axis=-1
+    )
+    p1: np.ndarray = np.roll(p0, -1, axis=0)
+    z0: np.ndarray = p0[:, 1]
+    z1: np.ndarray = p1[:, 1]
+    dz: np.ndarray = z1 - z0
+    zz: np.ndarray = vertices[:, np.newaxis]
+    crosses: np.ndarray = (np.minimum(z0, z1) <= zz) & (zz <= np.maximum(z0, z1))
+    frac: np.ndarray = np.divide(
+        zz - z0, dz, out=np.zeros(crosses.shape), where=crosses & (dz != 0)
+    )
+    r: np.ndarray = p0[:, 0] + (frac * (p1[:, 0] - p0[:, 0]))
+    if internal:
+        return (vertices, np.min(np.where(crosses, r, np.inf), axis=-1))
+    return (vertices, np.max(np.where(crosses, r, -np.inf), axis=-1))
+
+
+@timed("heightmap")
+def radius_map(
+    ths: ThreadHelixes,
+    internal: bool,
+    angle_cells: int = 1024,
+    z_cells: int = 1024,
+    z_range: Optional[Tuple[float, float]] = None,
+    dtype: DType = np.float32,
+) -> RadiusMap:
+    """
+    Compute the unrolled surface radius of the internal or external
+    thread on a grid of angles and z.
+
+    :param ths: The helixes of the thread
+    :param internal: True for the internal thread, False for the external
+    :param angle_cells: The number of columns, evenly spaced angles
+    :param z_cells: The number of rows
+    :param z_range: The z of the first and last rows, default 0 and height
+    :param dtype: The dtype of the radii, float32 or float64
+    :returns: The map
+    """
+    dt: np.dtype = float_dtype(dtype)
+    ht = ths.ht
+    evaluator = ths.compile(internal)
+    root: float = ths.int_helix_radius if internal else ths.ext_helix_radius
+    count("heightmap_pixels", angle_cells * z_cells)
+
+    lo, hi = (0.0, ht.height) if z_range is None else z_range
+    z: np.ndarray = np.linspace(lo, hi, z_cells)
+    angles: np.ndarray = np.arange(angle_cells) * (2 * pi / angle_cells)
+    radii: np.ndarray = np.full((z_cells, angle_cells), root, dtype=dt)
+    if evaluator.rel_per_t == 0 or evaluator.z_per_rel == 0:
+        return RadiusMap(radii=radii, angles=angles, z=z, root_radius=root)
+
+    # The crest is linear in the taper scale, base + scale * slope
+    columns: np.ndarray = np.array(evaluator.locations, dtype=float).reshape(-1, 3)
+    vertices, crest = _crest(columns, 1, internal)
+    slope: np.ndarray = 2 * (crest - _crest(columns, 0.5, internal)[1])
+    base: np.ndarray = crest - slope
+    v_lo: float = float(vertices[0])
+    v_hi: float = float(vertices[-1])
+    body_crest: np.ndarray = (
+        np.minimum(crest, root) if internal else np.maximum(crest, root)
+    )
+
+    # The helix angle of the first start at each column and its z. The
+    # profiles at an angle are a pitch apart and each is 2 * pi / starts
+    # of helix angle after the one below.
+    z_per_angle: float = evaluator.z_per_rel / evaluator.angle_per_rel
+    t_per_angle: float = 1 / (evaluator.angle_per_rel * evaluator.rel_per_t)
+    last_angle: float = evaluator.angle_per_rel
+    helix_angle: np.ndarray = np.mod(angles - (pi / 2), 2 * pi)
+    helix_z: np.ndarray = evaluator.z_offset + (helix_angle * z_per_angle)
+
+    # The rows whose profiles are all in the body
+    body_lo: float = evaluator.z_offset + (
+        (evaluator.taper_out_ends - evaluator.first_t) / t_per_angle * z_per_angle
+    )
+    body_hi: float = evaluator.z_offset + (
+        (evaluator.taper_in_starts - evaluator.first_t) / t_per_angle * z_per_angle
+    )
+    body: np.ndarray = (z - v_hi >= body_lo) & (z - v_lo <= body_hi)
+
+    # Every z is within the profile of at most one turn of one start, the
+    # m'th profile above helix_z whose phase, z above its helix, is from
+    # v_lo to v_lo + pitch. The pitches are split off of z and helix_z so
+    # the phase of each pixel is a difference of values less than a pitch.
+    row_pitches: np.ndarray = np.floor((z - v_lo) / ht.pitch)
+    row_phase: np.ndarray = (z - v_lo - (row_pitches * ht.pitch)).astype(dt)
+    column_pitches: np.ndarray = np.floor(helix_z / ht.pitch)
+    column_phase: np.ndarray = (helix_z - (column_pitches * ht.pitch)).astype(dt)
+    pitch: np.floating = dt.type(ht.pitch)
+
+    # The taper scale of the m'th profile at each column, 0 beyond the ends
+    # of the helix
+    m_lo: int = int(row_pitches.min() - column_pitches.max()) - 1
+    m_hi: int = int(row_pitches.max() - column_pitches.min())
+    profile_angle: np.ndarray = helix_angle + (
+        np.arange(m_lo, m_hi + 1)[:, np.newaxis] * (2 * pi / ht.starts)
+    )
+    in_helix: np.ndarray = (profile_angle >= 0) & (profile_angle <= last_angle)
+    scales: np.ndarray = np.zeros(profile_angle.shape)
+    scales[in_helix] = evaluator.taper_scale(
+        evaluator.first_t + (profile_angle[in_helix] * t_per_angle)
+    )
+
+    column: np.ndarray = np.arange(angle_cells)
+    for i in range(0, z_cells, _CHUNK):
+        rows: slice = slice(i, min(i + _CHUNK, z_cells))
+        phase: np.ndarray = np.subtract.outer(row_phase[rows], column_phase)
+        below: np.ndarray = phase < 0
+        phase += below * pitch
+        phase += v_lo
+        if body[rows].all():
+            radii[rows] = np.interp(phase, vertices, body_crest)
+            continue
+
+        m: np.ndarray = (
+            np.subtract.outer(row_pitches[rows], column_pitches).astype(int)
+            - below
+            - m_lo
+        )
+        scale: np.ndarray = scales[m, column]
+        q: np.ndarray = np.divide(
+            phase, scale, out=np.full(phase.shape, np.inf), where=scale > 0
+        )
+        r: np.ndarray = np.interp(q, vertices, base, root, root) + (
+            scale * np.interp(q, vertices, slope, 0, 0)
+        )
+        radii[rows] = np.minimum(r, root) if internal else np.maximum(r, root)
+
+    return RadiusMap(radii=radii, angles=angles, z=z, root_radius=root)
@@ -1,10 +1,38 @@
-from copy import deepcopy
-from dataclasses import dataclass, field
-from math import degrees, radians, sin, tan
-from typing import List
-
+from copy import copy, deepcopy
+from dataclasses import (
+    FrozenInstanceError,
+    astuple,
+    dataclass,
+    field,
+    fields,
+    is_dataclass,
+)
+from threading import RLock
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import numpy as np
 from taperable_helix import Helix, HelixLocation
 
+from .evaluator import HelixEvaluator, compile_helixes
+from .instrumentation import count, timed
+
+if TYPE_CHECKING:
+    from .batch import HelicalThreadBatch
+
+T = TypeVar("T")
+
 
 @dataclass
 class HelicalThread(Helix):
@@ -14,6 +42,11 @@ class HelicalThread(Helix):
 
     Control of the size and spacing of the thread using the various
     fields in Helix and those below.
+
+    A HelicalThread is immutable once constructed, so it may be shared by
+    threads and the results computed from it, use dataclasses.replace to
+    create a changed copy. Helix is not frozen so neither can this be,
+    assignment is prevented by __setattr__ instead.
     """
 
     angle_degs: float = 45
@@ -34,29 +67,227 @@ class HelicalThread(Helix):
     threads is a manifold
     """
 
+    starts: int = 1
+    """
+    Number of starts, an integer >= 1, the helixes of start k are the
+    helixes of the first start rotated by 2 * pi * k / starts about the
+    z axis
+    """
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "starts", int(_starts(self.starts)))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # __init__ assigns each field once
+        if name in self.__dict__ or name not in self.__dataclass_fields__:
+            raise FrozenInstanceError(f"cannot assign to field '{name}'")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __hash__(self) -> int:
+        return hash(astuple(self))
+
+    @property
+    def lead(self) -> float:
+        """The distance a start advances per revolution, pitch * starts"""
+        return self.pitch * self.starts
+
+    def helix(
+        self, hl: Optional[HelixLocation] = None
+    ) -> Callable[[float], Tuple[float, float, float]]:
+        """
+        Return the function generating the points of the first start of
+        the helix at hl, see `Helix.helix`. The helix advances by lead
+        per revolution.
+        """
+        if self.starts == 1:
+            return super().helix(hl)
+        values: Dict[str, Any] = {f.name: getattr(self, f.name) for f in fields(Helix)}
+        values["pitch"] = self.lead
+        return Helix(**values).helix(hl)
+
+
+def _starts(starts: Any) -> np.ndarray:
+    """
+    Check that starts, a value or an array, are integers >= 1
 
-@dataclass
+    :param starts: The number of starts
+    :returns: starts as an int array
+    :raises ValueError: If a value is not an integer >= 1
+    """
+    values: np.ndarray = np.asarray(starts)
+    if values.dtype.kind not in "iuf" or not np.all(
+        (values >= 1) & (values == np.floor(values))
+    ):
+        raise ValueError(f"starts:{starts} must be an integer >= 1")
+    return values.astype(int)
+
+
+class _Lazy(Generic[T]):
+    """
+    A field of ThreadHelixes that, unless it was passed, is computed from
+    ht with the other field of its side on first access.
+    """
+
+    def __init__(self, internal: bool) -> None:
+        self.internal = internal
+
+    def __set_name__(self, owner: Any, name: str) -> None:
+        self.name = "_" + name
+
+    def __get__(self, obj: Any, objtype: Any = None) -> T:
+        if obj is None:
+            # The default of the dataclass field, None is computed
+            return None  # type: ignore[return-value]
+        value: Optional[T] = obj.__dict__.get(self.name)
+        if value is None:
+            with obj._lock:
+                if obj.__dict__.get(self.name) is None:
+                    obj._compute(self.internal)
+            value = obj.__dict__[self.name]
+        return _copied(value)
+
+    def __set__(self, obj: Any, value: Optional[T]) -> None:
+        obj.__dict__[self.name] = _stored(value)
+
+
+def _stored(value: Any) -> Any:
+    """Lists of HelixLocations are stored as tuples of copies"""
+    if isinstance(value, (list, tuple)):
+        return tuple(copy(hl) for hl in value)
+    return value
+
+
+def _copied(value: Any) -> Any:
+    """The stored HelixLocations are returned as a new list of copies"""
+    if isinstance(value, tuple):
+        return [copy(hl) for hl in value]
+    return value
+
+
+@dataclass(frozen=True)
 class ThreadHelixes:
     """
     The helixes returned by helical_thread` that represents the internal
     thread, prefixed with `int_` and the external thread, prefixed with `ext_`.
+
+    The helixes of each side not passed when constructed are computed from
+    ht when one of its fields is first accessed, so a job using only the
+    internal or only the external thread never computes the other.
+
+    ThreadHelixes is frozen and its lazy fields and cached values are
+    computed under a lock, so one may be shared by threads. Each value is
+    computed once and the arrays of cached values are read only. The
+    helixes are stored as copies of the HelixLocations passed or computed
+    and each access returns a new list of copies. A pickled or copied
+    ThreadHelixes has an empty cache.
     """
 
     ht: HelicalThread
     """The basic Dimensions of the helixes"""
 
-    int_helix_radius: float = 0
+    int_helix_radius: _Lazy[float] = _Lazy(True)
     """The internal thread radius"""
 
-    int_helixes: List[HelixLocation] = field(default_factory=list)
+    int_helixes: _Lazy[List[HelixLocation]] = _Lazy(True)
     """List of the internal helix locations"""
 
-    ext_helix_radius: float = 0
+    ext_helix_radius: _Lazy[float] = _Lazy(False)
     """The external thread radius"""
 
-    ext_helixes: List[HelixLocation] = field(default_factory=list)
+    ext_helixes: _Lazy[List[HelixLocation]] = _Lazy(False)
     """List of the external helix locations"""
 
+    _cache: Dict[Any, Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    """
+    Values computed from ht and the helixes such as `derived` and the mesh
+    of the first start, see `_cached`
+    """
+
+    _lock: RLock = field(default_factory=RLock, init=False, repr=False, compare=False)
+    """Held while computing a lazy field or a value of _cache"""
+
+    def _cached(self, key: Any, compute: Callable[[], T], counted: bool = True) -> T:
+        """
+        Return the value of key in _cache, computing and caching it on the
+        first call. The numpy arrays of a computed dataclass are made read
+        only as the value is shared by every caller.
+
+        :param key: The key of the value
+        :param compute: Computes the value
+        :param counted: False to not count the cache_hits and cache_misses
+        :returns: The value
+        """
+        value: Optional[T] = self._cache.get(key)
+        if value is None:
+            with self._lock:
+                value = self._cache.get(key)
+                if value is None:
+                    if counted:
+                        count("cache_misses")
+                    value = compute()
+                    if is_dataclass(value):
+                        for f in fields(value):
+                            a: Any = getattr(value, f.name)
+                            if isinstance(a, np.ndarray):
+                                a.setflags(write=False)
+                    self._cache[key] = value
+                    return value
+        if counted:
+            count("cache_hits")
+        return value
+
+    def _compute(self, internal: bool) -> None:
+        """Compute the fields of a side that were not passed or set"""
+        radius, helixes = (_int_helixes if internal else _ext_helixes)(
+            self.ht, self.derived
+        )
+        prefix: str = "_int_" if internal else "_ext_"
+        if self.__dict__.get(prefix + "helix_radius") is None:
+            self.__dict__[prefix + "helix_radius"] = radius
+        if self.__dict__.get(prefix + "helixes") is None:
+            self.__dict__[prefix + "helixes"] = _stored(helixes)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """The fields without the lock and cache, which can't be pickled"""
+        return {k: v for k, v in self.__dict__.items() if k not in ("_lock", "_cache")}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        object.__setattr__(self, "_lock", RLock())
+        object.__setattr__(self, "_cache", {})
+
+    @property
+    def derived(self) -> "ThreadDerived":
+        """
+        The quantities derived from ht that the helixes are computed from,
+        they are computed once and cached.
+        """
+        return self._cached("derived", lambda: thread_derived(self.ht), False)
+
+    def compile(self, internal: bool) -> HelixEvaluator:
+        """
+        Return the evaluator of the internal or external helixes of every
+        start, it is cached.
+
+        :param internal: True for the internal helixes, False for the external
+        :returns: The evaluator
+        """
+        return self._cached(
+            ("compile", internal),
+            lambda: compile_helixes(
+                self.ht,
+                self.int_helixes if internal else self.ext_helixes,
+                self.ht.lead,
+                self.ht.starts,
+            ),
+            False,
+        )
+
 
 def helical_thread(ht: HelicalThread) -> ThreadHelixes:
     """
@@ -69,6 +300,9 @@ def helical_thread(ht: HelicalThread) -> ThreadHelixes:
     the thread will be a trapezoid with the length of the {int|ext}_helixes
     will be 4.
 
+    The helixes of each side are computed when first accessed, see
+    `ThreadHelixes`.
+
     :param ht: The basic dimensions of the helicla thread
     :returns: internal and external helixes necessary to use taperable-helix
     """
@@ -85,84 +319,102 @@ def helical_thread(ht: HelicalThread) -> ThreadHelixes:
     #     f"helical_thread: first_t={first_t} last_t={last_t} "
     # )
 
-    result: ThreadHelixes = ThreadHelixes(ht)
+    return ThreadHelixes(ht)
+
+
+class ThreadDerived(NamedTuple):
+    """
+    The quantities derived from a HelicalThread that its helixes are
+    computed from, see `ThreadHelixes.derived`. They are arrays when
+    derived from a HelicalThreadBatch.
+    """
+
+    tan_hangle: float
+    """The tan of half the thread angle"""
+
+    sin_hangle: float
+    """The sin of half the thread angle"""
+
+    int_thread_depth: float
+    """The radial depth of the internal thread"""
+
+    thread_overlap_vert_adj: float
+    """The vertical adjustment of the half heights for thread_overlap"""
+
+    thread_half_height_at_helix_radius: float
+    """The half height of the internal thread at its helix radius"""
+
+    thread_half_height_at_opposite_helix_radius: float
+    """The half height of the internal thread at its minor radius"""
+
+    ext_vert_adj: float
+    """The vertical adjustment of the external thread for ext_clearance"""
+
+    ext_helix_radius: float
+    """The external thread radius"""
+
+    ext_thread_depth: float
+    """
+    The radial depth of the external thread, int_thread_depth unless its
+    profile has three points
+    """
+
+    ext_thread_half_height_at_ext_helix_radius: float
+    """The half height of the external thread at its helix radius"""
+
+    ext_thread_half_height_at_ext_helix_radius_plus_tova: float
+    """The above plus thread_overlap_vert_adj"""
 
-    angle_radians: float = radians(ht.angle_degs)
-    tan_hangle: float = tan(angle_radians / 2)
-    sin_hangle: float = sin(angle_radians / 2)
-    tip_to_major_cutoff: float = ((ht.pitch - ht.major_cutoff) / 2) / tan_hangle
-    tip_to_minor_cutoff: float = (ht.minor_cutoff / 2) / tan_hangle
+    ext_thread_half_height_at_opposite_ext_helix_radius: float
+    """The half height of the external thread at its major radius, >= 0"""
+
+
+def thread_derived(ht: Union[HelicalThread, "HelicalThreadBatch"]) -> ThreadDerived:
+    """
+    Compute the quantities derived from ht that `helical_thread` uses.
+    The arithmetic is numpy operations so ht may also be a
+    HelicalThreadBatch, whose derived quantities are arrays with one
+    entry per thread, see `helical_thread_batch`.
+
+    :param ht: The basic dimensions of the helical thread or threads
+    :returns: The derived quantities, floats for a HelicalThread
+    """
+    angle_radians: Any = np.radians(ht.angle_degs)
+    tan_hangle: Any = np.tan(angle_radians / 2)
+    sin_hangle: Any = np.sin(angle_radians / 2)
+    tip_to_major_cutoff: Any = ((ht.pitch - ht.major_cutoff) / 2) / tan_hangle
+    tip_to_minor_cutoff: Any = (ht.minor_cutoff / 2) / tan_hangle
     # print(
     #     f"helical_thread: tip_to_major_cutoff={tip_to_major_cutoff:.3f} tip_to_minor_cutoff={tip_to_minor_cutoff:.3f}"
     # )
-    int_thread_depth: float = tip_to_major_cutoff - tip_to_minor_cutoff
+    int_thread_depth: Any = tip_to_major_cutoff - tip_to_minor_cutoff
     # print(f"helical_thread: int_thread_depth={int_thread_depth}")
 
-    thread_overlap_vert_adj: float = ht.thread_overlap * tan_hangle
-    thread_half_height_at_helix_radius: float = (
+    thread_overlap_vert_adj: Any = ht.thread_overlap * tan_hangle
+    thread_half_height_at_helix_radius: Any = (
         (ht.pitch - ht.major_cutoff) / 2
     ) + thread_overlap_vert_adj
-    thread_half_height_at_opposite_helix_radius: float = ht.minor_cutoff / 2
-    # print(
-    #     f"thh_at_r={thread_half_height_at_helix_radius} thh_at_or={thread_half_height_at_opposite_helix_radius} td={int_thread_depth}"
-    # )
-
-    # Internal thread have helix thread radisu
-    result.int_helix_radius = ht.radius
-    result.int_helixes = []
-
-    # print(f"result.int_helix_radius={result.int_helix_radius}")
-    hl = HelixLocation(
-        radius=result.int_helix_radius + ht.thread_overlap,
-        horz_offset=0,
-        vert_offset=-thread_half_height_at_helix_radius,
-    )
-    result.int_helixes.append(hl)
-
-    hl = HelixLocation(
-        radius=result.int_helix_radius + ht.thread_overlap,
-        horz_offset=0,
-        vert_offset=+thread_half_height_at_helix_radius,
-    )
-    result.int_helixes.append(hl)
-
-    hl = HelixLocation(
-        radius=result.int_helix_radius,
-        horz_offset=-int_thread_depth,
-        vert_offset=+thread_half_height_at_opposite_helix_radius,
-    )
-    result.int_helixes.append(hl)
-
-    if ht.minor_cutoff > 0:
-        hl = HelixLocation(
-            radius=result.int_helix_radius,
-            horz_offset=-int_thread_depth,
-            vert_offset=-thread_half_height_at_opposite_helix_radius,
-        )
-        result.int_helixes.append(hl)
+    thread_half_height_at_opposite_helix_radius: Any = ht.minor_cutoff / 2
 
     # Use ext_clearance to calcuate external thread values
 
     # hyp is the hypothense of the trinagle formed by a radial
     # line, the tip of the internal thread and the tip of the
     # external thread.
-    hyp: float = ht.ext_clearance / sin_hangle
+    hyp: Any = ht.ext_clearance / sin_hangle
 
     # ext_vert_adj is the amount to ajdust verticaly the helix
-    ext_vert_adj: float = (hyp - ht.ext_clearance) * tan_hangle
+    ext_vert_adj: Any = (hyp - ht.ext_clearance) * tan_hangle
     # print(f"hyp={hyp} ext_vert_adj={ext_vert_adj}")
 
     # External thread have the helix on the minor side and
     # so we subtract the int_thread_depth and ext_clearance from ht.radius
-    result.ext_helix_radius = ht.radius - int_thread_depth - ht.ext_clearance
-    # print(
-    #     f"result.ext_helix_radius={ht.ext_helix_radius} td={int_thread_depth} ec={ht.ext_clearance}"
-    # )
+    ext_helix_radius: Any = ht.radius - int_thread_depth - ht.ext_clearance
 
-    ext_thread_half_height_at_ext_helix_radius: float = (
+    ext_thread_half_height_at_ext_helix_radius: Any = (
         (ht.pitch - ht.minor_cutoff) / 2
     ) - ext_vert_adj
-    ext_thread_half_height_at_ext_helix_radius_plus_tova: float = (
+    ext_thread_half_height_at_ext_helix_radius_plus_tova: Any = (
         ext_thread_half_height_at_ext_helix_radius + thread_overlap_vert_adj
     )
 
@@ -172,46 +424,129 @@ def helical_thread(ht: HelicalThread) -> ThreadHelixes:
     # compute the thread depth. Under these circumstances the clearance
     # from the external tip to internal core will be close to ext_clearance
     # or greater. See test_thread.py or test_thread_new.py.
-    ext_thread_half_height_at_opposite_ext_helix_radius: float = (
+    ext_thread_half_height_at_opposite_ext_helix_radius: Any = (
         ht.major_cutoff / 2
     ) - ext_vert_adj
-    ext_thread_depth: float = int_thread_depth
-    if ext_thread_half_height_at_opposite_ext_helix_radius < 0:
-        ext_thread_half_height_at_opposite_ext_helix_radius = 0
-        ext_thread_depth = ext_thread_half_height_at_ext_helix_radius / tan_hangle
+    clamped: Any = ext_thread_half_height_at_opposite_ext_helix_radius < 0
+    ext_thread_half_height_at_opposite_ext_helix_radius = np.where(
+        clamped, 0.0, ext_thread_half_height_at_opposite_ext_helix_radius
+    )
+    ext_thread_depth: Any = np.where(
+        clamped,
+        ext_thread_half_height_at_ext_helix_radius / tan_hangle,
+        int_thread_depth,
+    )
+
+    d = ThreadDerived(
+        tan_hangle=tan_hangle,
+        sin_hangle=sin_hangle,
+        int_thread_depth=int_thread_depth,
+        thread_overlap_vert_adj=thread_overlap_vert_adj,
+        thread_half_height_at_helix_radius=thread_half_height_at_helix_radius,
+        thread_half_height_at_opposite_helix_radius=(
+            thread_half_height_at_opposite_helix_radius
+        ),
+        ext_vert_adj=ext_vert_adj,
+        ext_helix_radius=ext_helix_radius,
+        ext_thread_depth=ext_thread_depth,
+        ext_thread_half_height_at_ext_helix_radius=(
+            ext_thread_half_height_at_ext_helix_radius
+        ),
+        ext_thread_half_height_at_ext_helix_radius_plus_tova=(
+            ext_thread_half_height_at_ext_helix_radius_plus_tova
+        ),
+        ext_thread_half_height_at_opposite_ext_helix_radius=(
+            ext_thread_half_height_at_opposite_ext_helix_radius
+        ),
+    )
+    if isinstance(ht, HelicalThread):
+        return ThreadDerived(*(float(value) for value in d))
+    return d
+
+
+@timed("helical_thread")
+def _int_helixes(
+    ht: HelicalThread, d: ThreadDerived
+) -> Tuple[float, List[HelixLocation]]:
+    """Return the internal helix radius and helixes, see `helical_thread`"""
+    # print(
+    #     f"thh_at_r={d.thread_half_height_at_helix_radius} thh_at_or={d.thread_half_height_at_opposite_helix_radius} td={d.int_thread_depth}"
+    # )
+
+    # Internal thread have helix thread radisu
+    int_helix_radius: float = ht.radius
+    helixes: List[HelixLocation] = []
+
+    # print(f"int_helix_radius={int_helix_radius}")
+    hl = HelixLocation(
+        radius=int_helix_radius + ht.thread_overlap,
+        horz_offset=0,
+        vert_offset=-d.thread_half_height_at_helix_radius,
+    )
+    helixes.append(hl)
+
+    hl = HelixLocation(
+        radius=int_helix_radius + ht.thread_overlap,
+        horz_offset=0,
+        vert_offset=+d.thread_half_height_at_helix_radius,
+    )
+    helixes.append(hl)
+
+    hl = HelixLocation(
+        radius=int_helix_radius,
+        horz_offset=-d.int_thread_depth,
+        vert_offset=+d.thread_half_height_at_opposite_helix_radius,
+    )
+    helixes.append(hl)
+
+    if ht.minor_cutoff > 0:
+        hl = HelixLocation(
+            radius=int_helix_radius,
+            horz_offset=-d.int_thread_depth,
+            vert_offset=-d.thread_half_height_at_opposite_helix_radius,
+        )
+        helixes.append(hl)
+
+    return (int_helix_radius, helixes)
+
 
+@timed("helical_thread")
+def _ext_helixes(
+    ht: HelicalThread, d: ThreadDerived
+) -> Tuple[float, List[HelixLocation]]:
+    """Return the external helix radius and helixes, see `helical_thread`"""
     # print(
-    #     f"ext_thread_depth={ext_thread_depth} ext_thh_at_ehr={ext_thread_half_height_at_ext_helix_radius} ext_thh_at_ehr_plus_tovo={ext_thread_half_height_at_ext_helix_radius_plus_tova} ext_thh_at_oehr={ext_thread_half_height_at_opposite_ext_helix_radius}"
+    #     f"ext_thread_depth={d.ext_thread_depth} ext_thh_at_ehr={d.ext_thread_half_height_at_ext_helix_radius} ext_thh_at_ehr_plus_tovo={d.ext_thread_half_height_at_ext_helix_radius_plus_tova} ext_thh_at_oehr={d.ext_thread_half_height_at_opposite_ext_helix_radius}"
     # )
 
-    result.ext_helixes = []
+    helixes: List[HelixLocation] = []
     hl = HelixLocation(
-        radius=result.ext_helix_radius - ht.thread_overlap,
+        radius=d.ext_helix_radius - ht.thread_overlap,
         horz_offset=0,
-        vert_offset=-ext_thread_half_height_at_ext_helix_radius_plus_tova,
+        vert_offset=-d.ext_thread_half_height_at_ext_helix_radius_plus_tova,
     )
-    result.ext_helixes.append(hl)
+    helixes.append(hl)
 
     hl = HelixLocation(
-        radius=result.ext_helix_radius - ht.thread_overlap,
+        radius=d.ext_helix_radius - ht.thread_overlap,
         horz_offset=0,
-        vert_offset=+ext_thread_half_height_at_ext_helix_radius_plus_tova,
+        vert_offset=+d.ext_thread_half_height_at_ext_helix_radius_plus_tova,
     )
-    result.ext_helixes.append(hl)
+    helixes.append(hl)
 
     hl = HelixLocation(
-        radius=result.ext_helix_radius,
-        horz_offset=ext_thread_depth,
-        vert_offset=+ext_thread_half_height_at_opposite_ext_helix_radius,
+        radius=d.ext_helix_radius,
+        horz_offset=d.ext_thread_depth,
+        vert_offset=+d.ext_thread_half_height_at_opposite_ext_helix_radius,
     )
-    result.ext_helixes.append(hl)
+    helixes.append(hl)
 
-    if ext_thread_half_height_at_opposite_ext_helix_radius > 0:
+    if d.ext_thread_half_height_at_opposite_ext_helix_radius > 0:
         hl = HelixLocation(
-            radius=result.ext_helix_radius,
-            horz_offset=ext_thread_depth,
-            vert_offset=-ext_thread_half_height_at_opposite_ext_helix_radius,
+            radius=d.ext_helix_radius,
+            horz_offset=d.ext_thread_depth,
+            vert_offset=-d.ext_thread_half_height_at_opposite_ext_helix_radius,
         )
-        result.ext_helixes.append(hl)
+        helixes.append(hl)
 
-    return result
+    return (d.ext_helix_radius, helixes)
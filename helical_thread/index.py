@@ -0,0 +1,181 @@
+"""
+A spatial index of a thread for nearest surface and point inside queries.
+
+The cross section of a thread in the (r, z) half plane at any angle is
+its profile at each turn of each start. The index samples the profiles
+of the first start at helix angles that are multiples of
+2 * pi / samples_per_turn, see `angle_t_values`. A query point is mapped
+to its angle and, for every start, to the continuous sample index of
+each turn of the helix passing that angle. Only the turn nearest the
+point in z and the turns on either side of it are candidates, their
+profiles are interpolated between the two samples around the angle and
+the signed distance of the point to them is computed in the half plane.
+
+Between the tapers the interpolated profiles are exact. The distance is
+measured in the half plane through the point, it is exact on the surface
+and otherwise an upper bound of the 3D distance which it approaches as
+the helix angle of the thread gets smaller.
+"""
+
+from dataclasses import dataclass
+from math import pi
+
+import numpy as np
+
+from .geometry2d import signed_distance
+from .helicalthread import ThreadHelixes
+from .instrumentation import count, timed
+from .sampling import angle_t_values, sample_helixes
+
+# The turns of each start examined around the turn nearest in z
+_TURNS: np.ndarray = np.array([-1, 0, 1])
+
+# Number of query points processed at a time
+_CHUNK: int = 4096
+
+
+@dataclass
+class ThreadIndex:
+    """
+    The profiles of the first start of a thread at evenly spaced helix
+    angles, see `thread_index`.
+    """
+
+    profiles: np.ndarray
+    """
+    The (N, 4, 2) (r, z) profiles of each sample, three point profiles
+    repeat their last point
+    """
+
+    samples_per_turn: int
+    """The number of samples per revolution of the helix"""
+
+    starts: int
+    """The number of starts"""
+
+    z_offset: float
+    """The z of the helix at angle 0"""
+
+    z_per_angle: float
+    """The z the helix advances per radian, lead / (2 * pi)"""
+
+    def signed_distance(self, points: np.ndarray) -> np.ndarray:
+        """
+        The distance of each point to the thread surface in the half plane
+        through the point, negative inside the thread. inf if no profile
+        of the thread is in the half plane within a turn of the point.
+
+        :param points: (..., 3) x, y, z points
+        :returns: (...) signed distances
+        """
+        points = np.asarray(points, dtype=float)
+        flat: np.ndarray = points.reshape(-1, 3)
+        result: np.ndarray = np.empty(len(flat))
+        count("index_queries", len(flat))
+        for lo in range(0, len(flat), _CHUNK):
+            result[lo : lo + _CHUNK] = self._signed_distance(flat[lo : lo + _CHUNK])
+        return result.reshape(points.shape[:-1])
+
+    def distance(self, points: np.ndarray) -> np.ndarray:
+        """
+        The distance of each point to the thread surface, see
+        `signed_distance`
+
+        :param points: (..., 3) x, y, z points
+        :returns: (...) distances
+        """
+        return np.abs(self.signed_distance(points))
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        """
+        True for the points strictly inside the thread
+
+        :param points: (..., 3) x, y, z points
+        :returns: (...) booleans
+        """
+        return self.signed_distance(points) < 0
+
+    def _signed_distance(self, points: np.ndarray) -> np.ndarray:
+        """The signed distances of an (N, 3) chunk of points"""
+        r: np.ndarray = np.hypot(points[:, 0], points[:, 1])
+        z: np.ndarray = points[:, 2]
+
+        # The helix angle of the first start at x, y is atan2(y, x) - pi / 2,
+        # start k is rotated by 2 * pi * k / starts.
+        start_angles: np.ndarray = np.arange(self.starts) * (2 * pi / self.starts)
+        angle: np.ndarray = np.mod(
+            (np.arctan2(points[:, 1], points[:, 0]) - (pi / 2))[:, np.newaxis]
+            - start_angles,
+            2 * pi,
+        )
+        turn: np.ndarray = np.round(
+            (((z[:, np.newaxis] - self.z_offset) / self.z_per_angle) - angle) / (2 * pi)
+        )
+        helix_angle: np.ndarray = angle[:, :, np.newaxis] + (
+            (turn[:, :, np.newaxis] + _TURNS) * (2 * pi)
+        )
+
+        # The profiles at the candidate helix angles, (N, C, 4, 2)
+        last: int = len(self.profiles) - 1
+        u: np.ndarray = (helix_angle * (self.samples_per_turn / (2 * pi))).reshape(
+            len(points), -1
+        )
+        valid: np.ndarray = (u >= 0) & (u <= last)
+        k: np.ndarray = np.clip(np.floor(u), 0, max(last - 1, 0)).astype(int)
+        frac: np.ndarray = np.clip(u - k, 0, 1)[:, :, np.newaxis, np.newaxis]
+        k1: np.ndarray = np.minimum(k + 1, last)
+        profiles: np.ndarray = (self.profiles[k] * (1 - frac)) + (
+            self.profiles[k1] * frac
+        )
+
+        n_cand: int = profiles.shape[1]
+        rz: np.ndarray = np.repeat(np.stack((r, z), axis=-1), n_cand, axis=0)
+        distances: np.ndarray = signed_distance(
+            rz[:, np.newaxis, :], profiles.reshape(-1, 4, 2)
+        ).reshape(len(points), n_cand)
+        return np.min(np.where(valid, distances, np.inf), axis=1)
+
+
+@timed("index")
+def thread_index(
+    ths: ThreadHelixes, internal: bool, samples_per_turn: int = 360
+) -> ThreadIndex:
+    """
+    Return the spatial index of the internal or external thread, it is
+    cached on ths.
+
+    :param ths: The helixes of the thread
+    :param internal: True for the internal thread, False for the external
+    :param samples_per_turn: The number of profiles sampled per revolution
+                             of the helix, more are more accurate in the
+                             tapers
+    :returns: The index
+    """
+    return ths._cached(
+        ("index", internal, samples_per_turn),
+        lambda: _thread_index(ths, internal, samples_per_turn),
+    )
+
+
+def _thread_index(
+    ths: ThreadHelixes, internal: bool, samples_per_turn: int
+) -> ThreadIndex:
+    """Compute the index of `thread_index`"""
+    ht = ths.ht
+    t, _ = angle_t_values(ht, samples_per_turn)
+    helixes = ths.int_helixes if internal else ths.ext_helixes
+    pts: np.ndarray = sample_helixes(ht, helixes, t)
+
+    profiles: np.ndarray = np.empty((len(t), 4, 2))
+    profiles[:, : len(helixes), 0] = np.hypot(pts[:, :, 0], pts[:, :, 1]).T
+    profiles[:, : len(helixes), 1] = pts[:, :, 2].T
+    profiles[:, len(helixes) :] = profiles[:, len(helixes) - 1 : len(helixes)]
+
+    evaluator = ths.compile(internal)
+    return ThreadIndex(
+        profiles=profiles,
+        samples_per_turn=samples_per_turn,
+        starts=ht.starts,
+        z_offset=evaluator.z_offset,
+        z_per_angle=evaluator.z_per_rel / evaluator.angle_per_rel,
+    )
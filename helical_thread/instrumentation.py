@@ -0,0 +1,268 @@
+"""
+Optional instrumentation of the package.
+
+The functions of the package time their stages with `stage` or `timed`
+and count the work they do, points evaluated, triangles emitted, cache
+hits, with `count`. These do nothing unless an `instrument` context is
+active, so the cost when disabled is a global lookup and a comparison.
+
+    with instrument(sink=json_sink("timings.jsonl")) as inst:
+        ths = helical_thread(ht)
+        mesh = thread_mesh(ths, True)
+    print(inst.timers["mesh"], inst.counters["triangles"])
+
+When the context exits the Instrumentation is passed to the sink, a
+callable such as `json_sink`, `pstats_sink` or any callback.
+
+The active context, the most recently entered one that has not exited,
+collects from every thread and its timers and counters are updated
+under a lock. Contexts may exit in any order, as contexts entered on
+different threads do.
+"""
+
+import cProfile
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from threading import Lock
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, TypeVar, Union
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+@dataclass
+class StageTime:
+    """The accumulated time of a stage"""
+
+    seconds: float = 0
+    """Total wall clock seconds in the stage"""
+
+    calls: int = 0
+    """Number of times the stage was entered"""
+
+
+@dataclass
+class Instrumentation:
+    """The measurements collected by an `instrument` context"""
+
+    timers: Dict[str, StageTime] = field(default_factory=dict)
+    """The time of each stage"""
+
+    counters: Dict[str, int] = field(default_factory=dict)
+    """The value of each counter"""
+
+    peak_bytes: Optional[int] = None
+    """The peak traced memory allocation if trace_memory was True"""
+
+    profile: Optional[cProfile.Profile] = None
+    """The profile of the context if profile was True"""
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Return the measurements as a JSON serializable dict
+
+        :returns: A dict of timers, counters and peak_bytes
+        """
+        return {
+            "timers": {
+                name: {"seconds": t.seconds, "calls": t.calls}
+                for name, t in self.timers.items()
+            },
+            "counters": dict(self.counters),
+            "peak_bytes": self.peak_bytes,
+        }
+
+
+Sink = Callable[[Instrumentation], None]
+
+# The active instrumentation, None when disabled
+_active: Optional[Instrumentation] = None
+
+# The instrumentation of every entered context in the order entered, the
+# last is _active
+_stack: List[Instrumentation] = []
+
+# Held while updating the active instrumentation or _stack
+_lock: Lock = Lock()
+
+
+class _NullStage:
+    """The stage returned when instrumentation is disabled"""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, inst: Instrumentation, name: str) -> None:
+        self.inst = inst
+        self.name = name
+        self.start: float = 0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed: float = time.perf_counter() - self.start
+        with _lock:
+            t: Optional[StageTime] = self.inst.timers.get(self.name)
+            if t is None:
+                t = self.inst.timers[self.name] = StageTime()
+            t.seconds += elapsed
+            t.calls += 1
+
+
+def stage(name: str) -> Union[_Stage, _NullStage]:
+    """
+    Return a context manager timing the stage name
+
+    :param name: The name of the stage
+    :returns: The context manager
+    """
+    inst: Optional[Instrumentation] = _active
+    if inst is None:
+        return _NULL_STAGE
+    return _Stage(inst, name)
+
+
+def timed(name: str) -> Callable[[_F], _F]:
+    """
+    Decorator timing each call of a function as the stage name
+
+    :param name: The name of the stage
+    :returns: The decorator
+    """
+
+    def decorator(func: _F) -> _F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            inst: Optional[Instrumentation] = _active
+            if inst is None:
+                return func(*args, **kwargs)
+            with _Stage(inst, name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def count(name: str, n: int = 1) -> None:
+    """
+    Add n to the counter name
+
+    :param name: The name of the counter
+    :param n: The amount to add
+    """
+    inst: Optional[Instrumentation] = _active
+    if inst is not None:
+        with _lock:
+            inst.counters[name] = inst.counters.get(name, 0) + int(n)
+
+
+@contextmanager
+def instrument(
+    sink: Optional[Sink] = None, trace_memory: bool = False, profile: bool = False
+) -> Iterator[Instrumentation]:
+    """
+    Collect the stage times and counters of the package within the
+    context. Contexts may be nested, the innermost collects, and a
+    context exiting only removes itself.
+
+    :param sink: Called with the Instrumentation when the context exits
+    :param trace_memory: If True trace allocations with tracemalloc and
+                         record the peak in peak_bytes
+    :param profile: If True run cProfile over the context
+    :returns: The Instrumentation being collected
+    """
+    global _active
+
+    inst: Instrumentation = Instrumentation()
+    started_tracing: bool = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if profile:
+        inst.profile = cProfile.Profile()
+
+    with _lock:
+        _stack.append(inst)
+        _active = inst
+    if inst.profile is not None:
+        inst.profile.enable()
+    try:
+        yield inst
+    finally:
+        if inst.profile is not None:
+            inst.profile.disable()
+        with _lock:
+            for i in range(len(_stack) - 1, -1, -1):
+                if _stack[i] is inst:
+                    del _stack[i]
+                    break
+            _active = _stack[-1] if _stack else None
+        if trace_memory:
+            inst.peak_bytes = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+        if sink is not None:
+            sink(inst)
+
+
+def json_sink(file: Union[str, IO[str]]) -> Sink:
+    """
+    Return a sink appending the report of each context as a line of JSON
+
+    :param file: A path or a text file
+    :returns: The sink
+    """
+
+    def sink(inst: Instrumentation) -> None:
+        line: str = json.dumps(inst.report()) + "\n"
+        if isinstance(file, str):
+            with open(file, "a") as f:
+                f.write(line)
+        else:
+            file.write(line)
+
+    return sink
+
+
+def pstats_sink(path: str) -> Sink:
+    """
+    Return a sink writing the cProfile statistics of a context run with
+    profile=True to path, they can be read with pstats.Stats(path)
+
+    :param path: The path of the statistics file
+    :returns: The sink
+    """
+
+    def sink(inst: Instrumentation) -> None:
+        if inst.profile is not None:
+            inst.profile.dump_stats(path)
+
+    return sink
+
+
+def sinks(*all: Sink) -> Sink:
+    """
+    Return a sink calling each of all in turn
+
+    :param all: The sinks
+    :returns: The sink
+    """
+    chained: List[Sink] = list(all)
+
+    def sink(inst: Instrumentation) -> None:
+        for s in chained:
+            s(inst)
+
+    return sink
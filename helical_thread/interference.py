@@ -0,0 +1,257 @@
+"""
+Full length 3D interference check between an internal and external thread.
+
+Both threads are sampled at the same helix angles, see `angle_t_values`,
+so every sample lands exactly in an angular bin. Within a bin each sample
+is a thread profile in the (r, z) half plane at that angle and the nearest
+profiles of the other thread are found by hashing on (bin, z). The
+clearance between the profiles, and between each profile and the core of
+the other part, is then computed for all pairs at once.
+"""
+
+from dataclasses import dataclass
+from math import pi
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .geometry2d import edges_cross, signed_distance
+from .helicalthread import ThreadHelixes
+from .instrumentation import timed
+from .sampling import angle_t_values, sample_helixes
+
+# The candidate profiles of the internal thread examined for each
+# external profile, the nearest one below and the nearest one above in z.
+_CANDIDATES: Tuple[int, ...] = (-1, 0)
+
+# Number of external profiles processed at a time, this bounds the size
+# of the temporary arrays so they stay in cache.
+_CHUNK: int = 4096
+
+
+@dataclass
+class InterferenceReport:
+    """
+    The result of `check_interference`, the minimum clearance per angle bin.
+    A negative clearance is the penetration depth of the threads.
+    """
+
+    angles: np.ndarray
+    """The helix angle in radians of each bin"""
+
+    min_clearance: np.ndarray
+    """The minimum clearance in each bin, inf if the threads don't meet"""
+
+    locations: np.ndarray
+    """The x, y, z location of the minimum clearance in each bin"""
+
+    tolerance: float = 1e-9
+    """Clearances greater than -tolerance are not an interference"""
+
+    @property
+    def clearance(self) -> float:
+        """The minimum clearance over all of the bins"""
+        return float(np.min(self.min_clearance))
+
+    @property
+    def location(self) -> np.ndarray:
+        """The x, y, z location of the minimum clearance"""
+        return self.locations[int(np.argmin(self.min_clearance))]
+
+    @property
+    def interferes(self) -> bool:
+        """True if the threads interfere anywhere"""
+        return self.clearance < -self.tolerance
+
+
+def _profiles(
+    ths: ThreadHelixes, internal: bool, angle_bins: int, vert_offset: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sample the internal or external helixes at angle aligned t values
+    returning the profiles as an (N, 4, 2) array of (r, z) points, three
+    point profiles repeat their last point, and the (N,) array of bins.
+    The other starts of a multi-start thread are the profiles of the
+    first start in the bins rotated by angle_bins / starts.
+    """
+    starts: int = ths.ht.starts
+    if angle_bins % starts != 0:
+        raise ValueError(
+            f"angle_bins:{angle_bins} must be a multiple of starts:{starts}"
+        )
+
+    t, k = angle_t_values(ths.ht, angle_bins)
+    helixes = ths.int_helixes if internal else ths.ext_helixes
+    pts: np.ndarray = sample_helixes(ths.ht, helixes, t)
+
+    profiles: np.ndarray = np.empty((len(t), 4, 2))
+    profiles[:, : len(helixes), 0] = np.hypot(pts[:, :, 0], pts[:, :, 1]).T
+    profiles[:, : len(helixes), 1] = pts[:, :, 2].T + vert_offset
+    profiles[:, len(helixes) :] = profiles[:, len(helixes) - 1 : len(helixes)]
+    if starts == 1:
+        return (profiles, k % angle_bins)
+
+    shift: np.ndarray = np.arange(starts)[:, np.newaxis] * (angle_bins // starts)
+    return (
+        np.tile(profiles, (starts, 1, 1)),
+        ((k + shift) % angle_bins).reshape(-1),
+    )
+
+
+def _pair_clearance(
+    ext_profiles: np.ndarray, int_profiles: np.ndarray, valid: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The signed clearance between each external profile and its candidate
+    internal profiles and the (r, z) witness point of the minimum.
+
+    :param ext_profiles: (N, 4, 2) external profiles
+    :param int_profiles: (N, C, 4, 2) candidate internal profiles
+    :param valid: (N, C) True where the candidate exists
+    :returns: A tuple of the (N,) clearances and (N, 2) witness points
+    """
+    n_cand: int = int_profiles.shape[1]
+    ip: np.ndarray = int_profiles.reshape(-1, 4, 2)
+    ep: np.ndarray = np.repeat(ext_profiles, n_cand, axis=0)
+    vertex_valid: np.ndarray = np.repeat(valid, 4, axis=1)
+    ext_vc: np.ndarray = np.where(
+        vertex_valid, signed_distance(ep, ip).reshape(-1, n_cand * 4), np.inf
+    )
+    int_vc: np.ndarray = np.where(
+        vertex_valid, signed_distance(ip, ep).reshape(-1, n_cand * 4), np.inf
+    )
+    crossed: np.ndarray = np.any(
+        edges_cross(ep, ip).reshape(-1, n_cand) & valid, axis=1
+    )
+
+    rows: np.ndarray = np.arange(len(ext_profiles))
+    ext_arg: np.ndarray = np.argmin(ext_vc, axis=1)
+    int_arg: np.ndarray = np.argmin(int_vc, axis=1)
+    ext_min: np.ndarray = ext_vc[rows, ext_arg]
+    int_min: np.ndarray = int_vc[rows, int_arg]
+    use_int: np.ndarray = int_min < ext_min
+    pair_min: np.ndarray = np.where(use_int, int_min, ext_min)
+    pair_min = np.where(crossed, np.minimum(pair_min, 0), pair_min)
+    pair_loc: np.ndarray = np.where(
+        use_int[:, np.newaxis],
+        int_profiles.reshape(len(rows), -1, 2)[rows, int_arg],
+        ext_profiles[rows, ext_arg % 4],
+    )
+    return (pair_min, pair_loc)
+
+
+def _to_xyz(rz: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    """Convert (r, z) points at helix angles to x, y, z as Helix.helix does"""
+    return np.stack(
+        (rz[..., 0] * np.sin(-angles), rz[..., 0] * np.cos(angles), rz[..., 1]),
+        axis=-1,
+    )
+
+
+@timed("interference")
+def check_interference(
+    int_ths: ThreadHelixes,
+    ext_ths: Optional[ThreadHelixes] = None,
+    angle_bins: int = 360,
+    ext_vert_offset: Optional[float] = None,
+) -> InterferenceReport:
+    """
+    Check the clearance between the internal thread of int_ths and the
+    external thread of ext_ths along their full height including the
+    tapered ends.
+
+    The internal part, the nut, is its thread plus a core outside of
+    int_helix_radius from z = 0 to its height. The external part, the
+    bolt, is its thread plus a core inside of ext_helix_radius from
+    z = ext_vert_offset to ext_vert_offset + its height.
+
+    :param int_ths: The helixes of the internal thread
+    :param ext_ths: The helixes of the external thread, default int_ths
+    :param angle_bins: The number of angular bins per revolution, this is
+                       also the number of samples per revolution
+    :param ext_vert_offset: The vertical position of the external part
+                            relative to the internal part, default pitch / 2
+                            which mates the threads as in int_ext_both.py
+    :returns: The minimum clearance and its location for each angle bin
+    """
+    if ext_ths is None:
+        ext_ths = int_ths
+    if ext_vert_offset is None:
+        ext_vert_offset = ext_ths.ht.pitch / 2
+
+    int_profiles, int_bins = _profiles(int_ths, True, angle_bins, 0)
+    ext_profiles, ext_bins = _profiles(ext_ths, False, angle_bins, ext_vert_offset)
+    int_zc: np.ndarray = np.mean(int_profiles[:, :, 1], axis=1)
+    ext_zc: np.ndarray = np.mean(ext_profiles[:, :, 1], axis=1)
+
+    # Hash the internal profiles on (bin, z) with a composite sort key
+    # in [bin, bin + 1) so a single searchsorted finds the neighbors of
+    # every external profile.
+    z_min: float = min(int_zc.min(), ext_zc.min()) - 1
+    z_span: float = max(int_zc.max(), ext_zc.max()) - z_min + 1
+    int_key: np.ndarray = int_bins + ((int_zc - z_min) / z_span)
+    order: np.ndarray = np.argsort(int_key)
+    int_key = int_key[order]
+    pos: np.ndarray = np.searchsorted(int_key, ext_bins + ((ext_zc - z_min) / z_span))
+
+    cand: np.ndarray = pos[:, np.newaxis] + np.array(_CANDIDATES)
+    valid: np.ndarray = (cand >= 0) & (cand < len(order))
+    cand = order[np.clip(cand, 0, len(order) - 1)]
+    valid &= int_bins[cand] == ext_bins[:, np.newaxis]
+
+    pair_min: np.ndarray = np.empty(len(ext_profiles))
+    pair_loc: np.ndarray = np.empty((len(ext_profiles), 2))
+    for lo in range(0, len(ext_profiles), _CHUNK):
+        hi: int = lo + _CHUNK
+        pair_min[lo:hi], pair_loc[lo:hi] = _pair_clearance(
+            ext_profiles[lo:hi], int_profiles[cand[lo:hi]], valid[lo:hi]
+        )
+    rows: np.ndarray = np.arange(len(ext_profiles))
+
+    # Clearance of the external vertices to the core of the internal part
+    # and of the internal vertices to the core of the external part.
+    ext_in_span: np.ndarray = (ext_profiles[:, :, 1] >= 0) & (
+        ext_profiles[:, :, 1] <= int_ths.ht.height
+    )
+    ext_core: np.ndarray = np.where(
+        ext_in_span, int_ths.int_helix_radius - ext_profiles[:, :, 0], np.inf
+    )
+    int_in_span: np.ndarray = (int_profiles[:, :, 1] >= ext_vert_offset) & (
+        int_profiles[:, :, 1] <= ext_vert_offset + ext_ths.ht.height
+    )
+    int_core: np.ndarray = np.where(
+        int_in_span, int_profiles[:, :, 0] - ext_ths.ext_helix_radius, np.inf
+    )
+
+    ext_core_arg: np.ndarray = np.argmin(ext_core, axis=1)
+    int_core_arg: np.ndarray = np.argmin(int_core, axis=1)
+    clearance: np.ndarray = np.concatenate(
+        (
+            pair_min,
+            ext_core[rows, ext_core_arg],
+            int_core[np.arange(len(int_core)), int_core_arg],
+        )
+    )
+    bins: np.ndarray = np.concatenate((ext_bins, ext_bins, int_bins))
+    loc: np.ndarray = np.concatenate(
+        (
+            pair_loc,
+            ext_profiles[rows, ext_core_arg],
+            int_profiles[np.arange(len(int_profiles)), int_core_arg],
+        )
+    )
+
+    # The minimum of each bin is the first entry of the bin after sorting
+    # by (bin, clearance).
+    order = np.lexsort((clearance, bins))
+    first: np.ndarray = order[np.unique(bins[order], return_index=True)[1]]
+
+    angles: np.ndarray = np.arange(angle_bins) * (2 * pi / angle_bins)
+    min_clearance: np.ndarray = np.full(angle_bins, np.inf)
+    min_clearance[bins[first]] = clearance[first]
+    locations: np.ndarray = np.full((angle_bins, 3), np.nan)
+    locations[bins[first]] = _to_xyz(loc[first], angles[bins[first]])
+
+    return InterferenceReport(
+        angles=angles, min_clearance=min_clearance, locations=locations
+    )
@@ -0,0 +1,140 @@
+"""
+Level of detail pyramid of the mesh of a thread.
+
+The helixes are sampled once on the finest t grid and level k of the
+pyramid uses every 2**k'th ring of it. The vertices are ordered so the
+rings of the coarsest level come first followed by the rings each finer
+level adds, so the vertices of every level are a prefix of the shared
+vertex buffer. The faces of all levels are in one array, level k's are a
+contiguous slice of it, so switching level is a pair of slices.
+"""
+
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from .evaluator import DType, float_dtype
+from .helicalthread import ThreadHelixes
+from .instrumentation import count, timed
+from .mesh import ThreadMesh, _tube_faces
+from .sampling import rotate_starts, sample_helixes, t_values
+
+
+@dataclass
+class MeshPyramid:
+    """
+    The meshes of every level of detail of a thread, see `mesh_pyramid`.
+    Level 0 is the finest.
+    """
+
+    vertices: np.ndarray
+    """(V, 3) array of the vertices shared by all of the levels"""
+
+    faces: np.ndarray
+    """(F, 3) array of the faces of all of the levels, finest first"""
+
+    vertex_counts: np.ndarray
+    """The number of vertices of each level, a prefix of vertices"""
+
+    face_offsets: np.ndarray
+    """The faces of level k are faces[face_offsets[k]:face_offsets[k + 1]]"""
+
+    def __len__(self) -> int:
+        return len(self.vertex_counts)
+
+    def level(self, k: int) -> ThreadMesh:
+        """
+        Return the mesh of level k, its arrays are views of the pyramid's.
+        Vertices welded at the tapered ends are in the buffer but unused.
+
+        :param k: The level, 0 is the finest
+        :returns: The mesh of the level
+        """
+        return ThreadMesh(
+            vertices=self.vertices[: self.vertex_counts[k]],
+            faces=self.faces[self.face_offsets[k] : self.face_offsets[k + 1]],
+        )
+
+
+def _ring_order(num: int, levels: int) -> np.ndarray:
+    """
+    Return the rings, 0..num-1, ordered coarsest level first, within a
+    level in t order.
+    """
+    j: np.ndarray = np.arange(num)
+    stride: np.ndarray = np.ones(num, dtype=int)
+    for k in range(1, levels):
+        stride[j % (1 << k) == 0] = 1 << k
+    return np.lexsort((j, -stride))
+
+
+@timed("lod")
+def mesh_pyramid(
+    ths: ThreadHelixes,
+    internal: bool,
+    num: int = 500,
+    levels: int = 4,
+    dtype: DType = np.float64,
+) -> MeshPyramid:
+    """
+    Return the level of detail pyramid of the mesh of every start of the
+    internal or external thread. It is cached on ths.
+
+    :param ths: The helixes of the thread
+    :param internal: True for the internal thread, False for the external
+    :param num: The minimum number of rings of each start of the finest
+                level, it is rounded up so each level has every other
+                ring of the previous one including the last ring
+    :param levels: The number of levels, each halves the rings
+    :param dtype: The dtype of the vertices, float32 or float64
+    :returns: The pyramid
+    """
+    dt: np.dtype = float_dtype(dtype)
+    return ths._cached(
+        ("lod", internal, num, levels, dt.name),
+        lambda: _mesh_pyramid(ths, internal, num, levels, dt),
+    )
+
+
+def _mesh_pyramid(
+    ths: ThreadHelixes, internal: bool, num: int, levels: int, dt: np.dtype
+) -> MeshPyramid:
+    """Compute the pyramid of `mesh_pyramid`"""
+    coarsest: int = 1 << (levels - 1)
+    segments: int = -(-max(num - 1, 1) // coarsest) * coarsest
+    num = segments + 1
+
+    helixes = ths.int_helixes if internal else ths.ext_helixes
+    helix_count: int = len(helixes)
+    starts: int = ths.ht.starts
+    pts: np.ndarray = rotate_starts(
+        sample_helixes(ths.ht, helixes, t_values(ths.ht, num), dt), starts
+    )
+
+    # Vertex (s, h, j) is at ((position of ring j * starts) + s) * helix_count + h
+    order: np.ndarray = _ring_order(num, levels)
+    position: np.ndarray = np.empty(num, dtype=int)
+    position[order] = np.arange(num)
+    vertices: np.ndarray = np.ascontiguousarray(
+        pts.transpose(2, 0, 1, 3)[order].reshape(-1, 3)
+    )
+    helix: np.ndarray = np.arange(helix_count)[:, np.newaxis]
+    index: np.ndarray = (position[np.newaxis, :] * starts * helix_count) + helix
+    start_offsets: np.ndarray = (np.arange(starts) * helix_count)[:, None, None]
+
+    faces: List[np.ndarray] = []
+    vertex_counts: List[int] = []
+    for k in range(levels):
+        rings: np.ndarray = np.arange(0, num, 1 << k)
+        first: np.ndarray = _tube_faces(vertices, index[:, rings])
+        faces.append((first[np.newaxis] + start_offsets).reshape(-1, 3))
+        vertex_counts.append(len(rings) * starts * helix_count)
+
+    count("triangles", sum(len(f) for f in faces))
+    return MeshPyramid(
+        vertices=vertices,
+        faces=np.concatenate(faces),
+        vertex_counts=np.array(vertex_counts),
+        face_offsets=np.cumsum([0] + [len(f) for f in faces]),
+    )
@@ -0,0 +1,249 @@
+"""
+A lookup table of the profile of the body of a thread.
+
+Between the tapers every start and turn of a thread has the same profile,
+so whether a point is inside the thread depends only on its radius r and
+its phase, its z relative to the nearest helix at its angle,
+
+    phase = ((z - z_offset - angle * lead / (2 * pi)) mod pitch) - pitch / 2
+
+shifted so the profile is centered at phase 0. `profile_table` rasterizes
+the profile, and its copies a pitch above and below, into cells of
+(r, phase). Each cell records whether its center is inside and whether
+the boundary may cross it, and the signed distance is sampled at the
+corners of the cells. A query is then an array index per point, only the
+points in boundary cells need the exact polygon test when exact.
+
+Distances are measured in the (r, z) half plane as `ThreadIndex` does and
+points in the tapers are classified as if they were in the body.
+"""
+
+from dataclasses import dataclass
+from math import pi, sqrt
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .geometry2d import signed_distance
+from .helicalthread import ThreadHelixes
+from .instrumentation import count, timed
+
+
+@dataclass
+class ProfileTable:
+    """The (r, phase) lookup table of a thread, see `profile_table`"""
+
+    polygons: np.ndarray
+    """
+    The (3, 4, 2) (r, phase) profile and its copies a pitch below and
+    above, three point profiles repeat their last point
+    """
+
+    inside: np.ndarray
+    """(R, P) True where the center of the cell is inside the profile"""
+
+    boundary: np.ndarray
+    """(R, P) True where the boundary of the profile may cross the cell"""
+
+    distances: np.ndarray
+    """(R + 1, P + 1) signed distances at the corners of the cells"""
+
+    r_min: float
+    """The r of the first cell, points at smaller r are outside"""
+
+    r_step: float
+    """The radial size of the cells"""
+
+    pitch: float
+    """The distance between the profiles in z"""
+
+    z_offset: float
+    """The z of the helix of the first start at angle 0"""
+
+    z_per_angle: float
+    """The z the helix advances per radian, lead / (2 * pi)"""
+
+    @property
+    def phase_step(self) -> float:
+        """The size of the cells in phase"""
+        return self.pitch / self.inside.shape[1]
+
+    def coordinates(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The r and phase of points
+
+        :param points: (..., 3) x, y, z points
+        :returns: A tuple of the (...) r and phase of the points
+        """
+        points = np.asarray(points, dtype=float)
+        x: np.ndarray = points[..., 0]
+        y: np.ndarray = points[..., 1]
+        angle: np.ndarray = np.mod(np.arctan2(y, x) - (pi / 2), 2 * pi)
+        phase: np.ndarray = np.mod(
+            points[..., 2]
+            - self.z_offset
+            - (angle * self.z_per_angle)
+            + (self.pitch / 2),
+            self.pitch,
+        ) - (self.pitch / 2)
+        return (np.hypot(x, y), phase)
+
+    def _cells(
+        self, r: np.ndarray, phase: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The row, column and fractions within the cells of r and phase and
+        True for those in the table
+        """
+        u: np.ndarray = (r - self.r_min) / self.r_step
+        v: np.ndarray = (phase + (self.pitch / 2)) / self.phase_step
+        rows, cols = self.inside.shape
+        in_table: np.ndarray = (u >= 0) & (u < rows)
+        i: np.ndarray = np.clip(np.floor(u), 0, rows - 1).astype(int)
+        j: np.ndarray = np.clip(np.floor(v), 0, cols - 1).astype(int)
+        return (i, j, u - i, v - j, in_table)
+
+    def _exact(self, r: np.ndarray, phase: np.ndarray) -> np.ndarray:
+        """The signed distances of 1D arrays of r and phase"""
+        rz: np.ndarray = np.stack((r, phase), axis=-1)[:, np.newaxis, :]
+        return np.min(
+            [
+                signed_distance(rz, np.broadcast_to(p, (len(rz), 4, 2)))[:, 0]
+                for p in self.polygons
+            ],
+            axis=0,
+        )
+
+    def contains(self, points: np.ndarray, exact: bool = False) -> np.ndarray:
+        """
+        True for the points inside the thread
+
+        :param points: (..., 3) x, y, z points
+        :param exact: True to test the points of boundary cells against the
+                      profile, otherwise they are inside if the center of
+                      their cell is
+        :returns: (...) booleans
+        """
+        r, phase = self.coordinates(points)
+        r, phase = r.ravel(), phase.ravel()
+        count("lut_queries", len(r))
+        i, j, _, _, in_table = self._cells(r, phase)
+        result: np.ndarray = in_table & self.inside[i, j]
+        if exact:
+            refine: np.ndarray = np.flatnonzero(in_table & self.boundary[i, j])
+            count("lut_refined", len(refine))
+            result[refine] = self._exact(r[refine], phase[refine]) < 0
+        return result.reshape(np.shape(points)[:-1])
+
+    def signed_distance(self, points: np.ndarray, exact: bool = False) -> np.ndarray:
+        """
+        The signed distance of the points to the profile, negative inside
+
+        :param points: (..., 3) x, y, z points
+        :param exact: True for the exact distance, otherwise it is
+                      interpolated from the corners of the cells. Points
+                      outside of the table are always exact.
+        :returns: (...) signed distances
+        """
+        r, phase = self.coordinates(points)
+        r, phase = r.ravel(), phase.ravel()
+        count("lut_queries", len(r))
+        if exact:
+            return self._exact(r, phase).reshape(np.shape(points)[:-1])
+
+        i, j, fu, fv, in_table = self._cells(r, phase)
+        d: np.ndarray = self.distances
+        result: np.ndarray = (
+            (d[i, j] * (1 - fu) * (1 - fv))
+            + (d[i + 1, j] * fu * (1 - fv))
+            + (d[i, j + 1] * (1 - fu) * fv)
+            + (d[i + 1, j + 1] * fu * fv)
+        )
+        outside: np.ndarray = np.flatnonzero(~in_table)
+        result[outside] = self._exact(r[outside], phase[outside])
+        return result.reshape(np.shape(points)[:-1])
+
+
+@timed("lut")
+def profile_table(
+    ths: ThreadHelixes,
+    internal: bool,
+    r_cells: int = 256,
+    phase_cells: int = 256,
+    margin: Optional[float] = None,
+) -> ProfileTable:
+    """
+    Return the lookup table of the profile of the internal or external
+    thread, it is cached on ths.
+
+    :param ths: The helixes of the thread
+    :param internal: True for the internal thread, False for the external
+    :param r_cells: The number of cells in r
+    :param phase_cells: The number of cells in phase over a pitch
+    :param margin: The extent of the table in r beyond the profile,
+                   default a pitch
+    :returns: The table
+    """
+    return ths._cached(
+        ("lut", internal, r_cells, phase_cells, margin),
+        lambda: _profile_table(ths, internal, r_cells, phase_cells, margin),
+    )
+
+
+def _profile_table(
+    ths: ThreadHelixes,
+    internal: bool,
+    r_cells: int,
+    phase_cells: int,
+    margin: Optional[float],
+) -> ProfileTable:
+    """Compute the table of `profile_table`"""
+    ht = ths.ht
+    helixes = ths.int_helixes if internal else ths.ext_helixes
+    profile: np.ndarray = np.array(
+        [
+            (
+                (ht.radius if hl.radius is None else hl.radius) + hl.horz_offset,
+                hl.vert_offset,
+            )
+            for hl in helixes
+        ]
+        + [(0.0, 0.0)] * (4 - len(helixes))
+    )
+    profile[len(helixes) :] = profile[len(helixes) - 1]
+    polygons: np.ndarray = profile[np.newaxis] + (
+        np.array([-1, 0, 1])[:, np.newaxis, np.newaxis] * np.array([0, ht.pitch])
+    )
+
+    if margin is None:
+        margin = ht.pitch
+    r_min: float = float(profile[:, 0].min()) - margin
+    r_step: float = (float(profile[:, 0].max()) + margin - r_min) / r_cells
+    phase_step: float = ht.pitch / phase_cells
+    evaluator = ths.compile(internal)
+    table = ProfileTable(
+        polygons=polygons,
+        inside=np.zeros((r_cells, phase_cells), dtype=bool),
+        boundary=np.zeros((r_cells, phase_cells), dtype=bool),
+        distances=np.zeros((r_cells + 1, phase_cells + 1)),
+        r_min=r_min,
+        r_step=r_step,
+        pitch=ht.pitch,
+        z_offset=evaluator.z_offset,
+        z_per_angle=evaluator.z_per_rel / evaluator.angle_per_rel,
+    )
+
+    # A cell is crossed by the boundary only if its center is within half
+    # its diagonal of the boundary
+    r: np.ndarray = r_min + ((np.arange(r_cells) + 0.5) * r_step)
+    phase: np.ndarray = ((np.arange(phase_cells) + 0.5) * phase_step) - (ht.pitch / 2)
+    rr, pp = np.meshgrid(r, phase, indexing="ij")
+    centers: np.ndarray = table._exact(rr.ravel(), pp.ravel()).reshape(rr.shape)
+    table.inside[:] = centers < 0
+    table.boundary[:] = np.abs(centers) <= sqrt(r_step**2 + phase_step**2) / 2
+
+    r = r_min + (np.arange(r_cells + 1) * r_step)
+    phase = (np.arange(phase_cells + 1) * phase_step) - (ht.pitch / 2)
+    rr, pp = np.meshgrid(r, phase, indexing="ij")
+    table.distances[:] = table._exact(rr.ravel(), pp.ravel()).reshape(rr.shape)
+    return table
@@ -0,0 +1,175 @@
+"""
+Triangle meshes of the internal and external threads.
+
+The helixes of a thread, sampled at the same t values, form a ring of
+points, the thread profile, at each t. Consecutive rings are joined by a
+ribbon of triangles per pair of adjacent helixes and the first and last
+rings are closed by end caps. Where the ends taper to a point the
+profile collapses and coincident ring vertices are welded so the mesh
+stays closed without degenerate triangles.
+
+Only the first start is evaluated, the mesh of a multi-start thread is
+the mesh of the first start rotated onto the others.
+"""
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+from taperable_helix import HelixLocation
+
+from .evaluator import DType, float_dtype
+from .helicalthread import ThreadHelixes
+from .instrumentation import count, timed
+from .sampling import rotate_starts, sample_helixes, t_values
+
+
+@dataclass
+class ThreadMesh:
+    """A triangle mesh, the faces are counter clockwise seen from outside"""
+
+    vertices: np.ndarray
+    """(V, 3) array of x, y, z vertices"""
+
+    faces: np.ndarray
+    """(F, 3) array of indices into vertices"""
+
+    def volume(self) -> float:
+        """The signed volume enclosed by the mesh"""
+        return _signed_volume(self.vertices, self.faces)
+
+
+def _signed_volume(vertices: np.ndarray, faces: np.ndarray) -> float:
+    a: np.ndarray = vertices[faces[:, 0]]
+    b: np.ndarray = vertices[faces[:, 1]]
+    c: np.ndarray = vertices[faces[:, 2]]
+    return float(np.sum(a * np.cross(b, c))) / 6
+
+
+def _weld_ring(index: np.ndarray, points: np.ndarray) -> None:
+    """
+    Map each vertex of a ring onto the first vertex of the ring with
+    exactly the same coordinates.
+
+    :param index: (H,) vertex indices of the ring, updated in place
+    :param points: (H, 3) coordinates of the ring
+    """
+    for h in range(1, len(points)):
+        same: np.ndarray = np.all(points[:h] == points[h], axis=1)
+        if np.any(same):
+            index[h] = index[int(np.argmax(same))]
+
+
+def _tube_faces(vertices: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """
+    The faces of the closed tube through rings of vertices, the ribbons
+    between adjacent helixes and the caps of the first and last rings.
+    The end rings are welded, degenerate faces dropped and the faces
+    oriented outwards.
+
+    :param vertices: (V, 3) array of vertices
+    :param index: (H, R) indices into vertices of helix h in ring r,
+                  the rings in t order
+    :returns: (F, 3) array of faces
+    """
+    helix_count, rings = index.shape
+    h: np.ndarray = np.arange(helix_count)[:, np.newaxis]
+    r: np.ndarray = np.arange(rings - 1)[np.newaxis, :]
+    h1: np.ndarray = (h + 1) % helix_count
+    quads: np.ndarray = np.stack(
+        (index[h, r], index[h1, r], index[h1, r + 1], index[h, r + 1]), axis=-1
+    ).reshape(-1, 4)
+
+    fan: np.ndarray = np.arange(1, helix_count - 1)
+    first: np.ndarray = index[:, 0]
+    last: np.ndarray = index[:, -1]
+    faces: np.ndarray = np.concatenate(
+        (
+            quads[:, [0, 1, 2]],
+            quads[:, [0, 2, 3]],
+            np.stack((first[fan + 1], first[fan], np.full_like(fan, first[0])), -1),
+            np.stack((np.full_like(fan, last[0]), last[fan], last[fan + 1]), -1),
+        )
+    )
+
+    # Weld the end rings, elsewhere the profile has no coincident vertices
+    remap: np.ndarray = np.arange(len(vertices))
+    for ring in (first, last):
+        welded: np.ndarray = ring.copy()
+        _weld_ring(welded, vertices[ring])
+        remap[ring] = welded
+    faces = remap[faces]
+    faces = faces[
+        (faces[:, 0] != faces[:, 1])
+        & (faces[:, 1] != faces[:, 2])
+        & (faces[:, 2] != faces[:, 0])
+    ]
+
+    # The winding depends on the order of the helixes, make it outward
+    if _signed_volume(vertices, faces) < 0:
+        faces = faces[:, ::-1]
+    return np.ascontiguousarray(faces)
+
+
+@timed("mesh")
+def helixes_mesh(
+    ths: ThreadHelixes,
+    helixes: Sequence[HelixLocation],
+    num: int,
+    dtype: DType = np.float64,
+) -> ThreadMesh:
+    """
+    Mesh the first start of the thread bounded by helixes.
+
+    :param ths: The helixes of the thread
+    :param helixes: The HelixLocations of the profile in order around
+                    the profile, int_helixes or ext_helixes of ths
+    :param num: The number of rings, evenly spaced in t
+    :param dtype: The dtype of the vertices, float32 or float64
+    :returns: The closed mesh of the thread
+    """
+    pts: np.ndarray = sample_helixes(ths.ht, helixes, t_values(ths.ht, num), dtype)
+    vertices: np.ndarray = pts.reshape(-1, 3)
+    faces: np.ndarray = _tube_faces(
+        vertices, np.arange(len(vertices)).reshape(len(helixes), num)
+    )
+
+    # Drop the welded vertices
+    used: np.ndarray = np.zeros(len(vertices), dtype=bool)
+    used[faces] = True
+    remap: np.ndarray = np.cumsum(used) - 1
+    count("triangles", len(faces))
+    return ThreadMesh(vertices=vertices[used], faces=remap[faces])
+
+
+def thread_mesh(
+    ths: ThreadHelixes, internal: bool, num: int = 500, dtype: DType = np.float64
+) -> ThreadMesh:
+    """
+    Mesh every start of the internal or external thread. The mesh of the
+    first start is cached on ths and rotated onto the other starts.
+
+    :param ths: The helixes of the thread
+    :param internal: True for the internal thread, False for the external
+    :param num: The number of rings of each start, evenly spaced in t
+    :param dtype: The dtype of the vertices, float32 or float64
+    :returns: The mesh of all of the starts, each start is a closed shell
+    """
+    dt: np.dtype = float_dtype(dtype)
+    first: ThreadMesh = ths._cached(
+        ("mesh", internal, num, dt.name),
+        lambda: helixes_mesh(
+            ths, ths.int_helixes if internal else ths.ext_helixes, num, dt
+        ),
+    )
+
+    starts: int = ths.ht.starts
+    if starts == 1:
+        return first
+    vertex_count: int = len(first.vertices)
+    return ThreadMesh(
+        vertices=rotate_starts(first.vertices, starts).reshape(-1, 3),
+        faces=(
+            first.faces[np.newaxis] + (np.arange(starts) * vertex_count)[:, None, None]
+        ).reshape(-1, 3),
+    )
@@ -0,0 +1,116 @@
+"""
+Check that a triangle mesh is a closed, consistently oriented solid
+without degenerate triangles.
+
+Every directed edge of the faces is encoded as one int64, the index of
+its undirected edge times two plus its direction, and the edges are
+sorted once. Each run of equal undirected edges is then an edge of the
+mesh whose length is the number of faces using it and whose sum of
+directions tells if its faces agree on its orientation. The triangle
+areas are computed a chunk of faces at a time.
+"""
+
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from .instrumentation import count, timed
+from .mesh import ThreadMesh
+
+# Number of faces whose areas are computed at a time
+_CHUNK: int = 1 << 20
+
+
+@dataclass
+class MeshReport:
+    """
+    The result of `check_mesh`, the edges are (E, 2) arrays of vertex
+    indices, the smaller index first.
+    """
+
+    boundary_edges: np.ndarray
+    """The edges used by only one face"""
+
+    nonmanifold_edges: np.ndarray
+    """The edges used by more than two faces"""
+
+    misoriented_edges: np.ndarray
+    """The edges of two faces that traverse it in the same direction"""
+
+    degenerate_faces: np.ndarray
+    """The indices of the faces with a repeated vertex or no area"""
+
+    @property
+    def closed(self) -> bool:
+        """True if every edge is used by exactly two faces"""
+        return len(self.boundary_edges) == 0 and len(self.nonmanifold_edges) == 0
+
+    @property
+    def oriented(self) -> bool:
+        """True if adjacent faces are consistently oriented"""
+        return len(self.misoriented_edges) == 0
+
+    @property
+    def watertight(self) -> bool:
+        """True if the mesh is closed, oriented and has no degenerate faces"""
+        return self.closed and self.oriented and len(self.degenerate_faces) == 0
+
+
+def _degenerate_faces(
+    vertices: np.ndarray, faces: np.ndarray, area_tolerance: float
+) -> np.ndarray:
+    """The indices of faces with a repeated vertex or area <= area_tolerance"""
+    result: List[np.ndarray] = []
+    for lo in range(0, len(faces), _CHUNK):
+        f: np.ndarray = faces[lo : lo + _CHUNK]
+        a: np.ndarray = vertices[f[:, 0]]
+        cross: np.ndarray = np.cross(vertices[f[:, 1]] - a, vertices[f[:, 2]] - a)
+        twice_area: np.ndarray = np.sqrt(np.einsum("ij,ij->i", cross, cross))
+        bad: np.ndarray = (
+            (f[:, 0] == f[:, 1])
+            | (f[:, 1] == f[:, 2])
+            | (f[:, 2] == f[:, 0])
+            | (twice_area <= 2 * area_tolerance)
+        )
+        result.append(np.flatnonzero(bad) + lo)
+    return np.concatenate(result) if result else np.zeros(0, dtype=np.int64)
+
+
+@timed("meshcheck")
+def check_mesh(mesh: ThreadMesh, area_tolerance: float = 0) -> MeshReport:
+    """
+    Check the edges and faces of a mesh.
+
+    :param mesh: The mesh checked
+    :param area_tolerance: Faces with an area less than or equal to this
+                           are degenerate
+    :returns: The edges and faces that are not a watertight solid
+    """
+    faces: np.ndarray = np.asarray(mesh.faces, dtype=np.int64)
+    vertex_count: np.int64 = np.int64(max(len(mesh.vertices), 1))
+    count("faces_checked", len(faces))
+
+    a: np.ndarray = faces.ravel()
+    b: np.ndarray = faces[:, [1, 2, 0]].ravel()
+    forward: np.ndarray = a < b
+    lo: np.ndarray = np.where(forward, a, b)
+    hi: np.ndarray = np.where(forward, b, a)
+    keys: np.ndarray = np.sort((((lo * vertex_count) + hi) << 1) | forward)
+    del a, b, forward, lo, hi
+
+    edges: np.ndarray = keys >> 1
+    starts: np.ndarray = np.flatnonzero(np.diff(edges, prepend=-1))
+    ends: np.ndarray = np.append(starts[1:], len(edges))
+    uses: np.ndarray = ends - starts
+    cumulative: np.ndarray = np.concatenate(([0], np.cumsum(keys & 1)))
+    forwards: np.ndarray = cumulative[ends] - cumulative[starts]
+    unique: np.ndarray = edges[starts]
+    pairs: np.ndarray = np.stack((unique // vertex_count, unique % vertex_count), 1)
+
+    return MeshReport(
+        boundary_edges=pairs[uses == 1],
+        nonmanifold_edges=pairs[uses > 2],
+        misoriented_edges=pairs[(uses == 2) & (forwards != 1)],
+        degenerate_faces=_degenerate_faces(mesh.vertices, faces, area_tolerance),
+    )
@@ -0,0 +1,157 @@
+"""
+Analytic strength metrics of batches of threads.
+
+The profiles of `helical_thread_batch` are trapezoids, so the width of
+each thread at any radius, and from it the diameters, the tensile stress
+area and the shear areas, follow directly from the thread depths and
+cutoffs without meshing. The widths are axial widths of the solid thread
+ignoring thread_overlap and the tapers.
+
+The engagement length is the helix height, height - 2 * inset_offset,
+between the tapers, where both threads have their full profile.
+"""
+
+from dataclasses import dataclass
+from math import pi
+from typing import Union
+
+import numpy as np
+
+from .batch import HelicalThreadBatch, ThreadHelixesBatch, helical_thread_batch
+from .instrumentation import count, timed
+
+
+@dataclass
+class ThreadMetrics:
+    """
+    The result of `thread_metrics`, arrays with one entry per thread,
+    lengths in the units of the threads.
+    """
+
+    engagement_length: np.ndarray
+    """The length of full profile engagement"""
+
+    int_minor_diameter: np.ndarray
+    """The diameter of the crest of the internal thread"""
+
+    ext_major_diameter: np.ndarray
+    """The diameter of the crest of the external thread"""
+
+    ext_pitch_diameter: np.ndarray
+    """The diameter where the width of the external thread is pitch / 2"""
+
+    ext_minor_diameter: np.ndarray
+    """The diameter of the root of the external thread"""
+
+    tensile_stress_area: np.ndarray
+    """
+    The tensile stress area of the external thread, the area of the mean
+    of its pitch and minor diameters
+    """
+
+    ext_shear_area: np.ndarray
+    """
+    The area sheared stripping the external thread, at the internal minor
+    diameter over the engagement length
+    """
+
+    int_shear_area: np.ndarray
+    """
+    The area sheared stripping the internal thread, at the external major
+    diameter over the engagement length
+    """
+
+
+def _width(
+    r: np.ndarray,
+    root_radius: np.ndarray,
+    root_width: np.ndarray,
+    crest_radius: np.ndarray,
+    crest_width: np.ndarray,
+) -> np.ndarray:
+    """
+    The width of a trapezoid profile at r, the root width below its root
+    and 0 beyond its crest
+    """
+    depth: np.ndarray = crest_radius - root_radius
+    frac: np.ndarray = np.divide(
+        r - root_radius, depth, out=np.zeros_like(depth), where=depth != 0
+    )
+    width: np.ndarray = root_width + ((crest_width - root_width) * np.maximum(frac, 0))
+    return np.where(frac <= 1, np.maximum(width, 0), 0)
+
+
+@timed("metrics")
+def thread_metrics(
+    batch: Union[HelicalThreadBatch, ThreadHelixesBatch],
+) -> ThreadMetrics:
+    """
+    Compute the metrics of every internal and external thread pair.
+
+    :param batch: The threads, a HelicalThreadBatch is first passed to
+                  `helical_thread_batch`
+    :returns: The metrics of the threads
+    """
+    thb: ThreadHelixesBatch = (
+        helical_thread_batch(batch) if isinstance(batch, HelicalThreadBatch) else batch
+    )
+    htb: HelicalThreadBatch = thb.htb
+    count("metrics", len(thb))
+
+    engagement_length: np.ndarray = (htb.height - (2 * htb.inset_offset)) * (
+        htb.taper_in_rpos - htb.taper_out_rpos
+    )
+
+    # The internal thread, its root is at radius
+    int_root_radius: np.ndarray = thb.int_helix_radius
+    int_root_width: np.ndarray = htb.pitch - htb.major_cutoff
+    int_crest_radius: np.ndarray = int_root_radius - thb.int_thread_depth
+    int_crest_width: np.ndarray = htb.minor_cutoff
+
+    # The external thread, its crest width is 0 when its profile has three points
+    ext_root_radius: np.ndarray = thb.ext_helix_radius
+    ext_root_width: np.ndarray = htb.pitch - htb.minor_cutoff - (2 * thb.ext_vert_adj)
+    ext_crest_radius: np.ndarray = ext_root_radius + thb.ext_thread_depth
+    ext_crest_width: np.ndarray = 2 * thb.ext_helixes[:, 2, 2]
+
+    # The external width decreases linearly from root to crest
+    width_change: np.ndarray = ext_root_width - ext_crest_width
+    pitch_frac: np.ndarray = np.divide(
+        ext_root_width - (htb.pitch / 2),
+        width_change,
+        out=np.full_like(width_change, 0.5),
+        where=width_change != 0,
+    )
+    ext_pitch_diameter: np.ndarray = 2 * (
+        ext_root_radius + (np.clip(pitch_frac, 0, 1) * thb.ext_thread_depth)
+    )
+    ext_minor_diameter: np.ndarray = 2 * ext_root_radius
+
+    # The number of turns of all of the starts engaged is engagement / pitch
+    turns: np.ndarray = engagement_length / htb.pitch
+    ext_shear_width: np.ndarray = _width(
+        int_crest_radius,
+        ext_root_radius,
+        ext_root_width,
+        ext_crest_radius,
+        ext_crest_width,
+    )
+    int_shear_width: np.ndarray = _width(
+        ext_crest_radius,
+        int_root_radius,
+        int_root_width,
+        int_crest_radius,
+        int_crest_width,
+    )
+
+    return ThreadMetrics(
+        engagement_length=engagement_length,
+        int_minor_diameter=2 * int_crest_radius,
+        ext_major_diameter=2 * ext_crest_radius,
+        ext_pitch_diameter=ext_pitch_diameter,
+        ext_minor_diameter=ext_minor_diameter,
+        tensile_stress_area=(pi / 4)
+        * np.square((ext_pitch_diameter + ext_minor_diameter) / 2),
+        ext_shear_area=turns * (2 * pi * int_crest_radius) * ext_shear_width,
+        int_shear_area=turns * (2 * pi * ext_crest_radius) * int_shear_width,
+    )
@@ -0,0 +1,105 @@
+"""
+Vectorized sampling of the helixes returned by `helical_thread`.
+
+The functions here evaluate the same points as the function returned by
+`Helix.helix(hl)` but for all of the HelixLocations and all of the t values
+at once using numpy arrays. The helixes of a multi-start HelicalThread
+advance by its lead per revolution and the other starts are rotations of
+the first, see `sample_starts`. The arithmetic is done by the evaluators
+of `compile_helixes`.
+"""
+
+from math import floor
+from typing import Sequence, Tuple
+
+import numpy as np
+from taperable_helix import Helix, HelixLocation
+
+from .evaluator import DType, compile_helixes, rotate_starts, start_rotations
+from .helicalthread import HelicalThread
+from .instrumentation import count, timed
+
+
+def _lead(ht: Helix) -> float:
+    """The distance the helix advances per revolution"""
+    return ht.lead if isinstance(ht, HelicalThread) else ht.pitch
+
+
+def t_values(ht: Helix, num: int) -> np.ndarray:
+    """
+    Return num evenly spaced t values between first_t and last_t inclusive.
+
+    :param ht: The helix being sampled
+    :param num: Number of t values
+    :returns: A 1D array of t values
+    """
+    return np.linspace(ht.first_t, ht.last_t, num=num, dtype=float)
+
+
+def angle_t_values(ht: Helix, samples_per_turn: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the t values where the helix angle is an exact multiple of
+    2 * pi / samples_per_turn together with that multiple. Sampling two
+    helixes this way guarantees the samples of both land in the same
+    angular bins, bin = k % samples_per_turn.
+
+    :param ht: The helix being sampled
+    :param samples_per_turn: Number of samples per revolution
+    :returns: A tuple (t, k) of 1D arrays
+    """
+    helix_height: float = ht.height - (2 * ht.inset_offset)
+    lead: float = _lead(ht)
+    if lead == 0 or helix_height == 0:
+        raise ValueError(f"lead:{lead} and helix_height:{helix_height} must not be 0")
+
+    # samples_per_rel is the number of samples for a rel_height of 1
+    samples_per_rel: float = (helix_height / lead) * samples_per_turn
+    k: np.ndarray = np.arange(floor(samples_per_rel + 1e-9) + 1)
+    rel_height: np.ndarray = k / samples_per_rel
+    t: np.ndarray = ht.first_t + (rel_height * (ht.last_t - ht.first_t))
+    return (t, k)
+
+
+@timed("sample")
+def sample_helixes(
+    ht: Helix,
+    helixes: Sequence[HelixLocation],
+    t: np.ndarray,
+    dtype: DType = np.float64,
+    piecewise: bool = True,
+) -> np.ndarray:
+    """
+    Evaluate the helix of each HelixLocation at every t. This is the
+    vectorized equivalent of `[list(map(ht.helix(hl), t)) for hl in helixes]`.
+
+    :param ht: The basic dimensions of the helixes
+    :param helixes: The HelixLocations to evaluate, typically
+                    `ThreadHelixes.int_helixes` or `ThreadHelixes.ext_helixes`
+    :param t: 1D array of t values between first_t and last_t inclusive
+    :param dtype: The dtype of the points, float32 or float64
+    :param piecewise: False to scale every t value by the taper scale, see
+                      `HelixEvaluator.points`
+    :returns: An array of shape (len(helixes), len(t), 3) of x, y, z points
+              of the first start
+    """
+    count("points", len(helixes) * len(t))
+    return compile_helixes(ht, helixes, _lead(ht)).points(t, dtype, piecewise)
+
+
+def sample_starts(
+    ht: HelicalThread,
+    helixes: Sequence[HelixLocation],
+    t: np.ndarray,
+    dtype: DType = np.float64,
+) -> np.ndarray:
+    """
+    Evaluate the helix of each HelixLocation at every t for every start,
+    the first start is sampled and rotated onto the others.
+
+    :param ht: The basic dimensions of the helixes
+    :param helixes: The HelixLocations to evaluate
+    :param t: 1D array of t values between first_t and last_t inclusive
+    :param dtype: The dtype of the points, float32 or float64
+    :returns: An array of shape (ht.starts, len(helixes), len(t), 3)
+    """
+    return rotate_starts(sample_helixes(ht, helixes, t, dtype), ht.starts)
@@ -0,0 +1,371 @@
+"""
+A local asyncio HTTP service of thread geometry.
+
+    server = ThreadServer(processes=2)
+    await server.start(port=8080)   # or path="/tmp/helical_thread.sock"
+
+Requests are a POST of JSON to /profiles, /samples or /mesh:
+
+    {"thread": {"radius": 4, "pitch": 1, "height": 10}, "num": 500,
+     "internal": true, "dtype": "float32"}
+
+thread holds the HelicalThread fields, num, internal and dtype, float32
+or float64 for the points and vertices, are optional. Bodies longer
+than MAX_BODY are refused.
+The geometry is computed in a process pool and identical requests that
+arrive while one is being computed wait for that computation instead of
+starting another. The response is the arrays in the binary layout of
+`encode_arrays`, `decode_arrays` returns numpy views of the response
+without copying.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import struct
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import astuple, fields
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from .evaluator import float_dtype
+from .helicalthread import HelicalThread, helical_thread
+from .mesh import thread_mesh
+from .sampling import sample_starts, t_values
+
+# The first bytes of the binary layout
+MAGIC: bytes = b"HTAR"
+
+# The arrays in the binary layout start at multiples of ALIGNMENT
+ALIGNMENT: int = 8
+
+# The largest request body read, larger requests are refused with 413
+MAX_BODY: int = 1 << 20
+
+_KINDS: Tuple[str, ...] = ("profiles", "samples", "mesh")
+
+_REASONS: Dict[int, str] = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+def encode_arrays(arrays: Mapping[str, np.ndarray]) -> bytes:
+    """
+    Encode arrays as MAGIC, the little endian uint32 length of a JSON
+    header, the header and the raw little endian C ordered data of each
+    array. The header is a list of the name, dtype, shape and byte offset
+    of each array, the offsets are aligned to ALIGNMENT.
+
+    :param arrays: The arrays by name
+    :returns: The encoded arrays
+    """
+    contiguous: List[Tuple[str, np.ndarray]] = [
+        (name, np.ascontiguousarray(a, dtype=np.asarray(a).dtype.newbyteorder("<")))
+        for name, a in arrays.items()
+    ]
+
+    entries: List[Dict[str, Any]] = []
+    offset: int = 0
+    for name, a in contiguous:
+        entries.append(
+            {"name": name, "dtype": a.dtype.str, "shape": a.shape, "offset": offset}
+        )
+        offset += -(-a.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header: bytes = json.dumps(entries).encode()
+    header += b" " * (-(len(MAGIC) + 4 + len(header)) % ALIGNMENT)
+    parts: List[bytes] = [MAGIC, struct.pack("<I", len(header)), header]
+    for _, a in contiguous:
+        parts.append(a.tobytes())
+        parts.append(b"\0" * (-a.nbytes % ALIGNMENT))
+    return b"".join(parts)
+
+
+def decode_arrays(data: Union[bytes, bytearray, memoryview]) -> Dict[str, np.ndarray]:
+    """
+    Decode the arrays encoded by `encode_arrays`, the arrays are read only
+    views of data.
+
+    :param data: The encoded arrays
+    :returns: The arrays by name
+    """
+    view: memoryview = memoryview(data)
+    if bytes(view[: len(MAGIC)]) != MAGIC:
+        raise ValueError("data is not encoded arrays")
+    (header_len,) = struct.unpack_from("<I", view, len(MAGIC))
+    start: int = len(MAGIC) + 4
+    entries = json.loads(bytes(view[start : start + header_len]))
+    base: int = start + header_len
+
+    arrays: Dict[str, np.ndarray] = {}
+    for e in entries:
+        dtype: np.dtype = np.dtype(e["dtype"])
+        shape: Tuple[int, ...] = tuple(e["shape"])
+        count: int = int(np.prod(shape))
+        arrays[e["name"]] = np.frombuffer(
+            view, dtype=dtype, count=count, offset=base + e["offset"]
+        ).reshape(shape)
+    return arrays
+
+
+def _thread(params: Mapping[str, Any]) -> HelicalThread:
+    thread = params.get("thread")
+    if not isinstance(thread, dict):
+        raise ValueError("thread must be an object of HelicalThread fields")
+    names = {f.name for f in fields(HelicalThread)}
+    unknown = set(thread) - names
+    if unknown:
+        raise ValueError(f"{sorted(unknown)} are not fields of HelicalThread")
+    return HelicalThread(**thread)
+
+
+def _options(params: Mapping[str, Any]) -> Tuple[int, bool, np.dtype]:
+    """The num, internal and dtype of a request or their defaults"""
+    return (
+        int(params.get("num", 500)),
+        bool(params.get("internal", True)),
+        float_dtype(params.get("dtype", "float64")),
+    )
+
+
+def compute(kind: str, params: Mapping[str, Any]) -> bytes:
+    """
+    Compute the geometry of a request, it runs in the worker processes.
+
+    :param kind: profiles, samples or mesh
+    :param params: The request, see the module documentation
+    :returns: The arrays in the binary layout
+    """
+    ths = helical_thread(_thread(params))
+    num, internal, dtype = _options(params)
+
+    arrays: Dict[str, np.ndarray]
+    if kind == "profiles":
+        arrays = {
+            "radius": np.array([ths.int_helix_radius, ths.ext_helix_radius]),
+            "int_helixes": np.array(
+                [(hl.radius, hl.horz_offset, hl.vert_offset) for hl in ths.int_helixes]
+            ),
+            "ext_helixes": np.array(
+                [(hl.radius, hl.horz_offset, hl.vert_offset) for hl in ths.ext_helixes]
+            ),
+        }
+    elif kind == "samples":
+        helixes = ths.int_helixes if internal else ths.ext_helixes
+        arrays = {
+            "points": sample_starts(ths.ht, helixes, t_values(ths.ht, num), dtype)
+        }
+    elif kind == "mesh":
+        mesh = thread_mesh(ths, internal, num, dtype)
+        arrays = {"vertices": mesh.vertices, "faces": mesh.faces}
+    else:
+        raise ValueError(f"kind:{kind} should be one of {_KINDS}")
+    return encode_arrays(arrays)
+
+
+def request_key(kind: str, params: Mapping[str, Any]) -> Tuple[Any, ...]:
+    """
+    The key identifying requests for the same geometry. It is built from
+    the HelicalThread and options as they are computed, so values written
+    differently such as 1 and 1.0, and omitted defaults, have equal keys.
+    Profiles don't depend on the options.
+
+    :param kind: profiles, samples or mesh
+    :param params: The request
+    :returns: The key
+    """
+    ht: HelicalThread = _thread(params)
+    if kind == "profiles":
+        return (kind, astuple(ht))
+    num, internal, dtype = _options(params)
+    return (kind, astuple(ht), num, internal, dtype.name)
+
+
+class ThreadServer:
+    """
+    Serve thread geometry over HTTP on a local TCP port or Unix socket,
+    see the module documentation.
+    """
+
+    def __init__(
+        self, processes: Optional[int] = None, executor: Optional[Executor] = None
+    ) -> None:
+        """
+        :param processes: The number of worker processes
+        :param executor: The executor the geometry is computed on, default
+                         a ProcessPoolExecutor of processes workers
+        """
+        self._own_executor: bool = executor is None
+        # Spawn the workers so they don't inherit the sockets of the server
+        self.executor: Executor = executor or ProcessPoolExecutor(
+            processes, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._inflight: Dict[Tuple[Any, ...], "asyncio.Future[bytes]"] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+        self.computed: int = 0
+        """The number of computations started"""
+
+        self.coalesced: int = 0
+        """The number of requests that waited for another's computation"""
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None
+    ) -> None:
+        """
+        Start serving on host and port or, if path is not None, on the
+        Unix socket at path. Port 0 picks a free port, see `address`.
+        """
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+
+    @property
+    def address(self) -> Any:
+        """The address of the socket, (host, port) or the Unix socket path"""
+        assert isinstance(self._server, asyncio.base_events.Server)
+        return self._server.sockets[0].getsockname()
+
+    async def close(self) -> None:
+        """Stop serving and shut down the executor if it was created here"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._own_executor:
+            self.executor.shutdown()
+
+    async def geometry(self, kind: str, params: Mapping[str, Any]) -> bytes:
+        """
+        Return the encoded geometry of a request, coalescing identical
+        requests onto one computation.
+
+        :param kind: profiles, samples or mesh
+        :param params: The request
+        :returns: The arrays in the binary layout
+        """
+        key: Tuple[Any, ...] = request_key(kind, params)
+        future: Optional["asyncio.Future[bytes]"] = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, compute, kind, dict(params))
+        self._inflight[key] = future
+        self.computed += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            status, body = await self._respond(reader)
+            content_type: str = (
+                "application/octet-stream" if status == 200 else "text/plain"
+            )
+            writer.write(
+                (
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode()
+            )
+            writer.write(body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _respond(self, reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+        request_line: str = (await reader.readline()).decode("latin-1").strip()
+        headers: Dict[str, str] = {}
+        while True:
+            line: str = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        parts: List[str] = request_line.split()
+        if len(parts) != 3 or parts[0] != "POST":
+            return (400, b"expected POST")
+        kind: str = parts[1].strip("/")
+        if kind not in _KINDS:
+            return (404, f"{parts[1]} not found".encode())
+
+        try:
+            length: int = int(headers.get("content-length", 0))
+            if length < 0:
+                raise ValueError(f"content-length:{length} should be >= 0")
+            if length > MAX_BODY:
+                return (413, f"content-length:{length} exceeds {MAX_BODY}".encode())
+            body: bytes = await reader.readexactly(length)
+            params = json.loads(body or b"{}")
+            if not isinstance(params, dict):
+                raise ValueError("the request must be a JSON object")
+            _thread(params)
+            return (200, await self.geometry(kind, params))
+        except asyncio.IncompleteReadError as e:
+            return (400, f"body ended after {len(e.partial)} of {length}".encode())
+        except (ValueError, TypeError) as e:
+            return (400, str(e).encode())
+        except Exception as e:
+            return (500, repr(e).encode())
+
+
+async def fetch(
+    kind: str,
+    params: Mapping[str, Any],
+    host: str = "127.0.0.1",
+    port: int = 0,
+    path: Optional[str] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Request geometry from a ThreadServer
+
+    :param kind: profiles, samples or mesh
+    :param params: The request, see the module documentation
+    :param host: The host of the server
+    :param port: The port of the server
+    :param path: If not None the Unix socket of the server
+    :returns: The decoded arrays
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    body: bytes = json.dumps(params).encode()
+    writer.write(
+        (
+            f"POST /{kind} HTTP/1.1\r\nHost: {host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        ).encode()
+        + body
+    )
+    await writer.drain()
+
+    status: int = int((await reader.readline()).split()[1])
+    length: int = 0
+    while True:
+        line: bytes = (await reader.readline()).strip()
+        if not line:
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    payload: bytes = await reader.readexactly(length)
+    writer.close()
+
+    if status != 200:
+        raise ValueError(f"{status}: {payload.decode(errors='replace')}")
+    return decode_arrays(payload)
@@ -0,0 +1,237 @@
+"""
+Monte Carlo tolerance stack-up of the fit of an internal and external
+thread.
+
+The parameters of the nut, which supplies the internal thread, and the
+bolt, which supplies the external thread, are drawn from distributions
+and the clearances of every pair are computed with `helical_thread_batch`
+in chunks. A pair fits when the external thread clears the core of the
+nut, the internal thread clears the core of the bolt and the axial play
+between the flanks covers the accumulated lead error over the engagement.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .batch import HelicalThreadBatch, helical_thread_batch
+from .geometry2d import vertical_gap
+from .helicalthread import HelicalThread
+from .instrumentation import count, timed
+
+
+@dataclass
+class Normal:
+    """A normal distribution"""
+
+    mean: float
+    std: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.normal(self.mean, self.std, size)
+
+
+@dataclass
+class Uniform:
+    """A uniform distribution over [low, high)"""
+
+    low: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.uniform(self.low, self.high, size)
+
+
+@dataclass
+class Triangular:
+    """A triangular distribution over [low, high] with its peak at mode"""
+
+    low: float
+    mode: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.triangular(self.low, self.mode, self.high, size)
+
+
+Distribution = Union[Normal, Uniform, Triangular]
+
+DEFAULT_PERCENTILES: Tuple[float, ...] = (0.1, 1, 5, 50, 95, 99, 99.9)
+
+
+@dataclass
+class StackupResult:
+    """
+    The clearances of every sampled pair, negative values are
+    interferences. See `fit_stackup`.
+    """
+
+    major_clearance: np.ndarray
+    """Clearance between the external thread and the core of the nut"""
+
+    minor_clearance: np.ndarray
+    """Clearance between the internal thread and the core of the bolt"""
+
+    axial_margin: np.ndarray
+    """Axial play between the flanks less the lead error"""
+
+    @property
+    def samples(self) -> int:
+        """The number of sampled pairs"""
+        return len(self.axial_margin)
+
+    @property
+    def fits(self) -> np.ndarray:
+        """True for each pair that fits"""
+        return (
+            (self.major_clearance >= 0)
+            & (self.minor_clearance >= 0)
+            & (self.axial_margin >= 0)
+        )
+
+    @property
+    def fit_rate(self) -> float:
+        """The fraction of the pairs that fit"""
+        return float(np.mean(self.fits))
+
+    def percentiles(
+        self, q: Sequence[float] = DEFAULT_PERCENTILES
+    ) -> Dict[str, np.ndarray]:
+        """
+        Return the percentiles of each clearance
+
+        :param q: The percentiles to compute, 0..100
+        :returns: A dict of clearance name to an array of percentiles
+        """
+        return {f.name: np.percentile(getattr(self, f.name), q) for f in fields(self)}
+
+
+def _sample_batch(
+    nominal: HelicalThread,
+    variation: Mapping[str, Distribution],
+    rng: np.random.Generator,
+    size: int,
+) -> HelicalThreadBatch:
+    values: Dict[str, np.ndarray] = {
+        f.name: np.full(size, getattr(nominal, f.name))
+        for f in fields(HelicalThreadBatch)
+    }
+    for name, dist in variation.items():
+        if name not in values:
+            raise ValueError(f"{name} is not a field of HelicalThread")
+        values[name] = dist.sample(rng, size)
+    return HelicalThreadBatch(**values)
+
+
+def _clearances(
+    nut: HelicalThreadBatch, bolt: HelicalThreadBatch, engagement: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the major, minor and axial clearances of each pair"""
+    nut_ths = helical_thread_batch(nut)
+    bolt_ths = helical_thread_batch(bolt)
+
+    # The internal thread at z = 0 and one pitch above with the external
+    # thread between them as in test_helical_thread.py.
+    int0: np.ndarray = nut_ths.int_profiles
+    int1: np.ndarray = (
+        int0 + np.stack((np.zeros_like(nut.pitch), nut.pitch), -1)[:, np.newaxis]
+    )
+    ext: np.ndarray = (
+        bolt_ths.ext_profiles
+        + np.stack((np.zeros_like(bolt.pitch), bolt.pitch / 2), -1)[:, np.newaxis]
+    )
+
+    major: np.ndarray = nut_ths.int_helix_radius - np.max(ext[:, :, 0], axis=1)
+    minor: np.ndarray = np.min(int0[:, :, 0], axis=1) - bolt_ths.ext_helix_radius
+
+    # The axial play is how far the external thread can move up plus how
+    # far it can move down, the flip of z turns moving down into moving up.
+    flip: np.ndarray = np.array([1, -1])
+    play_up: np.ndarray = np.minimum(
+        vertical_gap(ext, int1), vertical_gap(int1 * flip, ext * flip)
+    )
+    play_down: np.ndarray = np.minimum(
+        vertical_gap(ext * flip, int0 * flip), vertical_gap(int0, ext)
+    )
+    lead_error: np.ndarray = np.abs(bolt.pitch - nut.pitch) * (engagement / nut.pitch)
+    return (major, minor, play_up + play_down - lead_error)
+
+
+def _run_chunk(
+    args: Tuple[
+        HelicalThread,
+        Mapping[str, Distribution],
+        HelicalThread,
+        Mapping[str, Distribution],
+        Optional[float],
+        int,
+        np.random.SeedSequence,
+    ],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    nut, nut_variation, bolt, bolt_variation, engagement, size, seed = args
+    rng: np.random.Generator = np.random.default_rng(seed)
+    nut_batch: HelicalThreadBatch = _sample_batch(nut, nut_variation, rng, size)
+    bolt_batch: HelicalThreadBatch = _sample_batch(bolt, bolt_variation, rng, size)
+    engaged: np.ndarray = (
+        nut_batch.height - (2 * nut_batch.inset_offset)
+        if engagement is None
+        else np.full(size, engagement)
+    )
+    return _clearances(nut_batch, bolt_batch, engaged)
+
+
+@timed("stackup")
+def fit_stackup(
+    nut: HelicalThread,
+    bolt: HelicalThread,
+    nut_variation: Optional[Mapping[str, Distribution]] = None,
+    bolt_variation: Optional[Mapping[str, Distribution]] = None,
+    samples: int = 1_000_000,
+    chunk_size: int = 1 << 16,
+    engagement: Optional[float] = None,
+    seed: Optional[int] = None,
+    processes: Optional[int] = None,
+) -> StackupResult:
+    """
+    Compute the clearances of samples pairs of nuts and bolts whose
+    HelicalThread fields are drawn from the given distributions.
+
+    :param nut: The nominal dimensions of the nut, its int_helixes are used
+    :param bolt: The nominal dimensions of the bolt, its ext_helixes are used
+    :param nut_variation: Distribution of each varying field of the nut
+    :param bolt_variation: Distribution of each varying field of the bolt
+    :param samples: Number of pairs
+    :param chunk_size: Number of pairs computed at a time
+    :param engagement: The length of engagement used for the lead error,
+                       default the nut's height - (2 * inset_offset)
+    :param seed: Seed of the random numbers, the result only depends on
+                 the seed and chunk_size not on processes
+    :param processes: If not None the number of processes of a process
+                      pool the chunks are computed on
+    :returns: The clearances of every pair
+    """
+    count("stackup_samples", samples)
+    sizes: List[int] = [
+        min(chunk_size, samples - lo) for lo in range(0, samples, chunk_size)
+    ]
+    seeds: List[np.random.SeedSequence] = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [
+        (nut, nut_variation or {}, bolt, bolt_variation or {}, engagement, size, s)
+        for size, s in zip(sizes, seeds)
+    ]
+
+    results: List[Tuple[np.ndarray, np.ndarray, np.ndarray]]
+    if processes is None:
+        results = [_run_chunk(a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_run_chunk, args))
+
+    major, minor, axial = zip(*results) if results else ((), (), ())
+    return StackupResult(
+        major_clearance=np.concatenate(major or [np.empty(0)]),
+        minor_clearance=np.concatenate(minor or [np.empty(0)]),
+        axial_margin=np.concatenate(axial or [np.empty(0)]),
+    )
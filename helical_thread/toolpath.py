@@ -0,0 +1,238 @@
+"""
+Thread milling and single point toolpaths generated from ThreadHelixes.
+
+The tool cuts the groove between the teeth of the thread, half a pitch
+above each tooth, in passes of stepdown from the crest of the teeth to
+their root. The tool center follows a helix at the cut radius offset by
+the tool radius, inwards for the internal thread and outwards for the
+external thread. Where the thread is not tapered this is an exact helix
+and is output as helical arcs, where it tapers the depth of the cut runs
+out with the taper and the path is output as linear segments within
+tolerance of the helix.
+
+The moves are generated lazily so the toolpath of a long thread is never
+held in memory, `gcode` formats them as G-code lines.
+"""
+
+from dataclasses import dataclass
+from math import acos, ceil, pi
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+from taperable_helix import HelixLocation
+
+from .evaluator import compile_helixes, start_rotations
+from .helicalthread import ThreadHelixes
+from .instrumentation import count, stage
+
+# The largest angle of a helical arc, controllers differ in how they
+# handle larger arcs.
+MAX_ARC: float = pi
+
+# Number of linear segments computed at a time
+_CHUNK: int = 4096
+
+
+@dataclass
+class Move:
+    """
+    A move of the tool center, code is G0 for a rapid, G1 for a linear
+    move and G2/G3 for a clockwise/counter clockwise helical arc about
+    the z axis.
+    """
+
+    code: str
+    """G0, G1, G2 or G3"""
+
+    x: float
+    y: float
+    z: float
+
+    i: Optional[float] = None
+    """The x offset of the arc center from the start of the move"""
+
+    j: Optional[float] = None
+    """The y offset of the arc center from the start of the move"""
+
+
+def _crest_depth(ths: ThreadHelixes, internal: bool) -> Tuple[float, float]:
+    """The radius of the crest of the teeth and the depth of the thread"""
+    if internal:
+        depth: float = max(-hl.horz_offset for hl in ths.int_helixes)
+        return (ths.int_helix_radius - depth, depth)
+    depth = max(hl.horz_offset for hl in ths.ext_helixes)
+    return (ths.ext_helix_radius + depth, depth)
+
+
+class _Path:
+    """The helix of the tool center of one pass of one start"""
+
+    def __init__(
+        self, ths: ThreadHelixes, hl: HelixLocation, rotation: np.ndarray
+    ) -> None:
+        self.ths = ths
+        self.evaluator = compile_helixes(ths.ht, [hl], ths.ht.lead)
+        self.max_radius: float = max(hl.radius, hl.radius + hl.horz_offset)
+        self.rotation_t: np.ndarray = rotation.T
+        self.z_offset: float = ths.ht.pitch / 2
+
+    def points(self, t: np.ndarray) -> np.ndarray:
+        pts: np.ndarray = self.evaluator.points(t)[0]
+        pts[:, 2] += self.z_offset
+        return pts @ self.rotation_t
+
+    def point(self, t: float) -> Tuple[float, float, float]:
+        x, y, z = self.points(np.array([t]))[0].tolist()
+        return (x, y, z)
+
+    def lines(self, t0: float, t1: float, tolerance: float) -> Iterator[Move]:
+        """Linear moves from t0 to t1 within tolerance of the helix"""
+        ht = self.ths.ht
+        if t1 <= t0:
+            return
+
+        # The initial step is the chord of the largest radius with a
+        # sagitta of tolerance, steps are halved where that isn't enough.
+        angle_step: float = 2 * acos(max(1 - (tolerance / self.max_radius), -1))
+        helix_height: float = ht.height - (2 * ht.inset_offset)
+        angle_per_t: float = (
+            2 * pi * helix_height / (ht.lead * (ht.last_t - ht.first_t))
+        )
+        dt: float = angle_step / angle_per_t
+
+        t: float = t0
+        while t < t1:
+            with stage("toolpath"):
+                segments: int = max(1, min(_CHUNK, ceil((t1 - t) / dt)))
+                ts: np.ndarray = np.minimum(t + (dt * np.arange(1, segments + 1)), t1)
+                starts: np.ndarray = np.concatenate(([t], ts[:-1]))
+                ends: np.ndarray = self.points(np.concatenate(([t], ts)))
+                mids: np.ndarray = self.points((starts + ts) / 2)
+                chord_mids: np.ndarray = (ends[:-1] + ends[1:]) / 2
+                error: float = float(np.max(np.linalg.norm(mids - chord_mids, axis=1)))
+            if error > tolerance:
+                dt /= 2
+                continue
+            count("moves", segments)
+            for x, y, z in ends[1:].tolist():
+                yield Move("G1", x, y, z)
+            t = float(ts[-1])
+
+    def arcs(self, t0: float, t1: float) -> Iterator[Move]:
+        """Helical arcs from t0 to t1 where the radius is constant"""
+        ht = self.ths.ht
+        if t1 <= t0:
+            return
+        helix_height: float = ht.height - (2 * ht.inset_offset)
+        angle: float = (
+            2 * pi * helix_height * (t1 - t0) / (ht.lead * (ht.last_t - ht.first_t))
+        )
+        arcs: int = max(1, ceil(angle / MAX_ARC))
+        count("moves", arcs)
+        with stage("toolpath"):
+            pts: List[List[float]] = self.points(np.linspace(t0, t1, arcs + 1)).tolist()
+        for (x0, y0, _), (x, y, z) in zip(pts[:-1], pts[1:]):
+            yield Move("G3", x, y, z, i=-x0, j=-y0)
+
+
+def toolpath(
+    ths: ThreadHelixes,
+    internal: bool,
+    tool_radius: float,
+    stepdown: float,
+    tolerance: float = 0.001,
+    arcs: bool = True,
+    retract: float = 1,
+) -> Iterator[Move]:
+    """
+    Generate the moves of the tool center milling the internal or external
+    thread of ths with a single form thread mill or single point tool whose
+    tip is at its center height.
+
+    Every pass starts and ends at a retract position, the axis for the
+    internal thread and retract outside the crest for the external thread,
+    external passes return to the start above the part.
+
+    :param ths: The helixes of the thread
+    :param internal: True to cut the internal thread, False the external
+    :param tool_radius: The radius of the tip of the tool
+    :param stepdown: The radial depth of cut of each pass
+    :param tolerance: The maximum distance of the linear segments from the
+                      helix, it controls the number of moves
+    :param arcs: If True the untapered part of each pass is output as
+                 helical arcs otherwise as linear segments
+    :param retract: The clearance of the retract position and height
+    :returns: A generator of the moves
+    :raises ValueError: On a bad argument, when called rather than iterated
+    """
+    if stepdown <= 0 or tolerance <= 0:
+        raise ValueError(f"stepdown:{stepdown} and tolerance:{tolerance} must be > 0")
+    crest, depth = _crest_depth(ths, internal)
+    if internal and tool_radius >= crest:
+        raise ValueError(f"tool_radius:{tool_radius} must be < crest radius:{crest}")
+    return _moves(ths, internal, tool_radius, stepdown, tolerance, arcs, retract)
+
+
+def _moves(
+    ths: ThreadHelixes,
+    internal: bool,
+    tool_radius: float,
+    stepdown: float,
+    tolerance: float,
+    arcs: bool,
+    retract: float,
+) -> Iterator[Move]:
+    """The moves of `toolpath` once its arguments are checked"""
+    crest, depth = _crest_depth(ths, internal)
+    ht = ths.ht
+    evaluator = ths.compile(internal)
+    t_out: float = evaluator.taper_out_ends
+    t_in: float = evaluator.taper_in_starts
+    passes: int = max(1, ceil((depth / stepdown) - 1e-9))
+    sign: float = 1 if internal else -1
+    center: float = crest - (sign * tool_radius)
+    retract_radius: float = 0 if internal else crest + tool_radius + retract
+    safe_z: float = ht.height + (ht.pitch / 2) + retract
+
+    for rotation in start_rotations(ht.starts):
+        for p in range(1, passes + 1):
+            cut: float = min(p * stepdown, depth)
+            path = _Path(
+                ths,
+                HelixLocation(radius=center, horz_offset=sign * cut, vert_offset=0),
+                rotation,
+            )
+            x, y, z = path.point(ht.first_t)
+            scale: float = retract_radius / np.hypot(x, y)
+            if not internal:
+                yield Move("G0", x * scale, y * scale, safe_z)
+            yield Move("G0", x * scale, y * scale, z)
+            yield Move("G1", x, y, z)
+
+            if arcs:
+                yield from path.lines(ht.first_t, t_out, tolerance)
+                yield from path.arcs(max(ht.first_t, t_out), min(ht.last_t, t_in))
+                yield from path.lines(max(t_out, t_in), ht.last_t, tolerance)
+            else:
+                yield from path.lines(ht.first_t, ht.last_t, tolerance)
+
+            x, y, z = path.point(ht.last_t)
+            scale = retract_radius / np.hypot(x, y)
+            yield Move("G1", x * scale, y * scale, z)
+            if not internal:
+                yield Move("G0", x * scale, y * scale, safe_z)
+
+
+def gcode(moves: Iterator[Move], digits: int = 4) -> Iterator[str]:
+    """
+    Format moves as G-code lines
+
+    :param moves: The moves, typically from `toolpath`
+    :param digits: The number of digits after the decimal point
+    :returns: A generator of the lines
+    """
+    for m in moves:
+        line: str = f"{m.code} X{m.x:.{digits}f} Y{m.y:.{digits}f} Z{m.z:.{digits}f}"
+        if m.i is not None and m.j is not None:
+            line += f" I{m.i:.{digits}f} J{m.j:.{digits}f}"
+        yield line
@@ -0,0 +1,178 @@
+"""
+Plotly visualization of ThreadHelixes.
+
+The helixes of a thread are evaluated by `ThreadHelixes.compile` and
+passed to plotly as numpy arrays, all of the helixes of a thread in a
+single Scatter3d trace separated by NaNs, or the thread as a single
+Mesh3d. The arrays are float32, plenty for the screen, which halves the
+size of the figure's JSON.
+
+Large threads are decimated by sampling fewer points along the helixes,
+pass max_points to bound the number of points of a trace.
+
+plotly is only needed when creating traces or figures, it is imported
+when first used.
+"""
+
+from typing import Any, List, Optional
+
+import numpy as np
+
+from .helicalthread import ThreadHelixes
+from .instrumentation import timed
+from .mesh import thread_mesh
+
+# The number of samples per helix when neither num nor max_points limit it
+DEFAULT_NUM: int = 500
+
+
+def _num(lines: int, num: int, max_points: Optional[int]) -> int:
+    """
+    The number of samples per line so lines lines, each followed by a
+    NaN separator, have no more than max_points points.
+    """
+    if max_points is None:
+        return num
+    return max(2, min(num, (max_points // lines) - 1))
+
+
+def helix_lines(
+    ths: ThreadHelixes,
+    internal: bool,
+    num: int = DEFAULT_NUM,
+    vert_offset: float = 0,
+    max_points: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Sample the helixes of every start of the internal or external thread
+    and join them into one polyline with a row of NaNs between helixes.
+
+    :param ths: The helixes of the thread
+    :param internal: True for the internal thread, False for the external
+    :param num: The number of samples of each helix
+    :param vert_offset: Added to z of every point
+    :param max_points: If not None the maximum number of rows returned,
+                       num is reduced to fit
+    :returns: An (M, 3) float32 array of x, y, z points
+    """
+    helixes = ths.int_helixes if internal else ths.ext_helixes
+    lines: int = len(helixes) * ths.ht.starts
+    n: int = _num(lines, num, max_points)
+    evaluator = ths.compile(internal)
+    pts: np.ndarray = evaluator.start_points(evaluator.t_values(n), np.float32)
+    pts[..., 2] += vert_offset
+
+    result: np.ndarray = np.full((lines, n + 1, 3), np.nan, dtype=np.float32)
+    result[:, :n] = pts.reshape(lines, n, 3)
+    return result.reshape(-1, 3)
+
+
+def scatter3d(points: np.ndarray, name: str, **kwargs: Any) -> Any:
+    """
+    Return a plotly Scatter3d of lines through points
+
+    :param points: (M, 3) array of points, NaN rows break the lines
+    :param name: The name of the trace
+    :param kwargs: Other Scatter3d properties
+    :returns: The Scatter3d
+    """
+    import plotly.graph_objs as go
+
+    return go.Scatter3d(
+        x=points[:, 0],
+        y=points[:, 1],
+        z=points[:, 2],
+        mode="lines",
+        name=name,
+        connectgaps=False,
+        **kwargs,
+    )
+
+
+def mesh3d(
+    ths: ThreadHelixes,
+    internal: bool,
+    name: str,
+    num: int = DEFAULT_NUM,
+    vert_offset: float = 0,
+    max_points: Optional[int] = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    Return a plotly Mesh3d of the internal or external thread, see
+    `thread_mesh`.
+
+    :param ths: The helixes of the thread
+    :param internal: True for the internal thread, False for the external
+    :param name: The name of the trace
+    :param num: The number of rings of each start
+    :param vert_offset: Added to z of every vertex
+    :param max_points: If not None the maximum number of vertices, num
+                       is reduced to fit
+    :param kwargs: Other Mesh3d properties
+    :returns: The Mesh3d
+    """
+    import plotly.graph_objs as go
+
+    helixes = ths.int_helixes if internal else ths.ext_helixes
+    rings: int = len(helixes) * ths.ht.starts
+    n: int = num if max_points is None else max(2, min(num, max_points // rings))
+    mesh = thread_mesh(ths, internal, n, np.float32)
+    vertices: np.ndarray = mesh.vertices
+    faces: np.ndarray = mesh.faces.astype(np.int32)
+    return go.Mesh3d(
+        x=vertices[:, 0],
+        y=vertices[:, 1],
+        z=vertices[:, 2] + np.float32(vert_offset),
+        i=faces[:, 0],
+        j=faces[:, 1],
+        k=faces[:, 2],
+        name=name,
+        **kwargs,
+    )
+
+
+@timed("viz")
+def thread_figure(
+    ths: ThreadHelixes,
+    int_ext_both: str = "both",
+    num: int = DEFAULT_NUM,
+    max_points: Optional[int] = None,
+    mesh: bool = False,
+) -> Any:
+    """
+    Return a plotly Figure of the internal, external or both threads. When
+    both, the external thread is raised by pitch / 2 so the threads are
+    shown mated.
+
+    :param ths: The helixes of the thread
+    :param int_ext_both: int, ext or both
+    :param num: The number of samples of each helix
+    :param max_points: If not None the maximum number of points of each trace
+    :param mesh: If True the threads are a Mesh3d otherwise their helixes
+                 are lines
+    :returns: The Figure
+    """
+    import plotly.graph_objs as go
+
+    traces: List[Any] = []
+    for name, internal in (("int", True), ("ext", False)):
+        if int_ext_both not in (name, "both"):
+            continue
+        vert_offset: float = (
+            ths.ht.pitch / 2 if not internal and int_ext_both == "both" else 0
+        )
+        if mesh:
+            traces.append(
+                mesh3d(ths, internal, name, num, vert_offset, max_points=max_points)
+            )
+        else:
+            points: np.ndarray = helix_lines(
+                ths, internal, num, vert_offset, max_points=max_points
+            )
+            traces.append(scatter3d(points, name))
+
+    return go.Figure(
+        data=traces,
+        layout_scene_camera_projection_type="orthographic",
+    )
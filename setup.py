@@ -10,6 +10,7 @@ with open("README.rst", "r") as fh:
     readme = fh.read()
 
 requirements: List[str] = [
+    "numpy",
     "taperable-helix",
 ]
 
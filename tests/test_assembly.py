@@ -0,0 +1,97 @@
+import io
+import xml.etree.ElementTree as ET
+import zipfile
+from math import cos, sin
+
+import numpy as np
+
+from helical_thread import (
+    HelicalThread,
+    Placement,
+    build_assembly,
+    check_mesh,
+    export,
+    helical_thread,
+    instrument,
+    thread_mesh,
+)
+
+m4 = HelicalThread(radius=2, pitch=0.7, height=4, taper_out_rpos=0.1, taper_in_rpos=0.9)
+m6 = HelicalThread(radius=3, pitch=1, height=6, taper_out_rpos=0.1, taper_in_rpos=0.9)
+
+
+def _transform(angle: float, x: float, y: float) -> np.ndarray:
+    t = np.eye(4)
+    t[:2, :2] = [[cos(angle), -sin(angle)], [sin(angle), cos(angle)]]
+    t[:3, 3] = (x, y, 0)
+    return t
+
+
+# A plate of holes and two bolts, the equal threads are separate objects
+placements = [
+    Placement(
+        HelicalThread(**vars(m4)) if i % 2 else m4, _transform(i * 0.1, i * 10, 5)
+    )
+    for i in range(50)
+] + [Placement(m6, _transform(0, 0, -20), internal=False)] * 2
+
+
+def test_dedupe() -> None:
+    with instrument() as inst:
+        assembly = build_assembly(placements, num=40)
+    assert list(assembly.meshes) == ["thread0_int", "thread1_ext"]
+    assert inst.counters["assembly_meshes"] == 2
+    assert inst.timers["mesh"].calls == 2
+    assert len(assembly) == 52
+    assert assembly.instances[-1] == "thread1_ext"
+
+
+def test_mesh() -> None:
+    assembly = build_assembly(placements, num=40)
+    merged = assembly.mesh()
+    hole = thread_mesh(helical_thread(m4), True, 40)
+    bolt = thread_mesh(helical_thread(m6), False, 40)
+    assert len(merged.vertices) == (50 * len(hole.vertices)) + (2 * len(bolt.vertices))
+    assert len(merged.faces) == (50 * len(hole.faces)) + (2 * len(bolt.faces))
+
+    # The copies of each mesh are consecutive in placement order
+    n = len(hole.vertices)
+    t = placements[7].transform
+    expected = (hole.vertices @ t[:3, :3].T) + t[:3, 3]
+    assert np.allclose(merged.vertices[7 * n : 8 * n], expected, rtol=0, atol=1e-12)
+    assert np.array_equal(merged.faces[: len(hole.faces)], hole.faces)
+    assert np.array_equal(
+        merged.faces[len(hole.faces) : 2 * len(hole.faces)], hole.faces + n
+    )
+
+    report = check_mesh(merged)
+    assert report.closed and report.oriented
+
+
+def test_float32() -> None:
+    merged = build_assembly(placements[:3], num=20, dtype=np.float32).mesh()
+    assert merged.vertices.dtype == np.float32
+
+
+def test_3mf() -> None:
+    assembly = build_assembly(placements, num=20)
+    f = io.BytesIO()
+    assembly.write_3mf(f)
+    with zipfile.ZipFile(f) as z:
+        model = ET.fromstring(z.read("3D/3dmodel.model"))
+
+    ns = {"m": export.MODEL_NAMESPACE}
+    objects = model.findall("m:resources/m:object", ns)
+    assert len(objects) == 3
+    assert len(objects[0].findall("m:mesh/m:vertices/m:vertex", ns)) == len(
+        assembly.meshes["thread0_int"].vertices
+    )
+    components = objects[2].findall("m:components/m:component", ns)
+    assert [c.attrib["objectid"] for c in components] == ["1"] * 50 + ["2"] * 2
+    items = model.findall("m:build/m:item", ns)
+    assert [i.attrib["objectid"] for i in items] == ["3"]
+
+    # 3MF transforms row vectors, the translation is the last row
+    m = np.array([float(v) for v in components[7].attrib["transform"].split()])
+    t = placements[7].transform
+    assert np.allclose(m.reshape(4, 3), t[:3].T)
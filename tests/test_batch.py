@@ -0,0 +1,102 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from helical_thread import (
+    HelicalThread,
+    HelicalThreadBatch,
+    helical_thread,
+    helical_thread_batch,
+    thread_derived,
+)
+
+pitch = 2
+
+
+def test_matches_helical_thread() -> None:
+    threads = [
+        HelicalThread(
+            radius=8,
+            pitch=pitch,
+            height=4,
+            angle_degs=angle_degs,
+            major_cutoff=major_cutoff,
+            minor_cutoff=minor_cutoff,
+            ext_clearance=ext_clearance,
+            thread_overlap=thread_overlap,
+        )
+        for angle_degs, major_cutoff, minor_cutoff, ext_clearance, thread_overlap in (
+            itertools.product(
+                (60, 90), (0, pitch / 8), (0, pitch / 4), (0, 0.05, 0.3), (0, 0.001)
+            )
+        )
+    ]
+    ths_batch = helical_thread_batch(HelicalThreadBatch.from_threads(threads))
+
+    assert len(ths_batch) == len(threads)
+    for i, ht in enumerate(threads):
+        assert ths_batch.thread_helixes(i) == helical_thread(ht)
+
+
+def test_broadcast() -> None:
+    htb = HelicalThreadBatch(
+        radius=np.array([4, 8, 16]), pitch=np.array(pitch), height=np.array(10)
+    )
+    ths_batch = helical_thread_batch(htb)
+
+    assert len(htb) == 3
+    assert htb.thread(1) == HelicalThread(radius=8, pitch=pitch, height=10)
+    assert ths_batch.int_profiles.shape == (3, 4, 2)
+    assert np.all(ths_batch.int_count == 3)
+    assert np.allclose(np.diff(ths_batch.ext_helix_radius), [4, 8])
+
+
+def test_thread_derived() -> None:
+    threads = [
+        HelicalThread(radius=8, pitch=pitch, height=10, major_cutoff=cutoff)
+        for cutoff in (0, 0.5)
+    ]
+    d = thread_derived(HelicalThreadBatch.from_threads(threads))
+    for i, ht in enumerate(threads):
+        assert tuple(np.asarray(d)[:, i]) == thread_derived(ht)
+    # The first external thread has three points and the clamped depth
+    opposite, ext_depth, int_depth = np.asarray(
+        (
+            d.ext_thread_half_height_at_opposite_ext_helix_radius,
+            d.ext_thread_depth,
+            d.int_thread_depth,
+        )
+    )
+    assert opposite[0] == 0 and opposite[1] > 0
+    assert ext_depth[0] != int_depth[0] and ext_depth[1] == int_depth[1]
+
+
+def test_starts() -> None:
+    threads = [
+        HelicalThread(radius=8, pitch=pitch, height=10, starts=starts)
+        for starts in (1, 2, 3)
+    ]
+    htb = HelicalThreadBatch.from_threads(threads)
+    assert htb.starts.dtype.kind == "i"
+    assert list(htb.starts) == [1, 2, 3]
+    ths_batch = helical_thread_batch(htb)
+    for i, ht in enumerate(threads):
+        assert htb.thread(i) == ht
+        assert isinstance(htb.thread(i).starts, int)
+        assert ths_batch.thread_helixes(i) == helical_thread(ht)
+
+    # The default is a single start
+    htb = HelicalThreadBatch(
+        radius=np.array([4, 8]), pitch=np.array(pitch), height=np.array(10)
+    )
+    assert htb.thread(1).starts == 1
+
+    for starts in (0, -1, 2.5):
+        with pytest.raises(ValueError):
+            HelicalThreadBatch(
+                radius=np.array([4, 8]),
+                pitch=np.array(pitch),
+                height=np.array(10),
+                starts=np.array([1, starts]),
+            )
@@ -0,0 +1,114 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+from helical_thread import (
+    HelicalThread,
+    HelicalThreadBatch,
+    ThreadConfig,
+    helical_thread,
+    helical_thread_batch,
+    load_config,
+    parse_config,
+)
+from helical_thread.config import DERIVED
+
+defaults_ini = os.path.join(os.path.dirname(__file__), "..", "defaults.ini")
+
+
+def test_defaults_ini() -> None:
+    config = load_config(defaults_ini)
+    values = config.values()
+    assert values["int_ext_both"] == "both"
+    assert values["quick_usage"] is True
+    assert values["height"] == 10 + (2 * 0.75)
+    assert values["major_cutoff"] == 2 / 8
+
+    ht = config.thread()
+    assert ht == HelicalThread(
+        radius=4,
+        pitch=2,
+        height=11.5,
+        taper_out_rpos=0.05,
+        taper_in_rpos=0.95,
+        inset_offset=0.75,
+        angle_degs=90,
+        major_cutoff=0.25,
+        minor_cutoff=0.5,
+        ext_clearance=0.1,
+        thread_overlap=0.001,
+    )
+    # Every thread is new
+    assert config.thread() is not ht
+
+
+def test_overrides() -> None:
+    config = load_config(defaults_ini)
+    ht = config.thread({"pitch": 1, "dia_major": 10, "starts": 2})
+    assert ht.pitch == 1 and ht.radius == 5 and ht.starts == 2
+    assert ht.major_cutoff == 1 / 8
+    assert config.thread().pitch == 2
+    with pytest.raises(ValueError):
+        config.thread({"starts": 2.5})
+
+
+def test_batch() -> None:
+    config = load_config(defaults_ini)
+    pitch = np.linspace(0.5, 3, 100)
+    htb = config.batch({"pitch": pitch})
+    assert len(htb) == 100
+    assert np.array_equal(htb.minor_cutoff, pitch / 4)
+
+    expected = [config.thread({"pitch": p}) for p in pitch[:5]]
+    assert htb.thread(3) == expected[3]
+    ths = helical_thread_batch(htb)
+    assert ths.thread_helixes(4) == helical_thread(expected[4])
+    assert isinstance(htb, HelicalThreadBatch)
+
+    htb = config.batch({"pitch": pitch[:3], "starts": [1, 2, 3]})
+    assert htb.thread(2) == config.thread({"pitch": pitch[2], "starts": 3})
+
+
+def test_expressions() -> None:
+    config: ThreadConfig = parse_config(
+        {
+            "c": "min(a, b) ** 2 - -1",
+            "a": "sqrt(b) // 1 % 5",
+            "b": "self.ht.x + abs(-3)",
+            "x": "6",
+        }
+    )
+    assert config.order.index("x") < config.order.index("b") < config.order.index("a")
+    assert config.values()["c"] == 10
+    assert list(config.values({"x": np.array([13, 46])})["c"]) == [17, 5]
+
+
+def test_file_object() -> None:
+    config = load_config(io.StringIO("[part]\npitch = 1.5\nmod = pitch % 1\n"), "part")
+    assert config.values() == {"pitch": 1.5, "mod": 0.5}
+
+
+def test_derived_default() -> None:
+    with pytest.raises(TypeError):
+        DERIVED["radius"] = "0"  # type: ignore[index]
+    config = parse_config({"dia_major": "8"})
+    assert config.values()["radius"] == 4
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        {"a": "__import__('os')"},
+        {"a": "open"},
+        {"a": "b.c"},
+        {"a": "[1]"},
+        {"a": "1 +"},
+        {"a": "b"},
+        {"a": "b", "b": "a"},
+    ],
+)
+def test_invalid(text) -> None:
+    with pytest.raises(ValueError):
+        parse_config(text)
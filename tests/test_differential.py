@@ -0,0 +1,183 @@
+"""
+Compare the fast paths against the reference, `helical_thread` and
+`ht.helix(hl)` evaluated one point at a time, for many random threads
+and the edge cases of the profiles.
+"""
+
+from math import cos, pi, sin
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+from taperable_helix import HelixLocation
+
+from helical_thread import (
+    HelicalThread,
+    HelicalThreadBatch,
+    ThreadHelixes,
+    check_mesh,
+    compile_helixes,
+    helical_thread,
+    helical_thread_batch,
+    sample_helixes,
+    sample_starts,
+    thread_meshes,
+)
+from helical_thread.helicalthread import _ext_helixes, _int_helixes, thread_derived
+
+# Absolute tolerances relative to the size of the thread, the largest of
+# its radius and height. The float64 paths reorder a few operations, the
+# float32 paths round every point.
+FLOAT64_TOLERANCE: float = 1e-12
+FLOAT32_TOLERANCE: float = 1e-6
+
+# The number of t values compared of each thread
+NUM: int = 67
+
+
+def _random_thread(rng: np.random.Generator) -> HelicalThread:
+    pitch: float = float(rng.uniform(0.2, 5))
+    taper_out_rpos: float = float(rng.choice([0, rng.uniform(0, 0.5)]))
+    return HelicalThread(
+        radius=float(rng.uniform(1, 50)),
+        pitch=pitch,
+        height=float(rng.uniform(1, 20) * pitch),
+        taper_out_rpos=taper_out_rpos,
+        taper_in_rpos=float(rng.choice([1, rng.uniform(taper_out_rpos, 1)])),
+        inset_offset=float(rng.choice([0, rng.uniform(0, pitch / 2)])),
+        first_t=float(rng.choice([0, 0.5])),
+        last_t=float(rng.choice([1, 3])),
+        angle_degs=float(rng.uniform(30, 120)),
+        major_cutoff=float(rng.choice([0, rng.uniform(0, pitch / 4)])),
+        minor_cutoff=float(rng.choice([0, rng.uniform(0, pitch / 4)])),
+        ext_clearance=float(rng.choice([0, rng.uniform(0, pitch / 10)])),
+        thread_overlap=float(rng.choice([0, 0.001])),
+        starts=int(rng.integers(1, 5)),
+    )
+
+
+def _edge_threads() -> List[HelicalThread]:
+    """Threads whose profiles have 3 points or that have no tapers"""
+    base = dict(radius=4, pitch=1, height=6, angle_degs=60)
+    return [
+        # The external profile clamps to 3 points, major_cutoff / 2 < ext_vert_adj
+        HelicalThread(**base, major_cutoff=0, minor_cutoff=0.1, ext_clearance=0.1),
+        HelicalThread(**base, major_cutoff=0.01, minor_cutoff=0.1, ext_clearance=0.2),
+        # The internal profile has 3 points
+        HelicalThread(**base, major_cutoff=0.2, minor_cutoff=0),
+        # Both have 3 points, no clearance and no overlap
+        HelicalThread(**base, ext_clearance=0, thread_overlap=0),
+        # Tapered from end to end and not at all
+        HelicalThread(**base, taper_out_rpos=0.5, taper_in_rpos=0.5),
+        HelicalThread(**base, taper_out_rpos=0, taper_in_rpos=1, starts=3),
+    ]
+
+
+threads: List[HelicalThread] = _edge_threads() + [
+    _random_thread(np.random.default_rng(seed)) for seed in range(40)
+]
+
+
+def _reference(ht: HelicalThread, helixes: List[HelixLocation]) -> np.ndarray:
+    """The (starts, H, NUM, 3) points of every start, one point at a time"""
+    t: np.ndarray = np.linspace(ht.first_t, ht.last_t, NUM)
+    result: np.ndarray = np.empty((ht.starts, len(helixes), NUM, 3))
+    for h, hl in enumerate(helixes):
+        f = ht.helix(hl)
+        for i, ti in enumerate(t):
+            x, y, z = f(float(ti))
+            for k in range(ht.starts):
+                a: float = 2 * pi * k / ht.starts
+                result[k, h, i] = (
+                    (x * cos(a)) - (y * sin(a)),
+                    (x * sin(a)) + (y * cos(a)),
+                    z,
+                )
+    return result
+
+
+def _size(ht: HelicalThread) -> float:
+    return max(ht.radius, ht.height)
+
+
+def _sides(ths: ThreadHelixes) -> List[Tuple[bool, List[HelixLocation]]]:
+    return [(True, ths.int_helixes), (False, ths.ext_helixes)]
+
+
+@pytest.mark.parametrize("ht", threads, ids=range(len(threads)))
+def test_points(ht: HelicalThread) -> None:
+    ths = helical_thread(ht)
+    t: np.ndarray = np.linspace(ht.first_t, ht.last_t, NUM)
+    tolerance: float = FLOAT64_TOLERANCE * _size(ht)
+
+    for internal, helixes in _sides(ths):
+        expected: np.ndarray = _reference(ht, helixes)
+        evaluator = ths.compile(internal)
+
+        # The float64 paths
+        assert np.allclose(evaluator.start_points(t), expected, rtol=0, atol=tolerance)
+        assert np.array_equal(evaluator.points(t), evaluator.points(t, piecewise=False))
+        assert np.array_equal(sample_helixes(ht, helixes, t), evaluator.points(t))
+        assert np.array_equal(sample_starts(ht, helixes, t), evaluator.start_points(t))
+        chunks = np.concatenate(list(evaluator.chunks(NUM, chunk=16)), axis=1)
+        assert np.allclose(chunks, expected[0], rtol=0, atol=tolerance)
+        scalar = np.array(
+            [[evaluator.point(float(ti), h) for ti in t] for h in range(len(helixes))]
+        )
+        assert np.allclose(scalar, expected[0], rtol=0, atol=tolerance)
+
+        # The float32 paths
+        for piecewise in (True, False):
+            points32 = evaluator.points(t, np.float32, piecewise)
+            assert points32.dtype == np.float32
+            assert np.allclose(
+                points32, expected[0], rtol=0, atol=FLOAT32_TOLERANCE * _size(ht)
+            )
+        assert np.allclose(
+            evaluator.start_points(t, np.float32),
+            expected,
+            rtol=0,
+            atol=FLOAT32_TOLERANCE * _size(ht),
+        )
+
+
+def test_helixes() -> None:
+    # The batch computes the same helixes, including the 3 point profiles
+    ths_batch = helical_thread_batch(HelicalThreadBatch.from_threads(threads))
+    for i, ht in enumerate(threads):
+        ths = helical_thread(ht)
+        batched = ths_batch.thread_helixes(i)
+        assert batched.int_helixes == ths.int_helixes
+        assert batched.ext_helixes == ths.ext_helixes
+        assert batched.int_helix_radius == ths.int_helix_radius
+        assert batched.ext_helix_radius == ths.ext_helix_radius
+
+        # The lazy helixes are those of the scalar functions
+        assert (ths.int_helix_radius, ths.int_helixes) == _int_helixes(
+            ht, thread_derived(ht)
+        )
+        assert (ths.ext_helix_radius, ths.ext_helixes) == _ext_helixes(
+            ht, thread_derived(ht)
+        )
+        assert len(ths.int_helixes) == (4 if ht.minor_cutoff > 0 else 3)
+        assert ths.ext_helixes[2].vert_offset >= 0
+        assert len(ths.ext_helixes) == (4 if ths.ext_helixes[2].vert_offset > 0 else 3)
+
+        # The compiled constants are those of the thread
+        evaluator = compile_helixes(ht, ths.int_helixes, ht.lead, ht.starts)
+        assert evaluator == ths.compile(True)
+
+
+def test_edge_profiles() -> None:
+    counts = [len(helical_thread(ht).ext_helixes) for ht in _edge_threads()[:4]]
+    assert counts == [3, 3, 4, 3]
+    counts = [len(helical_thread(ht).int_helixes) for ht in _edge_threads()[:4]]
+    assert counts == [4, 4, 3, 3]
+
+
+@pytest.mark.parametrize("ht", threads[:12], ids=range(12))
+def test_meshes(ht: HelicalThread) -> None:
+    for mesh in thread_meshes(helical_thread(ht), num=40).values():
+        assert check_mesh(mesh).watertight
+    for mesh in thread_meshes(helical_thread(ht), num=40, dtype=np.float32).values():
+        assert check_mesh(mesh).closed
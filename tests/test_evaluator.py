@@ -0,0 +1,132 @@
+from dataclasses import FrozenInstanceError
+
+import numpy as np
+import pytest
+
+from helical_thread import (
+    HelicalThread,
+    compile_helixes,
+    helical_thread,
+    sample_helixes,
+    sample_starts,
+)
+
+ht = HelicalThread(
+    radius=4,
+    pitch=1,
+    height=6,
+    taper_out_rpos=0.1,
+    taper_in_rpos=0.9,
+    minor_cutoff=0.1,
+    major_cutoff=0.1,
+    starts=2,
+)
+ths = helical_thread(ht)
+
+
+def test_matches_helix() -> None:
+    evaluator = ths.compile(True)
+    t = evaluator.t_values(101)
+    points = evaluator.points(t)
+    assert points.shape == (len(ths.int_helixes), 101, 3)
+
+    for h, hl in enumerate(ths.int_helixes):
+        f = ht.helix(hl)
+        expected = np.array([f(x) for x in t])
+        assert np.allclose(points[h], expected, rtol=0, atol=1e-12)
+        scalar = np.array([evaluator.point(x, h) for x in t])
+        assert np.allclose(scalar, expected, rtol=0, atol=1e-12)
+
+
+def test_same_as_sampling() -> None:
+    evaluator = ths.compile(False)
+    t = evaluator.t_values(50)
+    assert np.array_equal(evaluator.points(t), sample_helixes(ht, ths.ext_helixes, t))
+    assert np.array_equal(
+        evaluator.start_points(t), sample_starts(ht, ths.ext_helixes, t)
+    )
+
+
+def test_chunks() -> None:
+    evaluator = ths.compile(True)
+    chunks = list(evaluator.chunks(1000, chunk=128))
+    assert len(chunks) == 8
+    assert np.allclose(
+        np.concatenate(chunks, axis=1),
+        evaluator.points(evaluator.t_values(1000)),
+        rtol=0,
+        atol=1e-12,
+    )
+    assert np.array_equal(
+        chunks[-1][:, -1], evaluator.points(np.array([ht.last_t]))[:, 0]
+    )
+
+
+def test_immutable_and_cached() -> None:
+    evaluator = ths.compile(True)
+    assert ths.compile(True) is evaluator
+    assert ths.compile(False) is not evaluator
+    with pytest.raises(FrozenInstanceError):
+        evaluator.first_t = 1  # type: ignore[misc]
+    with pytest.raises(ValueError):
+        evaluator.rotations[0, 0, 0] = 2
+    assert evaluator == compile_helixes(ht, ths.int_helixes, ht.lead, ht.starts)
+
+
+def test_bad_taper() -> None:
+    bad = HelicalThread(
+        radius=4, pitch=1, height=6, taper_out_rpos=0.6, taper_in_rpos=0.4
+    )
+    with pytest.raises(ValueError):
+        compile_helixes(bad, [], bad.lead)
+
+
+def test_dtype() -> None:
+    evaluator = ths.compile(True)
+    t = evaluator.t_values(100)
+    points = evaluator.start_points(t, np.float32)
+    assert points.dtype == np.float32
+    assert np.allclose(points, evaluator.start_points(t), rtol=0, atol=1e-5)
+    with pytest.raises(ValueError):
+        evaluator.points(t, np.int32)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize(
+    "taper", [(0.05, 0.95), (0.1, 0.9), (0, 1), (0, 0.5), (0.5, 0.5), (0.5, 1)]
+)
+def test_piecewise(taper, dtype) -> None:
+    tapered = helical_thread(
+        HelicalThread(
+            radius=4,
+            pitch=1,
+            height=6,
+            taper_out_rpos=taper[0],
+            taper_in_rpos=taper[1],
+            minor_cutoff=0.1,
+            major_cutoff=0.1,
+        )
+    )
+    evaluator = tapered.compile(False)
+    t = evaluator.t_values(1001)
+    rng = np.random.default_rng(3)
+    for ts in (t, t[::-1], rng.permutation(t), t[:1], t[500:501], t[:0]):
+        assert np.array_equal(
+            evaluator.points(ts, dtype),
+            evaluator.points(ts, dtype, piecewise=False),
+        )
+
+
+def test_body() -> None:
+    tapered = HelicalThread(
+        radius=4, pitch=1, height=6, taper_out_rpos=0.05, taper_in_rpos=0.95
+    )
+    evaluator = compile_helixes(tapered, [], tapered.lead)
+    t = evaluator.t_values(1000)
+    body = evaluator.body(t)
+    assert body.stop - body.start == 900
+    assert np.all(evaluator.taper_scale(t[body]) == 1)
+    assert np.all(evaluator.taper_scale(t[: body.start]) < 1)
+    assert np.all(evaluator.taper_scale(t[body.stop :]) < 1)
+    # Not contiguous
+    assert evaluator.body(t[[0, 500, 999, 501]]) == slice(0, 0)
@@ -0,0 +1,135 @@
+import io
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from typing import Dict, List
+
+import numpy as np
+
+from helical_thread import (
+    HelicalThread,
+    ThreadMesh,
+    export,
+    helical_thread,
+    thread_meshes,
+    write_3mf,
+    write_obj,
+    write_ply,
+)
+
+ths = helical_thread(
+    HelicalThread(
+        radius=4,
+        pitch=1,
+        height=4,
+        taper_out_rpos=0.1,
+        taper_in_rpos=0.9,
+        minor_cutoff=0.1,
+        major_cutoff=0.1,
+    )
+)
+meshes = thread_meshes(ths, num=50)
+
+
+def test_ply(monkeypatch) -> None:
+    # Small chunks so every array is written in several of them
+    monkeypatch.setattr(export, "_CHUNK", 100)
+    f = io.BytesIO()
+    write_ply(f, meshes, dtype=np.float64)
+    data: bytes = f.getvalue()
+
+    end: int = data.index(b"end_header\n") + len(b"end_header\n")
+    header: str = data[:end].decode()
+    assert "format binary_little_endian 1.0" in header
+    assert "comment object 0 int" in header
+    assert "comment object 1 ext" in header
+    vertex_count = int(re.findall(r"element vertex (\d+)", header)[0])
+    face_count = int(re.findall(r"element face (\d+)", header)[0])
+
+    vertices = np.frombuffer(data, "<f8", vertex_count * 3, end).reshape(-1, 3)
+    face_dtype = np.dtype([("n", "u1"), ("v", "<i4", (3,)), ("object", "u1")])
+    faces = np.frombuffer(data, face_dtype, face_count, end + vertices.nbytes)
+    assert end + vertices.nbytes + faces.nbytes == len(data)
+    assert np.all(faces["n"] == 3)
+
+    offset: int = 0
+    for i, m in enumerate(meshes.values()):
+        mine = faces[faces["object"] == i]
+        assert np.array_equal(mine["v"] - offset, m.faces)
+        assert np.array_equal(vertices[offset : offset + len(m.vertices)], m.vertices)
+        offset += len(m.vertices)
+
+
+def test_ply_float32(tmp_path) -> None:
+    path = tmp_path / "thread.ply"
+    write_ply(str(path), meshes)
+    data: bytes = path.read_bytes()
+    assert b"property float x" in data[:1000]
+    vertices: int = sum(len(m.vertices) for m in meshes.values())
+    faces: int = sum(len(m.faces) for m in meshes.values())
+    end: int = data.index(b"end_header\n") + len(b"end_header\n")
+    assert len(data) - end == (vertices * 12) + (faces * 14)
+
+
+def _read_obj(text: str) -> Dict[str, ThreadMesh]:
+    objects: Dict[str, ThreadMesh] = {}
+    vertices: List[List[float]] = []
+    faces: List[List[int]] = []
+    name: str = ""
+    for line in text.splitlines() + ["o"]:
+        fields = line.split()
+        if fields[0] == "o":
+            if name:
+                objects[name] = ThreadMesh(np.array(vertices), np.array(faces))
+            name = fields[-1]
+            vertices, faces = [], []
+        elif fields[0] == "v":
+            vertices.append([float(x) for x in fields[1:]])
+        elif fields[0] == "f":
+            faces.append([int(x) for x in fields[1:]])
+    return objects
+
+
+def test_obj(monkeypatch) -> None:
+    monkeypatch.setattr(export, "_CHUNK", 100)
+    f = io.BytesIO()
+    write_obj(f, meshes)
+    objects = _read_obj(f.getvalue().decode())
+    assert list(objects) == ["int", "ext"]
+
+    offset: int = 1
+    for name, m in meshes.items():
+        assert np.allclose(objects[name].vertices, m.vertices, rtol=1e-8)
+        assert np.array_equal(objects[name].faces - offset, m.faces)
+        offset += len(m.vertices)
+
+
+def test_3mf(monkeypatch) -> None:
+    monkeypatch.setattr(export, "_CHUNK", 100)
+    f = io.BytesIO()
+    write_3mf(f, meshes)
+
+    with zipfile.ZipFile(f) as z:
+        assert "[Content_Types].xml" in z.namelist()
+        assert "_rels/.rels" in z.namelist()
+        model = ET.fromstring(z.read("3D/3dmodel.model"))
+
+    ns = {"m": export.MODEL_NAMESPACE}
+    objects = model.findall("m:resources/m:object", ns)
+    assert [o.get("name") for o in objects] == ["int", "ext"]
+    assert len(model.findall("m:build/m:item", ns)) == 2
+    for o, m in zip(objects, meshes.values()):
+        vertices = np.array(
+            [
+                [float(v.attrib[a]) for a in "xyz"]
+                for v in o.findall("m:mesh/m:vertices/m:vertex", ns)
+            ]
+        )
+        faces = np.array(
+            [
+                [int(t.attrib[a]) for a in ("v1", "v2", "v3")]
+                for t in o.findall("m:mesh/m:triangles/m:triangle", ns)
+            ]
+        )
+        assert np.allclose(vertices, m.vertices, rtol=1e-8)
+        assert np.array_equal(faces, m.faces)
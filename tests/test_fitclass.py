@@ -0,0 +1,87 @@
+from math import isclose, radians, sin, sqrt
+
+import numpy as np
+import pytest
+
+from helical_thread import ToleranceClass, coarse_pitch, fit_class_envelopes
+from helical_thread.fitclass import _deviations
+
+
+def minor_diameter(th, i: int) -> float:
+    return 2 * np.min(th.int_profiles[i, :, 0])
+
+
+def test_iso_6h_nut() -> None:
+    env = fit_class_envelopes(10, 1.5, "6H", height=10)
+    minor = 10 - (5 * sqrt(3) / 8 * 1.5)
+
+    # 6H has no fundamental deviation, max material is the basic profile
+    assert env.internal[0]
+    assert isclose(env.max_material.htb.radius[0], 5)
+    assert isclose(env.max_material.htb.minor_cutoff[0], 1.5 / 4)
+    assert isclose(minor_diameter(env.max_material, 0), minor)
+
+    # TD1 of 6H is 230 * P^0.7 micrometers
+    td1 = 230 * (1.5**0.7) / 1000
+    assert isclose(minor_diameter(env.min_material, 0), minor + td1)
+    assert env.min_material.htb.radius[0] > env.max_material.htb.radius[0]
+
+
+def test_iso_6g_bolt() -> None:
+    env = fit_class_envelopes(10, None, "6g", height=10)
+    es = (15 + (11 * 1.5)) / 1000
+
+    assert not env.internal[0]
+    assert env.max_material.htb.pitch[0] == 1.5
+    assert isclose(env.max_material.htb.ext_clearance[0], es * sin(radians(30)) / 2)
+    assert env.min_material.htb.ext_clearance[0] > env.max_material.htb.ext_clearance[0]
+
+
+def test_catalog() -> None:
+    sizes = [3, 4, 5, 6, 8, 10]
+    env = fit_class_envelopes(sizes, None, ["6H", "6g"] * 3, height=5)
+    assert len(env) == len(sizes)
+    assert list(env.internal) == [True, False] * 3
+    for i, size in enumerate(sizes):
+        assert env.max_material.htb.pitch[i] == coarse_pitch(size)
+        max_th, min_th = env.thread_helixes(i)
+        assert max_th.ht.pitch == coarse_pitch(size)
+
+
+def test_uts_allowance() -> None:
+    env = fit_class_envelopes(0.25, None, ["2A", "3A"], height=1)
+    assert env.max_material.htb.pitch[0] == 1 / 20
+    assert env.max_material.htb.ext_clearance[0] > 0
+    assert env.max_material.htb.ext_clearance[1] == 0
+
+
+def test_parse() -> None:
+    tc = ToleranceClass.parse("5H6H")
+    assert tc.internal
+    assert tc.pitch_factor == 0.8 and tc.crest_factor == 1
+    with pytest.raises(ValueError):
+        ToleranceClass.parse("6Hg")
+    with pytest.raises(ValueError):
+        ToleranceClass.parse("5g6H")
+    with pytest.raises(ValueError):
+        fit_class_envelopes(10, 1.5, "4A", height=10)
+
+
+def test_kwargs() -> None:
+    env = fit_class_envelopes([8, 10], None, "6H", height=5, inset_offset=[0.1, 0.2])
+    assert list(env.max_material.htb.inset_offset) == [0.1, 0.2]
+    env = fit_class_envelopes(10, 1.5, "6g", height=5, inset_offset=[0, 0.1, 0.2])
+    assert len(env) == 3 and env.min_material.htb.inset_offset[2] == 0.2
+    with pytest.raises(ValueError):
+        fit_class_envelopes([8, 10], None, "6H", height=5, inset_offset=[0, 0.1, 0.2])
+    with pytest.raises(ValueError):
+        fit_class_envelopes([8, 10], None, "6H", height=np.ones((1, 2)))
+
+
+def test_crest_tolerance() -> None:
+    classes = [ToleranceClass.parse(c) for c in ("6H", "6g", "2B", "2A")]
+    size = np.array([10, 10, 0.25, 0.25])
+    pitch = np.array([1.5, 1.5, 1 / 20, 1 / 20])
+    _, pitch_tol, crest_tol = _deviations(size, pitch, classes, np.arange(4))
+    assert np.all(pitch_tol > 0)
+    assert list(crest_tol > 0) == [True, False, True, False]
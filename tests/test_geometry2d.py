@@ -0,0 +1,82 @@
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+from utils import (
+    intersectionLines_2d,
+    lineToPtDirection_2d,
+    perpendicular_distance_pt_to_line_2d,
+    split_2d,
+)
+
+from helical_thread import (
+    intersect_lines,
+    line_distance,
+    line_side,
+    pad_polygons,
+    split_polygons,
+)
+
+rng = np.random.default_rng(7)
+
+
+def _pt(a: np.ndarray) -> Tuple[float, float]:
+    return (float(a[0]), float(a[1]))
+
+
+def test_line_side_and_distance() -> None:
+    p1, p2, pts = rng.normal(size=(3, 100, 2))
+    side = line_side(p1, p2, pts)
+    dist = line_distance(pts, p1, p2)
+    for i in range(100):
+        assert side[i] == lineToPtDirection_2d(_pt(p1[i]), _pt(p2[i]), _pt(pts[i]))
+        assert dist[i] == perpendicular_distance_pt_to_line_2d(
+            _pt(pts[i]), _pt(p1[i]), _pt(p2[i])
+        )
+
+
+def test_intersect_lines() -> None:
+    a1, a2, b1, b2 = rng.normal(size=(4, 100, 2))
+    # Parallel lines
+    b2[0] = b1[0] + (a2[0] - a1[0])
+    result = intersect_lines(a1, a2, b1, b2)
+    for i in range(100):
+        expected = intersectionLines_2d(_pt(a1[i]), _pt(a2[i]), _pt(b1[i]), _pt(b2[i]))
+        assert tuple(result[i]) == expected
+
+
+@pytest.mark.parametrize("above", [True, False])
+def test_split_polygons(above: bool) -> None:
+    polygons = rng.normal(size=(200, 6, 2))
+    mask = rng.random((200, 6)) < 0.8
+    # Some points exactly on the lines
+    p1 = rng.normal(size=(200, 2))
+    p2 = rng.normal(size=(200, 2))
+    polygons[:20, 0] = p1[:20]
+    result, result_mask = split_polygons(polygons, mask, p1, p2, above)
+    assert result.shape == (200, 12, 2)
+
+    for b in range(200):
+        lst: List[Tuple[float, float]] = [_pt(p) for p in polygons[b][mask[b]]]
+        expected = split_2d(_pt(p1[b]), _pt(p2[b]), lst, retAbove=above) if lst else []
+        n = len(expected)
+        assert np.all(result_mask[b, :n]) and not np.any(result_mask[b, n:])
+        assert [tuple(p) for p in result[b, :n]] == expected
+        assert np.all(np.isnan(result[b, n:]))
+
+
+def test_split_one_line() -> None:
+    square = np.array([[(0, 0), (2, 0), (2, 2), (0, 2)]], dtype=float)
+    result, mask = split_polygons(
+        square, np.ones((1, 4), bool), np.array((0, 1)), np.array((1, 1))
+    )
+    assert np.array_equal(result[0][mask[0]], [(0, 1), (2, 1), (2, 2), (0, 2)])
+
+
+def test_pad_polygons() -> None:
+    polygons = np.arange(24, dtype=float).reshape(3, 4, 2)
+    mask = np.array([[True, False, True, False], [True] * 4, [False] * 4])
+    padded = pad_polygons(polygons, mask)
+    assert np.array_equal(padded[0], [(0, 1), (4, 5), (4, 5), (4, 5)])
+    assert np.array_equal(padded[1], polygons[1])
+    assert np.all(np.isnan(padded[2]))
@@ -0,0 +1,108 @@
+import io
+import struct
+import zlib
+from typing import List
+
+import numpy as np
+import pytest
+
+from helical_thread import (
+    HelicalThread,
+    RadiusMap,
+    helical_thread,
+    instrument,
+    radius_map,
+    thread_index,
+    write_png,
+)
+
+ths = helical_thread(
+    HelicalThread(
+        radius=4,
+        pitch=1,
+        height=6,
+        taper_out_rpos=0.1,
+        taper_in_rpos=0.9,
+        minor_cutoff=0.1,
+        major_cutoff=0.1,
+        starts=3,
+    )
+)
+
+
+def _points(m: RadiusMap, offset: float = 0) -> np.ndarray:
+    angle, z = np.meshgrid(m.angles, m.z)
+    r = m.radii.astype(float) + offset
+    return np.stack((r * np.cos(angle), r * np.sin(angle), z), axis=-1)
+
+
+@pytest.mark.parametrize("internal", [True, False])
+def test_surface(internal: bool) -> None:
+    m = radius_map(ths, internal, 200, 300, dtype=np.float64)
+    assert m.radii.shape == (300, 200)
+    assert m.radii.dtype == np.float64
+    index = thread_index(ths, internal, 3600)
+    thread = m.radii != m.root_radius
+    assert 0.1 < thread.mean() < 0.9
+
+    # The thread surface is on the profiles, exactly so in the body
+    distance = index.signed_distance(_points(m))
+    assert np.allclose(distance[thread], 0, atol=1e-6)
+    body = (m.z > 2) & (m.z < 4)
+    assert np.allclose(distance[body][thread[body]], 0, atol=1e-9)
+
+    # There is no thread beyond the surface, toward the axis of a hole
+    # or away from the axis of a bolt
+    beyond = index.signed_distance(_points(m, -1e-3 if internal else 1e-3))
+    assert np.all(beyond > 0)
+
+    m32 = radius_map(ths, internal, 200, 300)
+    assert m32.radii.dtype == np.float32
+    assert np.allclose(m32.radii, m.radii, rtol=0, atol=1e-5)
+
+
+def test_z_range() -> None:
+    m = radius_map(ths, False, 64, 50, z_range=(-1, 7))
+    assert m.z[0] == -1 and m.z[-1] == 7
+    assert np.all(m.radii[m.z < 0] == m.root_radius)
+    assert np.all(m.radii[m.z > 6] == m.root_radius)
+    with instrument() as inst:
+        radius_map(ths, False, 64, 50)
+    assert inst.counters["heightmap_pixels"] == 64 * 50
+
+
+def _read_png(data: bytes) -> np.ndarray:
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks: List[bytes] = []
+    pos = 8
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos : pos + 4])
+        body = data[pos + 4 : pos + 8 + length]
+        (crc,) = struct.unpack(">I", data[pos + 8 + length : pos + 12 + length])
+        assert zlib.crc32(body) & 0xFFFFFFFF == crc
+        chunks.append(body)
+        pos += 12 + length
+    assert chunks[0][:4] == b"IHDR" and chunks[-1] == b"IEND"
+    width, height, depth, color = struct.unpack(">IIBB", chunks[0][4:14])
+    assert (depth, color) == (16, 0)
+    idat = b"".join(c[4:] for c in chunks if c[:4] == b"IDAT")
+    rows = np.frombuffer(zlib.decompress(idat), dtype=np.uint8).reshape(height, -1)
+    assert np.all(rows[:, 0] == 2)
+    raw = np.cumsum(rows[:, 1:], axis=0, dtype=np.uint8)
+    return raw.view(">u2").reshape(height, width)
+
+
+def test_png() -> None:
+    m = radius_map(ths, True, 120, 80)
+    image = m.to_uint16()
+    assert image.min() == 0 and image.max() == 65535
+    f = io.BytesIO()
+    m.write_png(f)
+    assert np.array_equal(_read_png(f.getvalue()), image)
+
+    clipped = m.to_uint16(m.root_radius - 0.1, m.root_radius)
+    assert np.all(clipped[m.radii == m.root_radius] == 65535)
+    assert np.all(clipped[m.radii < m.root_radius - 0.1] == 0)
+
+    with pytest.raises(ValueError):
+        write_png(io.BytesIO(), m.radii)
@@ -1,11 +1,24 @@
-from math import isclose
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy, deepcopy
+from dataclasses import FrozenInstanceError, replace
+from math import isclose, radians, sin, tan
 from typing import List, Tuple
 
 # import plotly.graph_objs as go
+import numpy as np
 import pytest
 from utils import perpendicular_distance_pt_to_line_2d
 
-from helical_thread import HelicalThread, ThreadHelixes, helical_thread
+from helical_thread import (
+    HelicalThread,
+    ThreadDerived,
+    ThreadHelixes,
+    helical_thread,
+    instrument,
+    thread_derived,
+    thread_mesh,
+)
 
 # clearance between internal threads and external threads
 # the internal_clearance is always 0
@@ -215,6 +228,140 @@ def test_ext_clearance(
     # fig.show()
 
 
+def test_lazy() -> None:
+    ht = HelicalThread(radius=radius, pitch=pitch, height=height)
+    with instrument() as inst:
+        ths = helical_thread(ht)
+        assert "helical_thread" not in inst.timers
+
+        assert ths.int_helix_radius == radius
+        assert len(ths.int_helixes) == 3
+        assert inst.timers["helical_thread"].calls == 1
+
+        assert len(ths.ext_helixes) == 3
+        assert inst.timers["helical_thread"].calls == 2
+
+    assert ths == ThreadHelixes(
+        ht,
+        int_helix_radius=ths.int_helix_radius,
+        int_helixes=ths.int_helixes,
+        ext_helix_radius=ths.ext_helix_radius,
+        ext_helixes=ths.ext_helixes,
+    )
+
+    # Passed fields are not recomputed
+    ths = ThreadHelixes(ht, ext_helix_radius=1, int_helixes=[])
+    assert ths.ext_helix_radius == 1
+    assert len(ths.ext_helixes) == 3
+    assert ths.int_helixes == []
+    assert ths.int_helix_radius == radius
+
+
+@pytest.mark.parametrize("starts", [0, -1, 2.5])
+def test_invalid_starts(starts: float) -> None:
+    with pytest.raises(ValueError):
+        HelicalThread(radius=radius, pitch=pitch, height=height, starts=starts)  # type: ignore[arg-type]
+
+
+def test_integral_starts() -> None:
+    ht = HelicalThread(radius=radius, pitch=pitch, height=height, starts=2.0)  # type: ignore[arg-type]
+    assert ht.starts == 2 and isinstance(ht.starts, int)
+    assert ht == HelicalThread(radius=radius, pitch=pitch, height=height, starts=2)
+
+
+def test_frozen() -> None:
+    ht = HelicalThread(radius=radius, pitch=pitch, height=height)
+    with pytest.raises(FrozenInstanceError):
+        ht.pitch = 1  # type: ignore[misc]
+    with pytest.raises(FrozenInstanceError):
+        del ht.pitch
+    assert replace(ht, angle_degs=30).angle_degs == 30 and ht.angle_degs == 45
+    assert hash(ht) == hash(replace(ht)) and ht == replace(ht)
+
+    ths = helical_thread(ht)
+    with pytest.raises(FrozenInstanceError):
+        ths.int_helixes = []  # type: ignore[misc]
+    mesh = thread_mesh(ths, True, 20)
+    assert thread_mesh(ths, True, 20) is mesh
+    with pytest.raises(ValueError):
+        mesh.vertices[0] = 0
+
+    # The helixes are copies, changing them changes nothing of ths
+    helixes = ths.int_helixes
+    helixes[0].radius = 99
+    helixes.append(helixes[0])
+    assert ths.int_helixes != helixes
+    assert ths.int_helixes[0].radius == ths.int_helix_radius + ht.thread_overlap
+    assert len(ths.int_helixes) == 3
+    passed = ths.ext_helixes
+    ths = ThreadHelixes(ht, ext_helixes=passed)
+    passed[0].radius = 99
+    assert ths.ext_helixes[0].radius != 99
+
+
+def test_pickle_and_copy() -> None:
+    ths = helical_thread(HelicalThread(radius=radius, pitch=pitch, height=height))
+    thread_mesh(ths, True, 20)
+    for restored in (pickle.loads(pickle.dumps(ths)), deepcopy(ths), copy(ths)):
+        assert restored._cache == {} and restored._lock is not ths._lock
+        assert restored == ths
+        mesh = thread_mesh(restored, True, 20)
+        assert np.array_equal(mesh.vertices, thread_mesh(ths, True, 20).vertices)
+
+
+def test_threads() -> None:
+    ht = HelicalThread(radius=radius, pitch=pitch, height=height, starts=2)
+    ths = helical_thread(ht)
+
+    def work(i: int) -> Tuple[float, int]:
+        internal: bool = i % 2 == 0
+        mesh = thread_mesh(ths, internal, 50)
+        radius = ths.int_helix_radius if internal else ths.ext_helix_radius
+        return (radius, len(mesh.faces))
+
+    # Every lazy field and cached value is computed once however many
+    # threads ask for it at the same time
+    with instrument() as inst:
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(work, range(64)))
+    assert inst.timers["helical_thread"].calls == 2
+    assert inst.counters["cache_misses"] == 2
+    assert inst.counters["cache_hits"] == 62
+    assert len(set(results)) == 2
+    assert results[:2] == [work(0), work(1)]
+
+
+def test_derived() -> None:
+    ht = HelicalThread(
+        radius=radius,
+        pitch=pitch,
+        height=height,
+        angle_degs=60,
+        major_cutoff=pitch / 8,
+        minor_cutoff=pitch / 4,
+    )
+    ths = helical_thread(ht)
+    d = ths.derived
+    assert ths.derived is d
+    assert isinstance(d, ThreadDerived)
+    assert d == thread_derived(ht)
+    assert d.tan_hangle == tan(radians(30))
+    assert d.sin_hangle == sin(radians(30))
+    assert ths.int_helixes[2].horz_offset == -d.int_thread_depth
+    assert ths.ext_helix_radius == d.ext_helix_radius
+    assert ths.ext_helixes[2].horz_offset == d.ext_thread_depth
+    assert ths.ext_helixes[1].vert_offset == (
+        d.ext_thread_half_height_at_ext_helix_radius_plus_tova
+    )
+    with pytest.raises(AttributeError):
+        d.tan_hangle = 0  # type: ignore[misc]
+
+    # The external profile has three points
+    d = thread_derived(HelicalThread(radius=radius, pitch=pitch, height=height))
+    assert d.ext_thread_half_height_at_opposite_ext_helix_radius == 0
+    assert d.ext_thread_depth < d.int_thread_depth
+
+
 if __name__ == "__main__":
     test_ext_clearance(0, 0, 0, 0)
     test_ext_clearance(0, 0, 0, 0.001)
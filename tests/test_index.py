@@ -0,0 +1,87 @@
+from math import pi
+
+import numpy as np
+import pytest
+
+from helical_thread import (
+    HelicalThread,
+    ThreadHelixes,
+    helical_thread,
+    sample_starts,
+    thread_index,
+)
+from helical_thread.geometry2d import signed_distance
+
+ths = helical_thread(
+    HelicalThread(
+        radius=4,
+        pitch=1,
+        height=6,
+        taper_out_rpos=0.1,
+        taper_in_rpos=0.9,
+        minor_cutoff=0.1,
+        major_cutoff=0.1,
+        starts=2,
+    )
+)
+rng = np.random.default_rng(11)
+
+
+def _brute_force(ths: ThreadHelixes, internal: bool, points: np.ndarray) -> np.ndarray:
+    """The signed distance to the exact profiles of every turn and start"""
+    evaluator = ths.compile(internal)
+    ht = ths.ht
+    result = np.full(len(points), np.inf)
+    for i, (x, y, z) in enumerate(points):
+        rz = np.array([[[np.hypot(x, y), z]]])
+        for s in range(ht.starts):
+            angle = (np.arctan2(y, x) - (pi / 2) - (2 * pi * s / ht.starts)) % (2 * pi)
+            helix_angle = angle + (2 * pi * np.arange(20))
+            rel = helix_angle / evaluator.angle_per_rel
+            t = ht.first_t + (rel[rel <= 1] * (ht.last_t - ht.first_t))
+            for profile in evaluator.points(t).transpose(1, 0, 2):
+                polygon = np.hypot(profile[:, 0], profile[:, 1]), profile[:, 2]
+                d = signed_distance(rz, np.stack(polygon, axis=-1)[np.newaxis])
+                result[i] = min(result[i], d[0, 0])
+    return result
+
+
+def _random_points(n: int) -> np.ndarray:
+    r = rng.uniform(ths.ext_helix_radius - 0.5, ths.int_helix_radius + 0.5, n)
+    angle = rng.uniform(0, 2 * pi, n)
+    z = rng.uniform(0, ths.ht.height, n)
+    return np.stack((r * np.cos(angle), r * np.sin(angle), z), axis=-1)
+
+
+@pytest.mark.parametrize("internal", [True, False])
+def test_matches_brute_force(internal: bool) -> None:
+    index = thread_index(ths, internal, samples_per_turn=720)
+    points = _random_points(300)
+    expected = _brute_force(ths, internal, points)
+    signed = index.signed_distance(points)
+    assert np.all(np.isfinite(signed))
+    assert np.allclose(signed, expected, rtol=0, atol=1e-3)
+
+    # Between the tapers, where the profiles are exact
+    body = (points[:, 2] > 2) & (points[:, 2] < ths.ht.height - 2)
+    assert np.allclose(signed[body], expected[body], rtol=0, atol=1e-9)
+    assert np.array_equal(index.contains(points), signed < 0)
+    assert np.array_equal(index.distance(points), np.abs(signed))
+
+
+def test_surface_and_inside() -> None:
+    index = thread_index(ths, True)
+    t = rng.uniform(0.15, 0.85, 100)
+    surface = sample_starts(ths.ht, ths.int_helixes, t)
+    assert np.allclose(index.distance(surface), 0, rtol=0, atol=1e-9)
+
+    # The centers of the profiles are inside, shape (starts, len(t), 3)
+    centers = surface.mean(axis=1)
+    assert index.contains(centers).all()
+    assert not index.contains(np.array([[0, 0, 3], [0, 20, 3]])).any()
+    assert np.isinf(index.signed_distance(np.array([0, 4, 100])))
+
+
+def test_cached() -> None:
+    assert thread_index(ths, False) is thread_index(ths, False)
+    assert thread_index(ths, False, 90) is not thread_index(ths, False)
@@ -0,0 +1,101 @@
+import io
+import json
+import pstats
+from pathlib import Path
+from threading import Event, Thread
+from typing import Dict, List, Optional
+
+from helical_thread import (
+    HelicalThread,
+    Instrumentation,
+    helical_thread,
+    instrument,
+    instrumentation,
+    json_sink,
+    pstats_sink,
+    thread_mesh,
+)
+from helical_thread.instrumentation import count
+
+ht = HelicalThread(radius=4, pitch=1, height=5, taper_out_rpos=0.1, taper_in_rpos=0.9)
+
+
+def test_stages_and_counters() -> None:
+    reports: List[Instrumentation] = []
+    with instrument(sink=reports.append) as inst:
+        ths = helical_thread(ht)
+        mesh = thread_mesh(ths, True, 100)
+        thread_mesh(ths, True, 100)
+
+    assert reports == [inst]
+    assert inst.timers["helical_thread"].calls == 1
+    assert inst.timers["mesh"].calls == 1
+    assert inst.timers["mesh"].seconds >= inst.timers["sample"].seconds
+    assert inst.counters["points"] == 100 * len(ths.int_helixes)
+    assert inst.counters["triangles"] == len(mesh.faces)
+    assert inst.counters["cache_misses"] == 1
+    assert inst.counters["cache_hits"] == 1
+    assert inst.peak_bytes is None and inst.profile is None
+
+    # Nothing is collected outside of the context
+    helical_thread(ht)
+    assert inst.timers["helical_thread"].calls == 1
+
+
+def test_nested() -> None:
+    with instrument() as outer:
+        helical_thread(ht).int_helixes
+        with instrument() as inner:
+            helical_thread(ht).ext_helixes
+        helical_thread(ht).int_helixes
+    assert outer.timers["helical_thread"].calls == 2
+    assert inner.timers["helical_thread"].calls == 1
+
+
+def test_out_of_order() -> None:
+    # Thread a enters, thread b enters, a exits then b exits
+    a_entered, b_entered, a_exited = Event(), Event(), Event()
+    found: Dict[str, Optional[Instrumentation]] = {}
+
+    def a() -> None:
+        with instrument() as inst:
+            found["a"] = inst
+            a_entered.set()
+            b_entered.wait()
+        a_exited.set()
+
+    def b() -> None:
+        a_entered.wait()
+        with instrument() as inst:
+            found["b"] = inst
+            b_entered.set()
+            a_exited.wait()
+            count("inside")
+        count("leak")
+
+    threads = [Thread(target=a), Thread(target=b)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert found["a"] is not None and found["b"] is not None
+    assert found["a"].counters == {}
+    assert found["b"].counters == {"inside": 1}
+    assert instrumentation._active is None and instrumentation._stack == []
+
+
+def test_sinks(tmp_path: Path) -> None:
+    log = io.StringIO()
+    with instrument(sink=json_sink(log), trace_memory=True):
+        thread_mesh(helical_thread(ht), False, 1000)
+    report = json.loads(log.getvalue())
+    assert report["timers"]["mesh"]["calls"] == 1
+    assert report["counters"]["points"] == 1000 * 3
+    assert report["peak_bytes"] > 1000 * 3 * 3 * 8
+
+    path = str(tmp_path / "profile.pstats")
+    with instrument(sink=pstats_sink(path), profile=True):
+        helical_thread(ht)
+    stats = pstats.Stats(path)
+    assert any(func[2] == "helical_thread" for func in stats.stats)  # type: ignore
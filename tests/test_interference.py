@@ -0,0 +1,77 @@
+from math import isclose
+from typing import Any, Dict
+
+import numpy as np
+import pytest
+
+from helical_thread import (
+    HelicalThread,
+    ThreadHelixes,
+    check_interference,
+    helical_thread,
+)
+
+pitch = 2
+radius = 8
+height = 8
+
+
+def make_ths(ext_clearance: float, **kwargs) -> ThreadHelixes:
+    params: Dict[str, Any] = dict(
+        height=height,
+        pitch=pitch,
+        radius=radius,
+        taper_out_rpos=0.1,
+        taper_in_rpos=0.9,
+        angle_degs=90,
+        ext_clearance=ext_clearance,
+        major_cutoff=pitch / 8,
+        minor_cutoff=pitch / 4,
+        thread_overlap=0.001,
+    )
+    params.update(kwargs)
+    return helical_thread(HelicalThread(**params))
+
+
+@pytest.mark.parametrize("ext_clearance", [0.1, 0.05, 0])
+def test_mated_clearance(ext_clearance) -> None:
+    report = check_interference(make_ths(ext_clearance), angle_bins=90)
+
+    assert report.min_clearance.shape == (90,)
+    assert np.all(np.isfinite(report.min_clearance))
+    assert isclose(report.clearance, ext_clearance, abs_tol=1e-9)
+    assert not report.interferes
+
+
+def test_negative_clearance_interferes() -> None:
+    report = check_interference(make_ths(-0.05), angle_bins=90)
+
+    assert report.interferes
+    assert isclose(report.clearance, -0.05, abs_tol=1e-9)
+    assert isclose(np.hypot(*report.location[:2]), radius, abs_tol=0.5)
+
+
+def test_mismatched_inset_interferes() -> None:
+    # The 2D profiles of both parts have clearance but the bolt's inset
+    # shifts its thread so it collides unless the bolt is repositioned.
+    nut = make_ths(0.1)
+    bolt = make_ths(0.1, inset_offset=0.5, height=height + 1)
+
+    assert not check_interference(nut, nut, angle_bins=90).interferes
+    assert check_interference(nut, bolt, angle_bins=90).interferes
+    report = check_interference(
+        nut, bolt, angle_bins=90, ext_vert_offset=(pitch / 2) - 0.5
+    )
+    assert not report.interferes
+
+
+def test_multi_start() -> None:
+    nut = make_ths(0.05, starts=3, height=3 * height)
+
+    report = check_interference(nut, angle_bins=90)
+    assert isclose(report.clearance, 0.05, abs_tol=1e-9)
+
+    # A single start bolt collides with the other starts of the nut
+    assert check_interference(nut, make_ths(0.05), angle_bins=90).interferes
+    with pytest.raises(ValueError):
+        check_interference(nut, angle_bins=100)
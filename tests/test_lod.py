@@ -0,0 +1,54 @@
+from math import isclose
+
+import numpy as np
+
+from helical_thread import (
+    HelicalThread,
+    check_mesh,
+    helical_thread,
+    mesh_pyramid,
+    thread_mesh,
+)
+
+ths = helical_thread(
+    HelicalThread(
+        radius=4,
+        pitch=1,
+        height=10,
+        taper_out_rpos=0.1,
+        taper_in_rpos=0.9,
+        minor_cutoff=0.1,
+        major_cutoff=0.1,
+        starts=2,
+    )
+)
+
+
+def test_levels() -> None:
+    pyramid = mesh_pyramid(ths, True, num=100, levels=4)
+    assert len(pyramid) == 4
+
+    # 100 is rounded up to 8 * 13 + 1 rings
+    full = thread_mesh(ths, True, 105)
+    assert isclose(pyramid.level(0).volume(), full.volume())
+    assert len(pyramid.level(0).faces) == len(full.faces)
+
+    for k in range(4):
+        mesh = pyramid.level(k)
+        assert np.shares_memory(mesh.vertices, pyramid.vertices)
+        assert np.shares_memory(mesh.faces, pyramid.faces)
+        assert len(mesh.vertices) == 2 * len(ths.int_helixes) * ((104 >> k) + 1)
+        assert np.max(mesh.faces) < len(mesh.vertices)
+        assert check_mesh(mesh).watertight
+        assert mesh.volume() > 0
+
+    # Each level's rings are every other ring of the finer level
+    assert list(pyramid.vertex_counts) == sorted(pyramid.vertex_counts, reverse=True)
+    assert np.array_equal(
+        pyramid.level(3).vertices, pyramid.level(1).vertices[: pyramid.vertex_counts[3]]
+    )
+
+
+def test_cached() -> None:
+    assert mesh_pyramid(ths, False, 64) is mesh_pyramid(ths, False, 64)
+    assert mesh_pyramid(ths, False, 64) is not mesh_pyramid(ths, False, 64, levels=2)
@@ -0,0 +1,79 @@
+from math import pi, sqrt
+
+import numpy as np
+import pytest
+
+from helical_thread import (
+    HelicalThread,
+    helical_thread,
+    instrument,
+    profile_table,
+    sample_starts,
+    thread_index,
+)
+
+ths = helical_thread(
+    HelicalThread(
+        radius=4,
+        pitch=1,
+        height=6,
+        taper_out_rpos=0.1,
+        taper_in_rpos=0.9,
+        minor_cutoff=0.1,
+        major_cutoff=0.1,
+        starts=3,
+    )
+)
+rng = np.random.default_rng(5)
+
+
+def _body_points(n: int) -> np.ndarray:
+    # Points whose profiles within a turn are all in the body
+    r = rng.uniform(ths.ext_helix_radius - 0.5, ths.int_helix_radius + 0.5, n)
+    angle = rng.uniform(0, 2 * pi, n)
+    z = rng.uniform(2, 4, n)
+    return np.stack((r * np.cos(angle), r * np.sin(angle), z), axis=-1)
+
+
+@pytest.mark.parametrize("internal", [True, False])
+def test_matches_index(internal: bool) -> None:
+    table = profile_table(ths, internal)
+    points = _body_points(2000)
+    expected = thread_index(ths, internal).signed_distance(points)
+
+    exact = table.signed_distance(points, exact=True)
+    assert np.allclose(exact, expected, rtol=0, atol=1e-9)
+    assert np.array_equal(table.contains(points, exact=True), expected < 0)
+
+    # The approximations differ only near the boundary
+    cell = sqrt(table.r_step**2 + table.phase_step**2)
+    approx = table.contains(points)
+    assert np.all(np.abs(expected[approx != (expected < 0)]) <= cell)
+    assert np.allclose(table.signed_distance(points), expected, rtol=0, atol=cell)
+
+
+def test_surface_and_shape() -> None:
+    table = profile_table(ths, True, r_cells=64, phase_cells=64)
+    t = rng.uniform(0.3, 0.7, 50)
+    surface = sample_starts(ths.ht, ths.int_helixes, t)
+    assert surface.shape == (3, 4, 50, 3)
+    assert np.allclose(table.signed_distance(surface, exact=True), 0, atol=1e-9)
+    assert table.contains(surface.mean(axis=1)).all()
+    assert table.contains(surface).shape == (3, 4, 50)
+
+    # Outside of the table
+    far = np.array([[0, 0, 3], [0, 100, 3]])
+    assert not table.contains(far, exact=True).any()
+    assert np.allclose(
+        table.signed_distance(far), table.signed_distance(far, exact=True)
+    )
+
+
+def test_refined_and_cached() -> None:
+    table = profile_table(ths, False)
+    assert profile_table(ths, False) is table
+    points = _body_points(10000)
+    with instrument() as inst:
+        table.contains(points, exact=True)
+    # Only the points in boundary cells are tested exactly
+    assert inst.counters["lut_refined"] < 0.1 * len(points)
@@ -0,0 +1,89 @@
+from math import isclose
+from typing import Any, Dict
+
+import numpy as np
+import pytest
+
+from helical_thread import (
+    HelicalThread,
+    ThreadMesh,
+    check_mesh,
+    helical_thread,
+    sample_helixes,
+    sample_starts,
+    t_values,
+    thread_mesh,
+)
+
+
+def make_ht(**kwargs) -> HelicalThread:
+    params: Dict[str, Any] = dict(
+        radius=4,
+        pitch=1,
+        height=6,
+        taper_out_rpos=0.1,
+        taper_in_rpos=0.9,
+        minor_cutoff=0.1,
+        major_cutoff=0.1,
+    )
+    params.update(kwargs)
+    return HelicalThread(**params)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"taper_out_rpos": 0, "taper_in_rpos": 1}, {"minor_cutoff": 0}],
+)
+@pytest.mark.parametrize("internal", [True, False])
+def test_closed(kwargs, internal) -> None:
+    mesh = thread_mesh(helical_thread(make_ht(**kwargs)), internal, 100)
+
+    assert check_mesh(mesh).watertight
+    assert mesh.volume() > 0
+
+
+def test_multi_start() -> None:
+    ht = make_ht(starts=3, height=18)
+    ths = helical_thread(ht)
+    mesh = thread_mesh(ths, True, 100)
+    first = ths._cache[("mesh", True, 100, "float64")]
+
+    assert len(mesh.vertices) == 3 * len(first.vertices)
+    assert check_mesh(mesh).watertight
+    assert isclose(mesh.volume(), 3 * first.volume())
+
+    # A start advances by the lead, three pitches, per revolution
+    assert ht.lead == 3
+    f = ht.helix(ths.int_helixes[0])
+    assert isclose(f(0.5 + (3 / 18))[2] - f(0.5)[2], 3)
+
+    # Start 0 is sampled and the others are rotations of it
+    t = t_values(ht, 7)
+    starts = sample_starts(ht, ths.int_helixes, t)
+    assert starts.shape == (3, len(ths.int_helixes), 7, 3)
+    assert np.array_equal(starts[0], sample_helixes(ht, ths.int_helixes, t))
+    angle = np.arctan2(-starts[..., 0], starts[..., 1])
+    assert np.allclose(np.cos(angle[1] - angle[0]), np.cos(2 * np.pi / 3))
+    assert np.allclose(np.sin(angle[1] - angle[0]), np.sin(2 * np.pi / 3))
+    assert np.array_equal(starts[2, ..., 2], starts[0, ..., 2])
+
+
+def test_cached() -> None:
+    ths = helical_thread(make_ht())
+    assert thread_mesh(ths, False, 50) is thread_mesh(ths, False, 50)
+
+
+def test_float32() -> None:
+    # A large part, M100x2 by 200 long, against the default stl_tolerance
+    stl_tolerance: float = 1e-3
+    ths = helical_thread(
+        make_ht(radius=50, pitch=2, height=200, starts=2, minor_cutoff=0.25)
+    )
+    for internal in (True, False):
+        mesh = thread_mesh(ths, internal, 2000, np.float32)
+        exact = thread_mesh(ths, internal, 2000)
+        assert mesh.vertices.dtype == np.float32
+        assert np.array_equal(mesh.faces, exact.faces)
+        error = np.max(np.abs(mesh.vertices - exact.vertices))
+        assert error < stl_tolerance / 20
+        assert check_mesh(mesh).watertight
@@ -0,0 +1,76 @@
+import numpy as np
+
+from helical_thread import (
+    HelicalThread,
+    ThreadMesh,
+    check_mesh,
+    helical_thread,
+    thread_meshes,
+)
+
+# A tetrahedron, faces counter clockwise seen from outside
+vertices = np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)], dtype=float)
+faces = np.array([(0, 2, 1), (0, 1, 3), (1, 2, 3), (0, 3, 2)])
+
+
+def test_watertight() -> None:
+    report = check_mesh(ThreadMesh(vertices, faces))
+    assert report.closed and report.oriented and report.watertight
+    assert len(report.degenerate_faces) == 0
+
+
+def test_boundary() -> None:
+    report = check_mesh(ThreadMesh(vertices, faces[1:]))
+    assert not report.closed
+    assert report.oriented
+    assert np.array_equal(report.boundary_edges, [(0, 1), (0, 2), (1, 2)])
+
+
+def test_misoriented() -> None:
+    flipped = faces.copy()
+    flipped[2] = flipped[2, ::-1]
+    report = check_mesh(ThreadMesh(vertices, flipped))
+    assert report.closed
+    assert not report.oriented
+    assert np.array_equal(report.misoriented_edges, [(1, 2), (1, 3), (2, 3)])
+
+
+def test_nonmanifold() -> None:
+    report = check_mesh(ThreadMesh(vertices, np.concatenate((faces, faces[:1]))))
+    assert not report.closed
+    assert np.array_equal(report.nonmanifold_edges, [(0, 1), (0, 2), (1, 2)])
+
+
+def test_degenerate() -> None:
+    flat = vertices.copy()
+    flat[3] = (0.5, 0.5, 0)
+    extra = np.concatenate((faces, [(1, 1, 2)]))
+    report = check_mesh(ThreadMesh(flat, extra))
+    assert not report.watertight
+    # Face 0 is in the plane but has an area
+    assert np.array_equal(report.degenerate_faces, [2, 4])
+
+    report = check_mesh(ThreadMesh(flat, extra), area_tolerance=1)
+    assert np.array_equal(report.degenerate_faces, [0, 1, 2, 3, 4])
+
+
+def test_empty() -> None:
+    report = check_mesh(ThreadMesh(np.zeros((0, 3)), np.zeros((0, 3), dtype=int)))
+    assert report.watertight
+
+
+def test_threads() -> None:
+    ths = helical_thread(
+        HelicalThread(
+            radius=4,
+            pitch=1,
+            height=6,
+            taper_out_rpos=0.1,
+            taper_in_rpos=0.9,
+            minor_cutoff=0.1,
+            major_cutoff=0.1,
+            starts=2,
+        )
+    )
+    for mesh in thread_meshes(ths, num=200).values():
+        assert check_mesh(mesh).watertight
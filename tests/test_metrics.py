@@ -0,0 +1,86 @@
+from math import pi, sqrt
+
+import numpy as np
+
+from helical_thread import (
+    HelicalThread,
+    HelicalThreadBatch,
+    helical_thread,
+    helical_thread_batch,
+    thread_metrics,
+)
+
+
+def _iso(size: float, pitch: float, ext_clearance: float = 0) -> HelicalThread:
+    # The ISO 68-1 basic profile, flats of pitch / 8 and pitch / 4
+    return HelicalThread(
+        radius=size / 2,
+        pitch=pitch,
+        height=20,
+        inset_offset=1,
+        taper_out_rpos=0.1,
+        taper_in_rpos=0.9,
+        angle_degs=60,
+        major_cutoff=pitch / 8,
+        minor_cutoff=pitch / 4,
+        ext_clearance=ext_clearance,
+        thread_overlap=0,
+    )
+
+
+def test_iso_basic_profile() -> None:
+    metrics = thread_metrics(HelicalThreadBatch.from_threads([_iso(10, 1.5)]))
+    h = sqrt(3) / 2 * 1.5
+    engagement = (20 - 2) * 0.8
+    assert np.allclose(metrics.engagement_length, engagement)
+    assert np.allclose(metrics.ext_major_diameter, 10)
+    assert np.allclose(metrics.int_minor_diameter, 10 - (5 * h / 4))
+    assert np.allclose(metrics.ext_minor_diameter, 10 - (5 * h / 4))
+    assert np.allclose(metrics.ext_pitch_diameter, 10 - (3 * h / 4))
+
+    d2 = 10 - (3 * h / 4)
+    d1 = 10 - (5 * h / 4)
+    assert np.allclose(metrics.tensile_stress_area, (pi / 4) * ((d2 + d1) / 2) ** 2)
+    # ISO 898 shear areas, the widths are p / 2 + (diameter difference) * tan 30
+    tan30 = 1 / sqrt(3)
+    assert np.allclose(
+        metrics.ext_shear_area, pi * d1 * engagement * (0.5 + (d2 - d1) * tan30 / 1.5)
+    )
+    assert np.allclose(
+        metrics.int_shear_area, pi * 10 * engagement * (0.5 + (10 - d2) * tan30 / 1.5)
+    )
+
+
+def test_catalog() -> None:
+    sizes = np.linspace(3, 60, 1000)
+    threads = [_iso(s, round(s / 8, 2), 0.02) for s in sizes]
+    thb = helical_thread_batch(HelicalThreadBatch.from_threads(threads))
+    metrics = thread_metrics(thb)
+    assert metrics.tensile_stress_area.shape == (1000,)
+    assert np.all(np.diff(metrics.tensile_stress_area) > 0)
+
+    # The clearance makes the external thread smaller and thinner
+    assert np.all(metrics.ext_major_diameter < 2 * thb.htb.radius)
+    ths = helical_thread(threads[0])
+    assert np.isclose(metrics.ext_minor_diameter[0], 2 * ths.ext_helix_radius)
+    assert np.all(metrics.ext_minor_diameter < metrics.ext_pitch_diameter)
+    assert np.all(metrics.ext_pitch_diameter < metrics.ext_major_diameter)
+    assert np.all(metrics.ext_shear_area > 0) and np.all(metrics.int_shear_area > 0)
+
+
+def test_three_point_profile() -> None:
+    ht = HelicalThread(
+        radius=4, pitch=1, height=6, angle_degs=60, minor_cutoff=0.1, ext_clearance=0.1
+    )
+    ths = helical_thread(ht)
+    assert len(ths.ext_helixes) == 3
+    thb = helical_thread_batch(HelicalThreadBatch.from_threads([ht]))
+    assert np.isclose(
+        thb.ext_thread_depth[0], ths.ext_helixes[2].horz_offset, rtol=0, atol=0
+    )
+    metrics = thread_metrics(thb)
+    assert np.allclose(
+        metrics.ext_major_diameter,
+        2 * (ths.ext_helix_radius + ths.ext_helixes[2].horz_offset),
+    )
+    assert np.all(metrics.ext_pitch_diameter < metrics.ext_major_diameter)
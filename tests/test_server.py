@@ -0,0 +1,183 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+import pytest
+
+from helical_thread import (
+    HelicalThread,
+    ThreadServer,
+    decode_arrays,
+    encode_arrays,
+    fetch,
+    helical_thread,
+    sample_starts,
+    t_values,
+    thread_mesh,
+)
+from helical_thread.server import MAX_BODY, request_key
+
+thread: Dict[str, Any] = dict(
+    radius=4, pitch=1, height=5, taper_out_rpos=0.1, taper_in_rpos=0.9, starts=2
+)
+
+
+def test_encode_decode() -> None:
+    arrays: Dict[str, np.ndarray] = {
+        "a": np.arange(7, dtype=np.int32),
+        "b": np.ones((3, 2)) / 3,
+        "c": np.zeros((0, 3)),
+        "d": np.arange(6, dtype=">f8").reshape(3, 2),
+    }
+    data = encode_arrays(arrays)
+    decoded = decode_arrays(data)
+    assert list(decoded) == list(arrays)
+    for name, a in arrays.items():
+        assert np.array_equal(decoded[name], a)
+        assert decoded[name].ctypes.data % 8 == 0 or decoded[name].size == 0
+    assert not decoded["b"].flags.owndata
+
+    with pytest.raises(ValueError):
+        decode_arrays(b"nope" + data[4:])
+
+
+def test_http(tmp_path: Path) -> None:
+    ths = helical_thread(HelicalThread(**thread))
+
+    async def run() -> None:
+        server = ThreadServer(processes=2)
+        await server.start()
+        host, port = server.address[:2]
+        try:
+            mesh = await fetch("mesh", {"thread": thread, "num": 50}, host, port)
+            expected = thread_mesh(ths, True, 50)
+            assert np.array_equal(mesh["vertices"], expected.vertices)
+            assert np.array_equal(mesh["faces"], expected.faces)
+
+            samples = await fetch(
+                "samples", {"thread": thread, "num": 20, "internal": False}, host, port
+            )
+            assert np.array_equal(
+                samples["points"],
+                sample_starts(ths.ht, ths.ext_helixes, t_values(ths.ht, 20)),
+            )
+
+            with pytest.raises(ValueError, match="404"):
+                await fetch("nothing", {"thread": thread}, host, port)
+            with pytest.raises(ValueError, match="400"):
+                await fetch("mesh", {"thread": {"radius": 1, "size": 2}}, host, port)
+        finally:
+            await server.close()
+
+        server = ThreadServer(executor=ThreadPoolExecutor(2))
+        path = str(tmp_path / "thread.sock")
+        await server.start(path=path)
+        try:
+            profiles = await fetch("profiles", {"thread": thread}, path=path)
+            assert profiles["int_helixes"].shape == (len(ths.int_helixes), 3)
+            assert profiles["radius"][0] == ths.int_helix_radius
+
+            samples = await fetch(
+                "samples", {"thread": thread, "num": 20, "dtype": "float32"}, path=path
+            )
+            assert samples["points"].dtype == np.float32
+            with pytest.raises(ValueError, match="400"):
+                await fetch("mesh", {"thread": thread, "dtype": "int8"}, path=path)
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+
+def test_coalescing() -> None:
+    async def run() -> None:
+        server = ThreadServer(executor=ThreadPoolExecutor(2))
+        params = {"thread": thread, "num": 200}
+        results = await asyncio.gather(
+            *[server.geometry("mesh", params) for _ in range(5)],
+            server.geometry("mesh", {"thread": thread, "num": 100}),
+        )
+        assert server.computed == 2
+        assert server.coalesced == 4
+        assert all(r == results[0] for r in results[:5])
+
+        # Once complete the next identical request is computed again
+        await server.geometry("mesh", params)
+        assert server.computed == 3
+        await server.close()
+
+    asyncio.run(run())
+
+
+def test_request_key() -> None:
+    key = request_key("mesh", {"thread": thread, "num": 200})
+    written = dict(thread, pitch=1.0, angle_degs=45, ext_clearance=0.1)
+    assert request_key("mesh", {"thread": written, "num": 200.0}) == key
+    assert (
+        request_key("mesh", {"thread": thread, "num": 200, "dtype": "float64"}) == key
+    )
+    assert request_key("mesh", {"thread": thread, "num": 100}) != key
+    assert request_key("samples", {"thread": thread, "num": 200}) != key
+    assert request_key("profiles", {"thread": thread, "num": 1}) == request_key(
+        "profiles", {"thread": written}
+    )
+
+    async def run() -> None:
+        server = ThreadServer(executor=ThreadPoolExecutor(2))
+        await asyncio.gather(
+            server.geometry("mesh", {"thread": thread, "num": 200}),
+            server.geometry("mesh", {"thread": written, "num": 200, "internal": 1}),
+        )
+        assert server.computed == 1 and server.coalesced == 1
+        await server.close()
+
+    asyncio.run(run())
+
+
+def _raw(tmp_path: Path, request: bytes) -> bytes:
+    """Send a raw request to a new server and return its response"""
+
+    async def run() -> bytes:
+        server = ThreadServer(executor=ThreadPoolExecutor(1))
+        path = str(tmp_path / "thread.sock")
+        await server.start(path=path)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(request)
+            writer.write_eof()
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("length", ["-5", "ten"])
+def test_bad_content_length(tmp_path: Path, length: str) -> None:
+    request = f"POST /mesh HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode()
+    assert _raw(tmp_path, request).startswith(b"HTTP/1.1 400")
+
+
+def test_truncated_body(tmp_path: Path) -> None:
+    request = b"POST /mesh HTTP/1.1\r\nContent-Length: 100\r\n\r\n{}"
+    response = _raw(tmp_path, request)
+    assert response.startswith(b"HTTP/1.1 400") and b"2 of 100" in response
+
+
+def test_body_too_large(tmp_path: Path) -> None:
+    request = f"POST /mesh HTTP/1.1\r\nContent-Length: {MAX_BODY + 1}\r\n\r\n"
+    assert _raw(tmp_path, request.encode()).startswith(b"HTTP/1.1 413")
+
+
+@pytest.mark.parametrize("starts", [0, -1, 2.5])
+def test_bad_starts(tmp_path: Path, starts: float) -> None:
+    body = json.dumps({"thread": dict(thread, starts=starts)}).encode()
+    request = f"POST /mesh HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n"
+    response = _raw(tmp_path, request.encode() + body)
+    assert response.startswith(b"HTTP/1.1 400") and b"starts" in response
@@ -0,0 +1,81 @@
+from dataclasses import replace
+from math import cos, isclose, radians
+from typing import Dict
+
+import numpy as np
+
+from helical_thread import HelicalThread
+from helical_thread.stackup import (
+    Distribution,
+    Normal,
+    Uniform,
+    _sample_batch,
+    fit_stackup,
+)
+
+pitch = 2
+ext_clearance = 0.05
+
+ht = HelicalThread(
+    radius=4,
+    pitch=pitch,
+    height=10,
+    angle_degs=90,
+    ext_clearance=ext_clearance,
+    major_cutoff=pitch / 8,
+    minor_cutoff=pitch / 4,
+)
+
+
+def test_nominal() -> None:
+    result = fit_stackup(ht, ht, samples=10)
+
+    assert result.samples == 10
+    assert result.fit_rate == 1
+    assert np.allclose(result.major_clearance, ext_clearance)
+    assert np.allclose(result.minor_clearance, ext_clearance)
+
+    # The flank clearance on both sides of the thread projected on the axis
+    axial_play = 2 * ext_clearance / cos(radians(ht.angle_degs / 2))
+    assert np.allclose(result.axial_margin, axial_play)
+
+
+def test_variation() -> None:
+    nut_variation: Dict[str, Distribution] = {
+        "radius": Normal(4, 0.02),
+        "pitch": Normal(pitch, 0.005),
+    }
+    bolt_variation: Dict[str, Distribution] = {
+        "radius": Normal(4, 0.01),
+        "angle_degs": Uniform(89, 91),
+    }
+    result = fit_stackup(
+        ht, ht, nut_variation, bolt_variation, samples=5000, chunk_size=1024, seed=1
+    )
+
+    assert result.samples == 5000
+    assert 0.9 < result.fit_rate < 1
+    p = result.percentiles((1, 50, 99))
+    assert isclose(p["major_clearance"][1], ext_clearance, abs_tol=0.005)
+    assert p["axial_margin"][0] < p["axial_margin"][2]
+
+    # The result depends on the seed and chunk_size, not the processes
+    pooled = fit_stackup(
+        ht,
+        ht,
+        nut_variation,
+        bolt_variation,
+        samples=5000,
+        chunk_size=1024,
+        seed=1,
+        processes=2,
+    )
+    assert np.array_equal(pooled.axial_margin, result.axial_margin)
+
+
+def test_starts() -> None:
+    multi = replace(ht, starts=3)
+    batch = _sample_batch(multi, {}, np.random.default_rng(0), 4)
+    assert batch.thread(0) == multi
+    result = fit_stackup(multi, multi, samples=10)
+    assert np.allclose(result.major_clearance, ext_clearance)
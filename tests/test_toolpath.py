@@ -0,0 +1,86 @@
+from math import isclose
+from types import GeneratorType
+from typing import Any, Dict
+
+import numpy as np
+import pytest
+
+from helical_thread import HelicalThread, ThreadHelixes, gcode, helical_thread, toolpath
+
+
+def make_ths(**kwargs) -> ThreadHelixes:
+    params: Dict[str, Any] = dict(
+        radius=4,
+        pitch=1,
+        height=5,
+        taper_out_rpos=0.1,
+        taper_in_rpos=0.9,
+        minor_cutoff=0.1,
+        major_cutoff=0.1,
+    )
+    params.update(kwargs)
+    return helical_thread(HelicalThread(**params))
+
+
+@pytest.mark.parametrize("internal", [True, False])
+def test_passes(internal) -> None:
+    ths = make_ths()
+    generator = toolpath(ths, internal, tool_radius=1, stepdown=0.3)
+    assert isinstance(generator, GeneratorType)
+    moves = list(generator)
+
+    # Each pass enters and leaves the retract position
+    depth = max(abs(hl.horz_offset) for hl in ths.int_helixes)
+    passes = int(np.ceil(depth / 0.3))
+    if internal:
+        assert sum(m.code == "G0" for m in moves) == passes
+    else:
+        assert sum(m.code == "G0" for m in moves) == 3 * passes
+
+    # The helical arcs are at a constant radius and rise along the helix
+    prev = moves[0]
+    for m in moves:
+        if m.code == "G3":
+            assert m.i is not None and m.j is not None
+            assert isclose(np.hypot(m.i, m.j), np.hypot(m.x, m.y))
+            assert m.z > prev.z
+        prev = m
+
+    # The last pass reaches the root, the tool is offset by its radius
+    radii = [np.hypot(m.x, m.y) for m in moves if m.code == "G3"]
+    if internal:
+        assert isclose(max(radii), ths.int_helix_radius - 1)
+    else:
+        assert isclose(min(radii), ths.ext_helix_radius + 1)
+
+
+def test_tolerance() -> None:
+    ths = make_ths(taper_out_rpos=0.5, taper_in_rpos=0.5)
+    coarse = list(toolpath(ths, True, 1, 10, tolerance=1e-2, arcs=False))
+    fine = list(toolpath(ths, True, 1, 10, tolerance=1e-5, arcs=False))
+    assert len(fine) > 10 * len(coarse)
+
+    # The midpoints of the coarse segments are within tolerance of the
+    # fine segments which are close to the helix.
+    pts = np.array([(m.x, m.y, m.z) for m in coarse[2:-1]])
+    mids = (pts[:-1] + pts[1:]) / 2
+    dense = np.array([(m.x, m.y, m.z) for m in fine[2:-1]])
+    dist = np.min(np.linalg.norm(mids[:, None] - dense[None], axis=2), axis=1)
+    assert np.max(dist) < 1e-2
+    assert np.max(dist) > 1e-3
+
+
+def test_multi_start_and_gcode() -> None:
+    ths = make_ths(starts=2, height=10)
+    lines = list(gcode(toolpath(ths, False, 1, 1), digits=3))
+    assert sum(line.startswith("G0") for line in lines) == 6
+    assert lines[0].startswith("G0 X0.000 Y")
+    assert any(line.startswith("G3") and " I" in line for line in lines)
+
+    # The arguments are checked when toolpath is called
+    with pytest.raises(ValueError):
+        toolpath(ths, True, 10, 1)
+    with pytest.raises(ValueError):
+        toolpath(ths, True, 1, -1)
+    with pytest.raises(ValueError):
+        toolpath(ths, False, 1, 1, tolerance=0)
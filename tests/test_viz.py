@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from helical_thread import HelicalThread, helical_thread
+from helical_thread.viz import helix_lines, thread_figure
+
+ths = helical_thread(
+    HelicalThread(
+        radius=4,
+        pitch=1,
+        height=20,
+        taper_out_rpos=0.1,
+        taper_in_rpos=0.9,
+        minor_cutoff=0.1,
+    )
+)
+
+
+def test_helix_lines() -> None:
+    points = helix_lines(ths, True, num=100)
+    assert points.dtype == np.float32
+    assert points.shape == (4 * 101, 3)
+
+    # Each helix is followed by a row of NaNs
+    nans = np.isnan(points[:, 0])
+    assert list(np.nonzero(nans)[0]) == [100, 201, 302, 403]
+    assert np.all(np.isnan(points[nans]))
+
+    # Decimated to max_points
+    assert len(helix_lines(ths, False, num=100_000, max_points=1000)) <= 1000
+    assert len(helix_lines(ths, False, num=10, max_points=1000)) == (
+        len(ths.ext_helixes) * 11
+    )
+
+
+def test_thread_figure() -> None:
+    pytest.importorskip("plotly")
+
+    fig = thread_figure(ths, "both", num=100_000, max_points=2000)
+    assert [trace.name for trace in fig.data] == ["int", "ext"]
+    assert all(len(trace.x) <= 2000 for trace in fig.data)
+    assert len(fig.to_json()) < 1_000_000
+
+    fig = thread_figure(ths, "ext", max_points=2000, mesh=True)
+    assert [trace.type for trace in fig.data] == ["mesh3d"]
+    assert len(fig.data[0].x) <= 2000